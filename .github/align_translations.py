@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""Align each English page (``X.md``) with its translation (``tw-X.md``).
+
+The alignment pairs up the titles and the FAQ questions with the same
+``faq-N`` anchor, which split each page into sections; within a section,
+headings and paragraphs (from the shared parsed corpus, doc_sync_corpus)
+are matched by a dynamic-programming pass scoring length (against the
+page's EN:TW character ratio), heading level and the text both languages
+share — link targets, numbers and Latin words — allowing a paragraph to
+be split in two or a unit to be left unmatched.
+
+Alignments are cached in ``CACHE_DIR/alignment.pickle``.  A page pair is
+only re-aligned when either file's content hash changed, and then only
+the sections whose paragraphs changed.
+
+    python3 .github/align_translations.py                 # refresh, report
+    python3 .github/align_translations.py --show faq.md   # print the pairs
+    python3 .github/align_translations.py --stale HEAD    # TW paragraphs to revisit
+
+``--stale REV`` reads ``git diff -U0 REV`` for the English pages and lists
+the TW paragraphs aligned with the changed lines.  Each hunk is looked up
+by binary search, so a query costs O(changed), not a rescan of the pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import math
+import pickle
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from doc_sync_config import CACHE_DIR
+from doc_sync_corpus import REPO_ROOT, Page, corpus, site_pages
+from doc_sync_writeback import write_atomic
+
+ALIGNMENT_FORMAT = 1  # bump when Unit or the scoring changes
+
+SKIP_COST = 1.0  # leaving a unit without a counterpart
+SPLIT_COST = 0.3  # extra cost of a 2:1 or 1:2 match
+LEVEL_COST = 0.5  # per heading level of difference
+_BAND = 25  # units either side of the diagonal the DP considers
+
+_LATIN_RE = re.compile(r"[A-Za-z][A-Za-z'’-]+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_TW_LINK_RE = re.compile(r"(?<![^/])tw/")
+
+
+# ── Units ────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class Unit:
+    """A heading, paragraph or the title: lines [line, end) of its file."""
+    kind: str  # "title", "heading" or "paragraph"
+    line: int  # 1-based
+    end: int
+    text: str
+    level: int = 0  # headings
+    anchor: str = ""  # id="…" of an HTML heading, e.g. faq-3
+    list_item: bool = False
+    emphasis: bool = False  # all bold or italic, e.g. an interview question
+
+    def label(self) -> str:
+        where = f"#{self.anchor}" if self.anchor else f"h{self.level}" if self.kind == "heading" else self.kind
+        return f"{where}: {self.text[:60]}"
+
+
+def _units(page: Page) -> tuple[list[Unit], list[frozenset[str]]]:
+    """The page's title, headings and paragraphs in document order, each
+    running up to the next unit or ``<div>`` block, and their features."""
+    units: list[Unit] = []
+    features: list[frozenset[str]] = []
+    if page.title:
+        units.append(Unit("title", 1, 1, page.title))
+        features.append(_features(page.title))
+    starts = [(heading.line, 0, heading) for heading in page.outline()]
+    starts += [(paragraph.line, 1, paragraph) for paragraph in page.paragraphs]
+    for line, kind, item in sorted(starts, key=lambda start: start[:2]):
+        if kind == 0:
+            units.append(Unit("heading", line, line, item.text, item.level, item.anchor))
+            features.append(_features(item.text))
+        else:
+            emphasis = all(span.bold or span.italic for span in item.spans if span.text.strip())
+            units.append(Unit("paragraph", line, line, item.text, list_item=item.list_item, emphasis=emphasis))
+            links = {span.link for span in item.spans if span.link}
+            features.append(_features(item.text, links))
+
+    # Each unit ends where the next unit, <div> block or the file does.
+    stops = sorted(
+        [unit.line for unit in units[1:]]
+        + [block.line for block in page.html_blocks]
+        + [page.text.count("\n") + 2]
+    )
+    if units and units[0].kind == "title":
+        units[0].end = page.front_matter.count("\n") + 2
+    for unit in units:
+        if unit.kind != "title":
+            unit.end = stops[bisect.bisect_right(stops, unit.line)]
+    return units, features
+
+
+def _features(text: str, links: Iterable[str] = ()) -> frozenset[str]:
+    """What survives translation: numbers, Latin words and link targets
+    (with the ``/tw`` prefix of translated pages dropped)."""
+    return frozenset(
+        [match.lower() for match in _LATIN_RE.findall(text)]
+        + _NUMBER_RE.findall(text)
+        + [_TW_LINK_RE.sub("/", link) for link in links]
+    )
+
+
+# ── Alignment ────────────────────────────────────────────────────────
+
+Link = tuple[tuple[int, ...], tuple[int, ...]]  # EN unit ids ↔ TW unit ids
+
+
+def _pair_cost(
+    en: list[Unit], tw: list[Unit],
+    en_features: list[frozenset[str]], tw_features: list[frozenset[str]],
+    ratio: float,
+) -> float:
+    """Length mismatch plus the share of TW features missing from EN.
+
+    Headings only match headings, one to one, and cost extra per level
+    of difference; an anchored heading only matches the same anchor.
+    """
+    if len(en) + len(tw) > 2:
+        if any(unit.kind != "paragraph" for unit in en + tw):
+            return math.inf
+    elif en[0].kind != tw[0].kind:
+        return math.inf
+    elif en[0].anchor or tw[0].anchor:
+        return 0.0 if en[0].anchor == tw[0].anchor else math.inf
+
+    en_len = sum(len(unit.text) for unit in en)
+    tw_len = sum(len(unit.text) for unit in tw)
+    cost = abs(math.log((en_len + 10) / (ratio * tw_len + 10)))
+    tw_all = tw_features[0] if len(tw_features) == 1 else frozenset().union(*tw_features)
+    if tw_all:
+        en_all = en_features[0] if len(en_features) == 1 else frozenset().union(*en_features)
+        cost += 0.5 * (1 - len(tw_all & en_all) / len(tw_all))
+    else:
+        cost += 0.25
+    if en[0].list_item != tw[0].list_item:
+        cost += 0.5
+    if en[0].emphasis != tw[0].emphasis:
+        cost += 0.5
+    return cost + LEVEL_COST * abs(en[0].level - tw[0].level)
+
+
+def _align(n: int, m: int, cost) -> list[Link]:
+    """Minimum-cost monotone alignment of n EN and m TW items.
+
+    *cost(i, j, di, dj)* scores matching EN items [i-di, i) with TW items
+    [j-dj, j).  Moves are 1:1, 1:0, 0:1, 2:1 and 1:2; only cells near
+    the diagonal are considered.
+    """
+    moves = [(1, 1), (1, 0), (0, 1), (2, 1), (1, 2)]
+    band = _BAND + (m // n if n else m)
+    best = {(0, 0): (0.0, None)}
+    for i in range(n + 1):
+        centre = i * m // n if n else 0
+        for j in range(max(0, centre - band), min(m, centre + band) + 1):
+            if (i, j) == (0, 0):
+                continue
+            choice = (math.inf, None)
+            for di, dj in moves:
+                prev = best.get((i - di, j - dj))
+                if prev is None:
+                    continue
+                step = SKIP_COST if di == 0 or dj == 0 else cost(i, j, di, dj)
+                if di + dj == 3:
+                    step += SPLIT_COST
+                if prev[0] + step < choice[0]:
+                    choice = (prev[0] + step, (di, dj))
+            best[(i, j)] = choice
+    if best[(n, m)][0] == math.inf:  # nothing matchable (e.g. clashing anchors)
+        return []
+
+    links: list[Link] = []
+    i, j = n, m
+    while (i, j) != (0, 0):
+        di, dj = best[(i, j)][1]
+        if di and dj:
+            links.append((tuple(range(i - di, i)), tuple(range(j - dj, j))))
+        i, j = i - di, j - dj
+    links.reverse()
+    return links
+
+
+def _digest(units: Iterable[Unit]) -> str:
+    data = "\0".join(f"{unit.kind}\1{unit.level}\1{unit.list_item:d}{unit.emphasis:d}\1{unit.text}" for unit in units)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PairAlignment:
+    en: str
+    tw: str
+    en_sha256: str
+    tw_sha256: str
+    en_units: list[Unit]
+    tw_units: list[Unit]
+    links: list[Link]
+    # Section alignments by (EN digest, TW digest), as links local to the
+    # section, so an edit re-aligns only the sections it touches.
+    sections: dict[tuple[str, str], list[Link]] = field(default_factory=dict)
+    _starts: list[int] = field(default_factory=list, repr=False)
+    _en_links: dict[int, int] = field(default_factory=dict, repr=False)
+
+    def index(self) -> None:
+        """Build the lookups ``stale`` uses."""
+        self._starts = [unit.line for unit in self.en_units]
+        self._en_links = {i: n for n, (en, _) in enumerate(self.links) for i in en}
+
+    def counterpart(self, en_unit: int) -> list[int]:
+        """TW unit ids aligned with EN unit *en_unit*."""
+        n = self._en_links.get(en_unit)
+        return list(self.links[n][1]) if n is not None else []
+
+    def stale(self, ranges: Iterable[tuple[int, int]]) -> list[int]:
+        """TW unit ids aligned with any EN unit overlapping the line
+        *ranges* ([start, end), 1-based; an empty range marks a deletion
+        before *start*)."""
+        stale: dict[int, None] = {}
+        for start, end in ranges:
+            first = max(0, bisect.bisect_right(self._starts, start) - 1)
+            last = bisect.bisect_left(self._starts, max(end, start + 1))
+            for i in range(first, last):
+                unit = self.en_units[i]
+                if unit.line < max(end, start + 1) and start < max(unit.end, unit.line + 1):
+                    stale.update(dict.fromkeys(self.counterpart(i)))
+        return sorted(stale)
+
+
+def _fixed_points(en_units: list[Unit], tw_units: list[Unit]) -> list[tuple[int, int]]:
+    """Units that can only align one way: the titles, and headings with
+    the same anchor on both sides (in document order)."""
+    points = []
+    if en_units and tw_units and en_units[0].kind == tw_units[0].kind == "title":
+        points.append((0, 0))
+    tw_anchors = {unit.anchor: j for j, unit in enumerate(tw_units) if unit.anchor}
+    last = points[-1][1] if points else -1
+    for i, unit in enumerate(en_units):
+        j = tw_anchors.get(unit.anchor, -1) if unit.anchor else -1
+        if j > last:
+            points.append((i, j))
+            last = j
+    return points
+
+
+def align_pages(en: Page, tw: Page, previous: Optional[PairAlignment] = None) -> tuple[PairAlignment, int]:
+    """Align *en* with *tw*; return (alignment, sections aligned anew).
+
+    The titles and anchored headings split the pages into sections, each
+    aligned on its own; sections unchanged since *previous* reuse its
+    alignments.
+    """
+    (en_units, en_features), (tw_units, tw_features) = _units(en), _units(tw)
+    en_len = sum(len(unit.text) for unit in en_units if unit.kind == "paragraph")
+    tw_len = sum(len(unit.text) for unit in tw_units if unit.kind == "paragraph")
+    ratio = en_len / tw_len if en_len and tw_len else 1.0
+
+    bounds = [(-1, -1)] + _fixed_points(en_units, tw_units) + [(len(en_units), len(tw_units))]
+    old_sections = previous.sections if previous else {}
+    sections: dict[tuple[str, str], list[Link]] = {}
+    aligned = 0
+    links: list[Link] = []
+    for (en_head, tw_head), (en_next, tw_next) in zip(bounds, bounds[1:]):
+        if en_head >= 0:
+            links.append(((en_head,), (tw_head,)))
+        en_ids = list(range(en_head + 1, en_next))
+        tw_ids = list(range(tw_head + 1, tw_next))
+        if not en_ids or not tw_ids:
+            continue
+        key = (_digest(en_units[i] for i in en_ids), _digest(tw_units[j] for j in tw_ids))
+        local = sections.get(key) or old_sections.get(key)
+        if local is None:
+            local = _align(
+                len(en_ids), len(tw_ids),
+                lambda i, j, di, dj: _pair_cost(
+                    [en_units[k] for k in en_ids[i - di:i]],
+                    [tw_units[k] for k in tw_ids[j - dj:j]],
+                    [en_features[k] for k in en_ids[i - di:i]],
+                    [tw_features[k] for k in tw_ids[j - dj:j]],
+                    ratio,
+                ),
+            )
+            aligned += 1
+        sections[key] = local
+        links += [(tuple(en_ids[i] for i in en), tuple(tw_ids[j] for j in tw)) for en, tw in local]
+
+    alignment = PairAlignment(en.name, tw.name, en.sha256, tw.sha256, en_units, tw_units, links, sections)
+    alignment.index()
+    return alignment, aligned
+
+
+# ── Cached index ─────────────────────────────────────────────────────
+
+
+def page_pairs(root: Path = REPO_ROOT) -> list[tuple[Path, Path]]:
+    """(X.md, tw-X.md) for every English page that has a translation."""
+    pages = {path.name: path for path in site_pages(root)}
+    return [
+        (path, pages["tw-" + name])
+        for name, path in sorted(pages.items())
+        if not name.startswith("tw-") and "tw-" + name in pages
+    ]
+
+
+class AlignmentIndex:
+    """Every page pair's alignment, refreshed from the cache."""
+
+    def __init__(self) -> None:
+        self.pairs: dict[str, PairAlignment] = {}
+        self.realigned = 0
+        self.sections = 0
+        self.seconds = 0.0
+
+    @staticmethod
+    def path() -> Path:
+        return CACHE_DIR / "alignment.pickle"
+
+    def refresh(self, pairs: Optional[list[tuple[Path, Path]]] = None) -> None:
+        started = time.perf_counter()
+        try:
+            with open(self.path(), "rb") as fh:
+                version, cached = pickle.load(fh)
+            if version != ALIGNMENT_FORMAT:
+                cached = {}
+        except FileNotFoundError:
+            cached = {}
+        except Exception as exc:  # a truncated or foreign cache means a full build
+            print(f"doc-sync warning: ignoring alignment cache: {exc}")
+            cached = {}
+
+        dirty = False
+        for en_path, tw_path in pairs if pairs is not None else page_pairs():
+            en, tw = corpus().page(en_path), corpus().page(tw_path)
+            if en is None or tw is None:
+                continue
+            previous = cached.get(en.name)
+            if previous and (previous.en_sha256, previous.tw_sha256) == (en.sha256, tw.sha256):
+                self.pairs[en.name] = previous
+                continue
+            self.pairs[en.name], aligned = align_pages(en, tw, previous)
+            self.realigned += 1
+            self.sections += aligned
+            dirty = True
+        if dirty or set(cached) != set(self.pairs):
+            self.path().parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.path(), pickle.dumps((ALIGNMENT_FORMAT, self.pairs), pickle.HIGHEST_PROTOCOL))
+        corpus().save()
+        self.seconds = time.perf_counter() - started
+
+    def summary(self) -> str:
+        en = sum(len(pair.en_units) for pair in self.pairs.values())
+        linked = sum(len(pair.links) for pair in self.pairs.values())
+        return (
+            f"alignment: {len(self.pairs)} page pairs ({self.realigned} re-aligned, "
+            f"{self.sections} sections), {linked:,} links over {en:,} EN units "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+# ── Stale-translation queries ────────────────────────────────────────
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def changed_lines(rev: str, names: list[str]) -> dict[str, list[tuple[int, int]]]:
+    """Line ranges [start, end) changed in *names* between *rev* and the
+    working tree, from ``git diff -U0`` (new-side line numbers)."""
+    result = subprocess.run(
+        ["git", "diff", "-U0", "--no-color", rev, "--", *names],
+        capture_output=True, text=True, cwd=REPO_ROOT,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"doc-sync error: git diff {rev} failed: {result.stderr.strip()}")
+    ranges: dict[str, list[tuple[int, int]]] = {}
+    current: Optional[str] = None
+    for line in result.stdout.splitlines():
+        if line.startswith("+++ "):
+            current = line[6:] if line.startswith("+++ b/") else None
+        elif current and line.startswith("@@"):
+            m = _HUNK_RE.match(line)
+            if m:
+                start = int(m.group(1))
+                count = int(m.group(2)) if m.group(2) is not None else 1
+                # A pure deletion reports the line before it.
+                ranges.setdefault(current, []).append((start, start + count) if count else (start + 1, start + 1))
+    return ranges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--show", metavar="PAGE", help="Print the alignment of one English page")
+    parser.add_argument("--stale", metavar="REV", help="List TW paragraphs aligned with EN lines changed since REV")
+    args = parser.parse_args()
+
+    index = AlignmentIndex()
+    index.refresh()
+
+    if args.show:
+        pair = index.pairs.get(Path(args.show).name)
+        if pair is None:
+            raise SystemExit(f"doc-sync error: no translation found for {args.show}")
+        for en, tw in pair.links:
+            print(
+                f"{pair.en}:{pair.en_units[en[0]].line} ↔ {pair.tw}:{pair.tw_units[tw[0]].line}"
+                f"  {pair.en_units[en[0]].label()}  |  {pair.tw_units[tw[0]].text[:30]}"
+            )
+    if args.stale:
+        started = time.perf_counter()
+        hunks = changed_lines(args.stale, sorted(index.pairs))
+        stale = 0
+        for name, ranges in sorted(hunks.items()):
+            pair = index.pairs.get(name)
+            if pair is None:
+                continue
+            for j in pair.stale(ranges):
+                unit = pair.tw_units[j]
+                print(f"{pair.tw}:{unit.line}  {unit.label()}")
+                stale += 1
+        print(
+            f"doc-sync: {stale} TW units to revisit for {sum(map(len, hunks.values()))} "
+            f"EN hunks since {args.stale} ({(time.perf_counter() - started) * 1000:.0f} ms)",
+            file=sys.stderr,
+        )
+    print(index.summary(), file=sys.stderr if args.stale or args.show else sys.stdout)
+    print(corpus().summary(), file=sys.stderr if args.stale or args.show else sys.stdout)
+
+
+if __name__ == "__main__":
+    # Run through the module so the cache pickles classes under its
+    # importable name rather than __main__.
+    import align_translations
+
+    align_translations.main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Build the site's full-text search index into ``_search/``.
+
+Pages come from the shared parsed corpus (doc_sync_corpus): the title,
+headings and paragraphs of each page are tokenised and counted.  Words
+(English and other alphabetic text) are NFKC-normalised and case-folded;
+runs of Han characters become overlapping bigrams, so 關懷六力 indexes
+as 關懷 懷六 六力 (a lone character is kept as is).
+
+Eleventy copies the directory to ``/search/``, where a browser fetches
+(it stays out of ``_data/`` so the shards are not loaded as global data):
+
+* ``index.json`` — ``{"version", "shards", "docs"}``; ``docs`` lists
+  ``[url, title, lang, length]`` (``null`` for a removed page), and a
+  page's id is its position there;
+* ``NN.json`` — postings for the terms whose 32-bit FNV-1a hash (over the
+  term's UTF-8 bytes) modulo ``shards`` is NN, as
+  ``{term: [doc, count, doc, count, …]}``.
+
+A query is tokenised the same way and loads just the shards of its terms.
+
+Rebuilds are incremental.  The postings are kept in
+``CACHE_DIR/search-index.pickle``; only pages whose content hash changed
+are tokenised again, and only the shards whose postings changed are
+rewritten.  ``--full`` starts over, which also reclaims removed pages' ids.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from doc_sync_config import CACHE_DIR, REPO_ROOT
+from doc_sync_corpus import Page, corpus
+from doc_sync_writeback import write_atomic, write_back
+
+INDEX_FORMAT = 2  # bump when the tokeniser, page URLs or the file layout change
+DEFAULT_OUT = REPO_ROOT / "_search"
+DEFAULT_SHARDS = 64
+
+_HAN = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # CJK ideographs
+_TOKEN_RE = re.compile(rf"([{_HAN}]+)|[^\W_{_HAN}]+")
+_SHARD_FILE_RE = re.compile(r"^\d+\.json$")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Search terms of *text*: words, and Han character bigrams."""
+    for m in _TOKEN_RE.finditer(unicodedata.normalize("NFKC", text).casefold()):
+        run = m.group(1)
+        if run is None:
+            word = m.group(0)
+            if len(word) > 1 or word.isdigit():
+                yield word
+        elif len(run) == 1:
+            yield run
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2]
+
+
+def shard_of(term: str, shards: int) -> int:
+    """32-bit FNV-1a of *term*'s UTF-8 bytes, modulo *shards*."""
+    h = 0x811C9DC5
+    for byte in term.encode("utf-8"):
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h % shards
+
+
+def _page_terms(page: Page) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    texts = [page.title]
+    texts += [heading.text for heading in page.outline()]
+    texts += [paragraph.text for paragraph in page.paragraphs]
+    for text in texts:
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+# ── Index state ──────────────────────────────────────────────────────
+
+
+@dataclass
+class _Doc:
+    name: str
+    sha256: str
+    url: str
+    title: str
+    lang: str
+    terms: dict[str, int]
+
+    @property
+    def length(self) -> int:
+        return sum(self.terms.values())
+
+
+@dataclass
+class SearchIndex:
+    shards: int
+    docs: list[Optional[_Doc]] = field(default_factory=list)
+    # Per shard: term → {doc id: count}.
+    postings: list[dict[str, dict[int, int]]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.postings:
+            self.postings = [{} for _ in range(self.shards)]
+
+    @staticmethod
+    def path() -> Path:
+        return CACHE_DIR / "search-index.pickle"
+
+    @classmethod
+    def load(cls, shards: int) -> "SearchIndex":
+        try:
+            with open(cls.path(), "rb") as fh:
+                version, index = pickle.load(fh)
+            if version == INDEX_FORMAT and index.shards == shards:
+                return index
+        except FileNotFoundError:
+            pass
+        except Exception as exc:  # a truncated or foreign cache means a full build
+            print(f"doc-sync warning: ignoring search index cache: {exc}")
+        return cls(shards)
+
+    def save(self) -> None:
+        self.path().parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path(), pickle.dumps((INDEX_FORMAT, self), pickle.HIGHEST_PROTOCOL))
+
+    def _set_terms(self, doc_id: int, old: dict[str, int], new: dict[str, int], dirty: set[int]) -> None:
+        """Apply the change from *old* to *new* term counts for one page."""
+        for term in old.keys() | new.keys():
+            count = new.get(term, 0)
+            if old.get(term, 0) == count:
+                continue
+            shard = shard_of(term, self.shards)
+            dirty.add(shard)
+            posting = self.postings[shard].setdefault(term, {})
+            if count:
+                posting[doc_id] = count
+            else:
+                del posting[doc_id]
+                if not posting:
+                    del self.postings[shard][term]
+
+    def update(self, pages: Iterable[Page]) -> tuple[int, set[int]]:
+        """Bring the index up to date with *pages* (every page of the site).
+
+        Returns (pages re-indexed, shards changed).
+        """
+        ids = {doc.name: doc_id for doc_id, doc in enumerate(self.docs) if doc}
+        dirty: set[int] = set()
+        changed = 0
+        seen = set()
+        for page in pages:
+            seen.add(page.name)
+            doc_id = ids.get(page.name)
+            old = self.docs[doc_id] if doc_id is not None else None
+            if old and old.sha256 == page.sha256:
+                continue
+            doc = _Doc(page.name, page.sha256, page.url, page.title,
+                       page.fields.get("lang", ""), _page_terms(page))
+            if doc_id is None:
+                doc_id = len(self.docs)
+                self.docs.append(None)
+            self._set_terms(doc_id, old.terms if old else {}, doc.terms, dirty)
+            self.docs[doc_id] = doc
+            changed += 1
+        for name, doc_id in ids.items():
+            if name not in seen:
+                self._set_terms(doc_id, self.docs[doc_id].terms, {}, dirty)
+                self.docs[doc_id] = None
+                changed += 1
+        return changed, dirty
+
+    def manifest(self) -> str:
+        docs = [[doc.url, doc.title, doc.lang, doc.length] if doc else None for doc in self.docs]
+        return _dumps({"version": INDEX_FORMAT, "shards": self.shards, "docs": docs})
+
+    def shard(self, shard: int) -> str:
+        postings = self.postings[shard]
+        return _dumps({
+            term: [n for doc_id in sorted(posting) for n in (doc_id, posting[doc_id])]
+            for term, posting in sorted(postings.items())
+        })
+
+    @property
+    def terms(self) -> int:
+        return sum(len(postings) for postings in self.postings)
+
+
+def _dumps(data: object) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+
+def build(out: Path, shards: int = DEFAULT_SHARDS, full: bool = False) -> str:
+    """Update the index under *out*; return a one-line report."""
+    started = time.perf_counter()
+    index = SearchIndex(shards) if full else SearchIndex.load(shards)
+    changed, dirty = index.update(corpus().pages())
+
+    out.mkdir(parents=True, exist_ok=True)
+    names = {f"{shard:02d}.json" for shard in range(shards)}
+    # Also (re)write shards missing on disk, e.g. a fresh checkout with a
+    # restored cache.
+    dirty |= {shard for shard in range(shards) if not (out / f"{shard:02d}.json").exists()}
+    outputs = {out / "index.json": index.manifest()}
+    outputs.update({out / f"{shard:02d}.json": index.shard(shard) for shard in sorted(dirty)})
+    results = write_back(outputs)
+    for stale in out.iterdir():
+        if _SHARD_FILE_RE.match(stale.name) and stale.name not in names:
+            stale.unlink()
+    index.save()
+    corpus().save()
+
+    pages = sum(1 for doc in index.docs if doc)
+    written = sum(1 for result in results if result.changed and result.path.name != "index.json")
+    size = sum((out / name).stat().st_size for name in names)
+    return (
+        f"search index: {pages} pages ({changed} re-indexed), {index.terms:,} terms, "
+        f"{shards} shards ({written} rewritten, {size / shards / 1024:,.1f} KiB average) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Output directory (default: _search)")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="Number of postings files")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of incrementally")
+    args = parser.parse_args()
+    if args.shards < 1:
+        raise SystemExit("doc-sync error: --shards must be at least 1")
+
+    print(build(args.out, args.shards, args.full))
+    print(corpus().summary())
+
+
+if __name__ == "__main__":
+    # Run through the module so the cache pickles classes under its
+    # importable name rather than __main__.
+    import build_search_index
+
+    build_search_index.main()
@@ -1,16 +1,50 @@
-"""Shared Google Docs auth helpers for local scripts and workflows."""
+"""Shared Google Docs auth helpers for local scripts and workflows.
+
+Access tokens live for an hour, so refreshing one on every run wastes a
+round trip to oauth2.googleapis.com.  ``cached_credentials`` reuses a
+still-valid token, in order of preference:
+
+* ``GOOGLE_ACCESS_TOKEN`` (+ ``GOOGLE_ACCESS_TOKEN_EXPIRY``, ISO 8601 UTC)
+  from the environment, e.g. minted once by an earlier workflow step;
+* the on-disk cache at ``DOC_SYNC_TOKEN_CACHE`` (default
+  ``<cache dir>/oauth-token.json``; set it empty to disable).
+
+The disk cache is guarded by a lock file, so concurrent processes wait
+for one refresh and then share its token.
+"""
 
 from __future__ import annotations
 
+import datetime
+import hashlib
+import json
 import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, cache still works
+    fcntl = None
+
+from doc_sync_config import CACHE_DIR
+
+# The Google client libraries take a few hundred milliseconds to import,
+# so they are imported only once a run actually needs credentials.
+if TYPE_CHECKING:
+    from google.auth.exceptions import RefreshError
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
 
-from google.auth.exceptions import RefreshError
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import Resource, build
+# Treat tokens this close to expiry as expired.
+EXPIRY_MARGIN = datetime.timedelta(minutes=5)
 
 
 def credentials_from_env() -> Credentials:
+    from google.oauth2.credentials import Credentials
+
     refresh = os.environ.get("GOOGLE_REFRESH_TOKEN")
     client_id = os.environ.get("GOOGLE_CLIENT_ID")
     client_secret = os.environ.get("GOOGLE_CLIENT_SECRET")
@@ -39,10 +73,145 @@ def _format_refresh_error(exc: RefreshError) -> str:
     return f"Google Docs auth failed: {message}"
 
 
-def build_docs_service() -> Resource:
-    creds = credentials_from_env()
+# ── Access-token cache ───────────────────────────────────────────────
+
+def _utcnow() -> datetime.datetime:
+    # google-auth compares naive UTC datetimes
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _parse_expiry(value: str) -> Optional[datetime.datetime]:
+    try:
+        expiry = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+def _is_fresh(expiry: Optional[datetime.datetime]) -> bool:
+    return expiry is not None and expiry - EXPIRY_MARGIN > _utcnow()
+
+
+def _cache_key(creds: Credentials) -> str:
+    """Identify the grant, so a rotated refresh token misses the cache."""
+    material = f"{creds.client_id}\0{creds.refresh_token}".encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+def _token_cache_path() -> Optional[Path]:
+    value = os.environ.get("DOC_SYNC_TOKEN_CACHE")
+    if value is None:
+        return CACHE_DIR / "oauth-token.json"
+    return Path(value) if value else None
+
+
+def _read_token(path: Path, key: str) -> Optional[tuple[str, datetime.datetime]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    expiry = _parse_expiry(str(data.get("expiry", "")))
+    token = data.get("token")
+    if not token or not _is_fresh(expiry):
+        return None
+    return token, expiry
+
+
+def _write_token(path: Path, key: str, creds: Credentials) -> None:
+    if not creds.token or creds.expiry is None:
+        return
+    data = {"key": key, "token": creds.token, "expiry": creds.expiry.isoformat() + "Z"}
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".oauth-token-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _refresh(creds: Credentials) -> None:
+    from google.auth.exceptions import RefreshError
+    from google.auth.transport.requests import Request
+
     try:
         creds.refresh(Request())
     except RefreshError as exc:
         raise SystemExit(_format_refresh_error(exc)) from exc
-    return build("docs", "v1", credentials=creds)
+
+
+def _log(message: str) -> None:
+    print(f"doc-sync: {message}", file=sys.stderr)
+
+
+def _minutes_left(expiry: datetime.datetime) -> int:
+    return int((expiry - _utcnow()).total_seconds() // 60)
+
+
+def cached_credentials() -> Credentials:
+    """Return credentials with a valid access token, refreshing only if needed."""
+    creds = credentials_from_env()
+
+    env_token = os.environ.get("GOOGLE_ACCESS_TOKEN")
+    if env_token:
+        expiry = _parse_expiry(os.environ.get("GOOGLE_ACCESS_TOKEN_EXPIRY", ""))
+        if _is_fresh(expiry):
+            creds.token, creds.expiry = env_token, expiry
+            _log(f"OAuth token from environment (expires in {_minutes_left(expiry)} min)")
+            return creds
+
+    path = _token_cache_path()
+    if path is None:
+        _refresh(creds)
+        _log("OAuth token refreshed (cache disabled)")
+        return creds
+
+    key = _cache_key(creds)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        # Hold the lock across check-and-refresh so concurrent processes
+        # wait for the first refresh instead of each doing their own.
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        cached = _read_token(path, key)
+        if cached:
+            creds.token, creds.expiry = cached
+            _log(f"OAuth token cache hit (expires in {_minutes_left(creds.expiry)} min)")
+            return creds
+        _refresh(creds)
+        try:
+            _write_token(path, key, creds)
+        except OSError as exc:
+            print(f"doc-sync warning: could not cache OAuth token: {exc}", file=sys.stderr)
+        _log("OAuth token refreshed")
+    return creds
+
+
+def docs_service_factory() -> Callable[[], Resource]:
+    """Get credentials once and return a factory of Docs services.
+
+    googleapiclient services are not thread-safe, so concurrent workers
+    each build their own service around the shared credentials.
+    """
+    # Offline runs: DOC_SYNC_EMULATOR points at an emulator snapshot.
+    snapshot = os.environ.get("DOC_SYNC_EMULATOR")
+    if snapshot:
+        from doc_sync_emulator import open_snapshot
+
+        service = open_snapshot(Path(snapshot))
+        return lambda: service
+
+    from googleapiclient.discovery import build
+
+    creds = cached_credentials()
+    return lambda: build("docs", "v1", credentials=creds)
+
+
+def build_docs_service() -> Resource:
+    return docs_service_factory()()
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the doc-sync scripts.
+
+Runs against the in-memory Docs API emulator and a local stand-in for
+the published page, so no credentials or network access are needed:
+
+    python3 .github/doc_sync_bench.py sync --repeat 5
+    python3 .github/doc_sync_bench.py parse --scale 10
+    python3 .github/doc_sync_bench.py tab --sizes 1000,10000,50000
+    python3 .github/doc_sync_bench.py scrape --scale 10
+    python3 .github/doc_sync_bench.py fetch
+    python3 .github/doc_sync_bench.py corpus
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import doc_sync_emulator
+from doc_sync_config import REPO_ROOT, SYNC_FILES
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> list[float]:
+    """Run *fn* *repeat* times and return the wall times in seconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _report(rows: list[tuple[str, list[float], str]]) -> None:
+    width = max(len(name) for name, _, _ in rows)
+    print(f"{'phase':<{width}}  {'best':>9}  {'median':>9}  throughput")
+    for name, times, throughput in rows:
+        print(
+            f"{name:<{width}}  {min(times) * 1000:>7.1f}ms  "
+            f"{statistics.median(times) * 1000:>7.1f}ms  {throughput}"
+        )
+
+
+@contextlib.contextmanager
+def _sync_workspace():
+    """Copy SYNC_FILES into a scratch directory and run inside it."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="doc-sync-bench-") as tmp:
+        for name in SYNC_FILES:
+            shutil.copy2(REPO_ROOT / name, Path(tmp) / name)
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(cwd)
+
+
+def _run_main(module, argv: list[str]) -> str:
+    saved = sys.argv
+    sys.argv = [module.__file__, *argv]
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            module.main()
+    finally:
+        sys.argv = saved
+    return out.getvalue()
+
+
+def bench_sync(args: argparse.Namespace) -> None:
+    """End-to-end push/pull over all SYNC_FILES against the emulator."""
+    import sync_from_google_doc
+    import sync_to_google_doc
+
+    total_bytes = sum((REPO_ROOT / name).stat().st_size for name in SYNC_FILES)
+    files = len(SYNC_FILES)
+
+    def rate(times: list[float]) -> str:
+        best = min(times)
+        return f"{files / best:,.0f} files/s, {total_bytes / best / 1024:,.0f} KiB/s"
+
+    rows = []
+
+    def phase(name: str, fn: Callable[[], object]) -> None:
+        times = _timed(fn, args.repeat)
+        rows.append((name, times, rate(times)))
+
+    with _sync_workspace() as workspace:
+        service = doc_sync_emulator.EmulatedDocsService()
+
+        def fresh_push() -> None:
+            nonlocal service
+            service = doc_sync_emulator.service_for_sync_files(latency=args.latency_ms / 1000)
+            sync_to_google_doc.docs_service_factory = lambda: lambda: service
+            sync_from_google_doc.docs_service_factory = lambda: lambda: service
+            _run_main(sync_to_google_doc, ["--full"])
+
+        def edit_and_push() -> None:
+            for name in SYNC_FILES:
+                path = workspace / name
+                text = path.read_text(encoding="utf-8")
+                path.write_text(text.replace(" the ", " the  ", 1), encoding="utf-8")
+            _run_main(sync_to_google_doc, [])
+
+        phase("push --full (empty doc)", fresh_push)
+        phase("push (no-op)", lambda: _run_main(sync_to_google_doc, []))
+        phase("push diff (1 edit/file)", edit_and_push)
+        sync_from_google_doc.CACHE_DIR = workspace / ".doc-sync-cache"
+        phase("pull --no-cache", lambda: _run_main(sync_from_google_doc, ["--no-cache"]))
+        _run_main(sync_from_google_doc, [])
+        phase("pull (revision unchanged)", lambda: _run_main(sync_from_google_doc, []))
+
+    print(
+        f"{files} files, {total_bytes / 1024:,.0f} KiB of markdown, {args.repeat} runs each, "
+        f"{args.latency_ms:g} ms simulated latency per API call"
+    )
+    _report(rows)
+    print(
+        f"emulator: {service.requests_applied} requests applied, "
+        f"{service.bytes_in / 1024:,.0f} KiB sent, {service.bytes_out / 1024:,.0f} KiB fetched"
+    )
+
+
+# ── Markdown parsing ─────────────────────────────────────────────────
+
+
+def _scaled(text: str, scale: int) -> str:
+    """Repeat the body of a markdown file *scale* times, keeping its front matter."""
+    if scale == 1:
+        return text
+    front, sep, body = text.partition("\n---\n")
+    if not sep:
+        return "\n\n".join([text] * scale)
+    return front + sep + "\n\n".join([body] * scale)
+
+
+def bench_parse(args: argparse.Namespace) -> None:
+    """parse_markdown (lines) beside markdown-it's tokenizer, at 1× and --scale×."""
+    from doc_sync_corpus import split_front_matter
+    from sync_to_google_doc import _markdown_parser, parse_markdown
+
+    md = _markdown_parser()
+    sources = {name: (REPO_ROOT / name).read_text(encoding="utf-8") for name in SYNC_FILES}
+    rows = []
+    for scale in sorted({1, args.scale}):
+        texts = {name: _scaled(text, scale) for name, text in sources.items()}
+        bodies = [split_front_matter(text)[2] for text in texts.values()]
+        size = sum(len(t.encode("utf-8")) for t in texts.values())
+        lines = _timed(lambda: [parse_markdown(t, n) for n, t in texts.items()], args.repeat)
+        tokens = _timed(lambda: [md.parse(body) for body in bodies], args.repeat)
+        for label, times in (("lines", lines), ("markdown-it", tokens)):
+            rows.append((
+                f"{label} {scale}×", times,
+                f"{size / min(times) / 1024:,.0f} KiB/s, {min(times) / min(lines):.2f}× lines",
+            ))
+
+    print(
+        f"{len(sources)} files, {args.repeat} runs each; markdown-it is MarkdownIt.parse() "
+        "alone, the least a token-walking parse_markdown would cost"
+    )
+    _report(rows)
+
+
+# ── Docs → markdown conversion ───────────────────────────────────────
+
+_WORDS = (
+    "care", "civic", "attentiveness", "responsibility", "competence",
+    "responsiveness", "solidarity", "symbiosis", "alignment", "kami",
+    "關懷", "六力", "覺察力", "負責力", "勝任力", "回應力", "團結力", "共生力",
+)
+_PUNCT = ("", "", "", ",", ".", ";", "—", "「", "」", "（", "）", "、", "。")
+
+
+def synthetic_tab(paragraphs: int, seed: int = 0) -> dict:
+    """Docs API tab JSON with *paragraphs* paragraphs of mixed content.
+
+    Headings, bullets (ordered and not), blank paragraphs and runs that
+    are bold, italic or linked, with CJK and ASCII punctuation at run
+    edges so the emphasis-safety checks are exercised.
+    """
+    rng = random.Random(seed)
+    content: list[dict] = [{"startIndex": 0, "endIndex": 1, "sectionBreak": {}}]
+    lists = {
+        "kix.b": {"listProperties": {"nestingLevels": [{"glyphSymbol": "●"}, {"glyphSymbol": "○"}]}},
+        "kix.o": {"listProperties": {"nestingLevels": [{"glyphType": "DECIMAL"}, {"glyphType": "ALPHA"}]}},
+    }
+    for n in range(paragraphs):
+        roll = rng.random()
+        style = "NORMAL_TEXT"
+        bullet = None
+        if n == 0:
+            style = "HEADING_1"
+        elif roll < 0.08:
+            style = f"HEADING_{rng.choice((2, 3, 4))}"
+        elif roll < 0.3:
+            bullet = {"listId": rng.choice(("kix.b", "kix.o")), "nestingLevel": rng.choice((0, 0, 1))}
+        elements = []
+        if roll >= 0.95:
+            elements.append({"textRun": {"content": "\n", "textStyle": {}}})
+        else:
+            for _ in range(rng.randint(1, 8)):
+                words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 6)))
+                text = rng.choice(_PUNCT) + words + rng.choice(_PUNCT) + " "
+                text_style: dict = {}
+                kind = rng.random()
+                if kind < 0.15:
+                    text_style["bold"] = True
+                if 0.1 < kind < 0.25:
+                    text_style["italic"] = True
+                if kind > 0.9:
+                    text_style["link"] = {"url": rng.choice(("https://civic.ai/faq/#faq-3", "/1/", "https://example.org/x"))}
+                elements.append({"textRun": {"content": text, "textStyle": text_style}})
+            elements.append({"textRun": {"content": "\n", "textStyle": {}}})
+        paragraph: dict = {"elements": elements, "paragraphStyle": {"namedStyleType": style}}
+        if bullet:
+            paragraph["bullet"] = bullet
+        content.append({"paragraph": paragraph})
+    return {"tabProperties": {"tabId": "t.bench"}, "documentTab": {"body": {"content": content}, "lists": lists}}
+
+
+def bench_tab(args: argparse.Namespace) -> None:
+    """tab_to_markdown over synthetic tabs of increasing size."""
+    from sync_from_google_doc import tab_to_markdown
+
+    rows = []
+    for size in args.sizes:
+        tab = synthetic_tab(size)
+        md = tab_to_markdown(tab, "/faq/")
+        times = _timed(lambda: tab_to_markdown(tab, "/faq/"), args.repeat)
+        rows.append((
+            f"{size:,} paragraphs",
+            times,
+            f"{size / min(times):,.0f} paragraphs/s, {len(md.encode('utf-8')) / min(times) / 1024:,.0f} KiB/s out",
+        ))
+    print(f"{args.repeat} runs each")
+    _report(rows)
+
+
+# ── Published-Doc scraper ────────────────────────────────────────────
+
+# Tab titles of the published Doc, by local file; English chapters use "chN: …".
+_PUBLISHED_TABS = {
+    "1.md": "ch1: attentiveness.md",
+    "2.md": "ch2: responsibility.md",
+    "3.md": "ch3: competence.md",
+    "4.md": "ch4: responsiveness.md",
+    "5.md": "ch5: solidarity.md",
+    "6.md": "ch6: symbiosis.md",
+}
+
+_PUBLISHED_CSS = (
+    ".c0{font-weight:400}.c1{font-weight:700}.c2{padding-top:0pt}"
+    ".c3{color:#1155cc;text-decoration:underline}.c4{font-style:italic}"
+)
+
+
+def published_doc_html(scale: int = 1) -> str:
+    """HTML shaped like the published (``/pub``) Doc, built from SYNC_FILES.
+
+    One marker paragraph per tab followed by its body: paragraphs of
+    class-styled spans, Google redirect links, lists and headings.  Each
+    body is repeated *scale* times.
+    """
+    from markdown_it import MarkdownIt
+    from sync_to_google_doc import _strip_html_blocks
+
+    md = MarkdownIt()
+
+    def docs_style(html: str) -> str:
+        html = re.sub(r"<strong>(.*?)</strong>", r'<span class="c1">\1</span>', html, flags=re.S)
+        html = re.sub(
+            r'<a href="([^"]*)">',
+            lambda m: f'<a class="c3" href="https://www.google.com/url?q={m.group(1)}&amp;sa=D&amp;ust=0">',
+            html,
+        )
+        html = re.sub(r"<p>", '<p class="c2"><span class="c0">', html).replace("</p>", "</span></p>")
+        return html
+
+    parts = [
+        "<!DOCTYPE html><html><head><meta content=\"text/html; charset=UTF-8\" http-equiv=\"content-type\">",
+        f'<style type="text/css">{_PUBLISHED_CSS}</style></head><body class="doc-content">',
+        '<div id="banners"><div id="title-banner">civic.ai</div></div>',
+        f'<div id="contents"><style type="text/css">{_PUBLISHED_CSS}</style>',
+    ]
+    for name in SYNC_FILES:
+        body = _scaled(_strip_html_blocks((REPO_ROOT / name).read_text(encoding="utf-8")), scale)
+        if body.startswith("---"):
+            body = body.split("---", 2)[2]
+        tab = _PUBLISHED_TABS.get(name, name)
+        parts.append(f'<p class="c2"><span class="c1">{tab}</span></p>')
+        parts.append(docs_style(md.render(body)))
+    parts.append('<p class="c2"><span class="c0">manifesto</span></p></div></body></html>')
+    return "".join(parts)
+
+
+def _gather_sections_nodewise(contents) -> dict[str, list]:
+    """The marker scan before ``TextIndex``: ``get_text`` on every tag and sibling."""
+    from bs4 import NavigableString
+
+    seen: set[str] = set()
+    markers = []
+    for tag in contents.find_all(True):
+        text = tag.get_text(strip=True)
+        if text.endswith(".md") and text not in seen:
+            markers.append(tag)
+            seen.add(text)
+    sections = {}
+    for marker in markers:
+        nodes = []
+        for sibling in marker.next_siblings:
+            if isinstance(sibling, NavigableString):
+                continue
+            text = sibling.get_text(strip=True)
+            if text.lower().endswith(".md") or text.strip().lower() == "manifesto":
+                break
+            nodes.append(sibling)
+        sections[marker.get_text(strip=True)] = nodes
+    return sections
+
+
+def _render_tabs_nodewise(html: str) -> dict[str, str]:
+    """``render_tabs`` without the index, as the scraper used to run."""
+    from bs4 import BeautifulSoup
+    from sync_google_doc_tabs import CHAPTER_MAPPING, detect_locale, extract_bold_classes, render_section
+
+    contents = BeautifulSoup(html, "lxml").find("div", id="contents")
+    bold_classes = extract_bold_classes(contents)
+    rendered = {}
+    for tab, nodes in _gather_sections_nodewise(contents).items():
+        target = CHAPTER_MAPPING.get(tab, tab)
+        is_chapter = target in CHAPTER_MAPPING.values() or target.startswith("tw-") and target[3:] in CHAPTER_MAPPING.values()
+        rendered[target] = render_section(nodes, detect_locale(tab), bold_classes, skip_first_h1=is_chapter)
+    return rendered
+
+
+def bench_scrape(args: argparse.Namespace) -> None:
+    """Published-Doc HTML → markdown: marker scans, then the soup and lxml backends."""
+    from bs4 import BeautifulSoup
+    from sync_google_doc_tabs import CHAPTER_STOPS, TextIndex, gather_sections, render_tabs
+
+    def scan_nodewise(contents) -> None:
+        for nodes in _gather_sections_nodewise(contents).values():
+            for node in nodes:
+                node.get_text(strip=True).startswith(CHAPTER_STOPS)
+
+    def scan_indexed(contents) -> None:
+        index = TextIndex(contents)
+        for nodes in gather_sections(contents, index).values():
+            for node in nodes:
+                index.startswith(node, CHAPTER_STOPS)
+
+    rows = []
+    for scale in sorted({1, args.scale}):
+        html = published_doc_html(scale)
+        size = len(html.encode("utf-8"))
+        expected = _render_tabs_nodewise(html)
+        for backend in ("soup", "lxml"):
+            if render_tabs(html, backend) != expected:
+                print(f"doc-sync warning: {backend} scraper disagrees at {scale}×")
+        contents = BeautifulSoup(html, "lxml").find("div", id="contents")
+        tags = len(contents.find_all(True))
+        for label, scan in (("nodewise", scan_nodewise), ("text index", scan_indexed)):
+            times = _timed(lambda: scan(contents), args.repeat)
+            rows.append((f"scan {label} {scale}×", times, f"{tags / min(times):,.0f} tags/s"))
+        renderers = (
+            ("nodewise", _render_tabs_nodewise),
+            ("soup", lambda html: render_tabs(html, "soup")),
+            ("lxml", lambda html: render_tabs(html, "lxml")),
+        )
+        for label, render in renderers:
+            times = _timed(lambda: render(html), args.repeat)
+            rows.append((f"end-to-end {label} {scale}×", times, f"{size / min(times) / 1024:,.0f} KiB/s"))
+
+    print(f"{len(SYNC_FILES)} tabs, {args.repeat} runs each; end-to-end includes the lxml parse")
+    _report(rows)
+
+
+def bench_fetch(args: argparse.Namespace) -> None:
+    """sync_google_doc_tabs.py end to end against a local published-page stand-in."""
+    import sync_google_doc_tabs
+
+    html = published_doc_html(args.scale)
+    size = len(html.encode("utf-8"))
+    rows = []
+    with _sync_workspace() as workspace, doc_sync_emulator.PublishedDocServer(html) as server:
+        sync_google_doc_tabs.CACHE_DIR = workspace / ".doc-sync-cache"
+        argv = ["--doc-url", server.url]
+
+        def phase(name: str, fn: Callable[[], object]) -> None:
+            before = dict(server.responses)
+            times = _timed(fn, args.repeat)
+            statuses = ", ".join(
+                f"{n - before.get(code, 0)}× {code}" for code, n in sorted(server.responses.items())
+                if n - before.get(code, 0)
+            )
+            rows.append((name, times, f"{size / min(times) / 1024:,.0f} KiB/s ({statuses})"))
+
+        phase("--no-cache", lambda: _run_main(sync_google_doc_tabs, [*argv, "--no-cache"]))
+        _run_main(sync_google_doc_tabs, argv)
+        phase("unchanged (304)", lambda: _run_main(sync_google_doc_tabs, argv))
+        server.validators = False
+        phase("unchanged (same body)", lambda: _run_main(sync_google_doc_tabs, argv))
+
+        def republish() -> None:
+            server.publish(html.replace("manifesto</span>", f"manifesto {time.perf_counter()}</span>"))
+            _run_main(sync_google_doc_tabs, argv)
+
+        server.validators = True
+        phase("republished", republish)
+
+    print(f"{size / 1024:,.0f} KiB published page, {args.repeat} runs each")
+    _report(rows)
+
+
+def bench_corpus(args: argparse.Namespace) -> None:
+    """Parsed-corpus cache over every site page: cold, warm and touched."""
+    from doc_sync_corpus import Corpus, site_pages
+
+    with tempfile.TemporaryDirectory(prefix="doc-sync-bench-") as tmp:
+        root = Path(tmp)
+        for path in site_pages(REPO_ROOT):
+            shutil.copy2(path, root / path.name)
+        pages = site_pages(root)
+        size = sum(path.stat().st_size for path in pages)
+        cache = root / "corpus.pickle"
+        last: list[Corpus] = []
+
+        def load() -> None:
+            corpus = Corpus(cache, root)
+            list(corpus.pages())
+            corpus.save()
+            last[:] = [corpus]
+
+        def cold() -> None:
+            cache.unlink(missing_ok=True)
+            load()
+
+        def touched() -> None:
+            for path in pages:
+                os.utime(path)
+            load()
+
+        rows = []
+        summaries = []
+        for name, fn in (("cold (parse)", cold), ("warm (stat)", load), ("touched (hash)", touched)):
+            times = _timed(fn, args.repeat)
+            rows.append((name, times, f"{size / min(times) / 1024:,.0f} KiB/s"))
+            summaries.append(f"{name}: {last[0].summary()}")
+
+    print(f"{len(pages)} pages, {size / 1024:,.0f} KiB, {args.repeat} runs each")
+    _report(rows)
+    print("\n".join(summaries))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    sync = sub.add_parser("sync", help=bench_sync.__doc__)
+    sync.add_argument("--repeat", type=int, default=3)
+    sync.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated network latency added to every emulated API call",
+    )
+    sync.set_defaults(func=bench_sync)
+
+    parse = sub.add_parser("parse", help=bench_parse.__doc__)
+    parse.add_argument("--repeat", type=int, default=5)
+    parse.add_argument("--scale", type=int, default=10, help="Also parse each file repeated N times")
+    parse.set_defaults(func=bench_parse)
+
+    tab = sub.add_parser("tab", help=bench_tab.__doc__)
+    tab.add_argument("--repeat", type=int, default=5)
+    tab.add_argument(
+        "--sizes",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1000, 5000, 10000, 50000],
+        help="Comma-separated paragraph counts",
+    )
+    tab.set_defaults(func=bench_tab)
+
+    scrape = sub.add_parser("scrape", help=bench_scrape.__doc__)
+    scrape.add_argument("--repeat", type=int, default=5)
+    scrape.add_argument("--scale", type=int, default=10, help="Also render each tab repeated N times")
+    scrape.set_defaults(func=bench_scrape)
+
+    fetch = sub.add_parser("fetch", help=bench_fetch.__doc__)
+    fetch.add_argument("--repeat", type=int, default=5)
+    fetch.add_argument("--scale", type=int, default=1, help="Repeat each tab's body N times in the page")
+    fetch.set_defaults(func=bench_fetch)
+
+    corpus = sub.add_parser("corpus", help=bench_corpus.__doc__)
+    corpus.add_argument("--repeat", type=int, default=5)
+    corpus.set_defaults(func=bench_corpus)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
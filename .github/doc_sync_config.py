@@ -4,6 +4,12 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
 
 DOC_ID = "1qmurZps5LUyFhjbM1C6DXtWrZvWXDd3rjIXpWsAABO0"
 DOC_ID_TW = "1RPe4yOtWcixia8ludAU0DDLTMcbV1zSKP2isxD_ljIo"
@@ -57,6 +63,12 @@ CONTENT_START: dict[str, str] = {
     "6.md": "Pack 6",
 }
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Local cache for doc-sync runs (pull snapshots etc.); not committed.
+# Anchored to the repository, so every tool shares it whatever the cwd.
+CACHE_DIR = Path(os.environ.get("DOC_SYNC_CACHE_DIR", REPO_ROOT / ".doc-sync-cache"))
+
 
 def doc_id_for(filename: str) -> str:
     """Return the Google Doc ID that owns *filename*."""
@@ -111,6 +123,67 @@ def validate_sync_config() -> None:
         )
 
 
+# ── Compiled sync plan ───────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a synced file lives: its document, tab and managed-content start."""
+    filename: str
+    doc_id: str
+    tab_id: str
+    content_start: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SyncPlan:
+    """The validated configuration compiled into constant-time lookups.
+
+    Build it with ``sync_plan()``, which validates once per process.
+    """
+    routes: dict[str, Route]  # in SYNC_FILES order
+    documents: dict[str, tuple[str, ...]]  # doc ID → its files
+
+    def route(self, filename: str) -> Optional[Route]:
+        return self.routes.get(filename)
+
+    def group(self, paths: Iterable[Path]) -> dict[str, list[Path]]:
+        """Group *paths* by owning document, so each document is fetched once.
+
+        Files without a route fall under DOC_ID (callers warn about them).
+        """
+        groups: dict[str, list[Path]] = {}
+        for path in paths:
+            route = self.routes.get(path.name)
+            groups.setdefault(route.doc_id if route else DOC_ID, []).append(path)
+        return groups
+
+    def to_json(self) -> dict:
+        """The plan for workflow steps (``--json``)."""
+        return {
+            "files": list(self.routes),
+            "documents": {did: list(files) for did, files in self.documents.items()},
+            "routes": {
+                name: {"doc": r.doc_id, "tab": r.tab_id, "contentStart": r.content_start}
+                for name, r in self.routes.items()
+            },
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def sync_plan() -> SyncPlan:
+    """Validate the configuration and compile it; cached for the process."""
+    validate_sync_config()
+    routes = {
+        name: Route(name, doc_id_for(name), TAB_MAP[name], CONTENT_START.get(name))
+        for name in SYNC_FILES
+    }
+    documents: dict[str, list[str]] = {}
+    for route in routes.values():
+        documents.setdefault(route.doc_id, []).append(route.filename)
+    return SyncPlan(routes, {did: tuple(files) for did, files in documents.items()})
+
+
 def get_files_for_shell() -> str:
     """Return synchronized file list in a shell-safe, space-separated format."""
     return " ".join(SYNC_FILES)
@@ -133,6 +206,11 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Print markdown-formatted list for workflow message bodies",
     )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the compiled sync plan (files, documents, routes) as JSON",
+    )
     parser.add_argument(
         "--check",
         action="store_true",
@@ -146,6 +224,8 @@ if __name__ == "__main__":
     if args.check:
         validate_sync_config()
         print("doc-sync config OK")
+    elif args.json:
+        print(json.dumps(sync_plan().to_json(), ensure_ascii=False, separators=(",", ":")))
     elif args.print_files:
         print(get_files_for_shell())
     elif args.print_scope:
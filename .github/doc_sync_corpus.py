@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""The site's markdown pages, parsed once and shared by the Python tools.
+
+The sync scripts, the published-Doc scraper and the site builders in
+``.github/`` read pages through a ``Corpus``.  Each page is split into
+front matter and body and parsed into
+
+* ``fields`` — the front matter's ``key: value`` lines;
+* ``html_blocks`` — the raw ``<div>`` blocks, each with the markdown
+  heading line it follows (what a pull puts back after the Doc's text);
+* ``headings`` — the heading tree: ``#`` headings plus HTML ``<h1>``–
+  ``<h6>`` blocks such as the FAQ questions, with their ``id``;
+* ``paragraphs`` — paragraphs, list items and table cells outside the
+  ``<div>`` blocks, as inline spans (bold, italic, link).
+
+Parsed pages are kept in ``CACHE_DIR/corpus.pickle`` keyed by path, size,
+mtime and SHA-256: a page whose size and mtime are unchanged is not read
+at all, and one that was only touched is read and hashed but not parsed
+again.  ``Corpus.summary()`` reports the hit rate and load time.
+
+Tools that only need a page's markdown as written — front matter and
+``<div>`` blocks included — use ``Corpus.text()``, which never parses
+and never loads the cache.
+
+``python3 .github/doc_sync_corpus.py [FILE ...]`` refreshes the cache for
+every page (or just FILEs) and prints the summary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import pickle
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from doc_sync_config import CACHE_DIR, REPO_ROOT
+from doc_sync_writeback import write_atomic
+
+# Bump when Page or the parse changes, so stale caches are discarded.
+CORPUS_FORMAT = 1
+
+# Files whose mtime is this close to the cache write could still change
+# within the same mtime tick, so they are re-hashed next time.
+_RACY_NS = 2_000_000_000
+
+
+@lru_cache(maxsize=None)
+def _markdown_parser():
+    # Imported on first parse, so cache hits don't need markdown-it.
+    from markdown_it import MarkdownIt
+
+    # markdown-it's default preset, as Eleventy renders the site.
+    return MarkdownIt("commonmark").enable(["table", "strikethrough"])
+
+
+# ── Data types ───────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class Span:
+    """Inline text with its formatting; *link* is the href as written."""
+    text: str
+    bold: bool = False
+    italic: bool = False
+    link: str = ""
+
+
+@dataclass(slots=True)
+class Heading:
+    level: int
+    text: str
+    line: int  # 1-based line in the file
+    anchor: str = ""  # id="…" of an HTML heading
+    children: list[Heading] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Paragraph:
+    line: int  # 1-based line in the file
+    spans: list[Span]
+    heading: int = -1  # index into Page.outline() of the enclosing heading
+    list_item: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(span.text for span in self.spans)
+
+
+@dataclass(slots=True)
+class HtmlBlock:
+    """A ``<div>`` block, verbatim, after the markdown heading *heading*
+    (e.g. ``"## About the Project"``; None before any heading)."""
+    heading: Optional[str]
+    source: str
+    line: int  # 1-based line in the file
+
+
+@dataclass
+class Page:
+    name: str  # path relative to the repository root
+    sha256: str
+    text: str
+    front_matter: str  # "---…---" as written, "" if none
+    fields: dict[str, str]
+    html_blocks: list[HtmlBlock]
+    headings: list[Heading]  # top-level headings; the rest nest in them
+    paragraphs: list[Paragraph]
+
+    @property
+    def body(self) -> str:
+        """The text after the front matter."""
+        return self.text[len(self.front_matter):]
+
+    @property
+    def title(self) -> str:
+        return self.fields.get("title", "")
+
+    @property
+    def url(self) -> str:
+        """The page's path on the site, e.g. ``/faq/``."""
+        stem = Path(self.name).stem
+        return self.fields.get("permalink") or ("/" if stem == "index" else f"/{stem}/")
+
+    def prose(self) -> str:
+        """The body without its ``<div>`` blocks."""
+        lines = self.body.split("\n")
+        first_line = self.front_matter.count("\n") + 1
+        for block in reversed(self.html_blocks):
+            start = block.line - first_line
+            del lines[start:start + block.source.count("\n") + 1]
+        return "\n".join(lines)
+
+    def outline(self) -> list[Heading]:
+        """Every heading in document order."""
+        flat: list[Heading] = []
+        stack = list(reversed(self.headings))
+        while stack:
+            heading = stack.pop()
+            flat.append(heading)
+            stack.extend(reversed(heading.children))
+        return flat
+
+
+# ── Parsing ──────────────────────────────────────────────────────────
+
+
+def split_front_matter(text: str) -> tuple[str, dict[str, str], str]:
+    """Return (front matter as written, its fields, the rest of *text*).
+
+    The front matter runs from a leading ``---`` to the next ``---``;
+    without one the first two are empty.
+    """
+    if not text.startswith("---"):
+        return "", {}, text
+    parts = text.split("---", 2)
+    if len(parts) < 3:
+        return "", {}, text
+
+    fields: dict[str, str] = {}
+    for line in parts[1].strip().splitlines():
+        if ":" in line:
+            key, _, val = line.partition(":")
+            fields[key.strip()] = val.strip().strip("\"'")
+    return "---" + parts[1] + "---", fields, parts[2]
+
+
+_MD_HEADING_RE = re.compile(r"^#{1,6}\s")
+_DIV_OPEN_RE = re.compile(r"<div\b")
+_HTML_HEADING_RE = re.compile(r"<h([1-6])\b([^>]*)>(.*?)</h\1>", re.DOTALL | re.IGNORECASE)
+_ID_RE = re.compile(r"""\bid\s*=\s*["']([^"']*)["']""")
+_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_BOLD_OPEN = re.compile(r"^<(b|strong)\b", re.IGNORECASE)
+_HTML_BOLD_CLOSE = re.compile(r"^</(b|strong)>", re.IGNORECASE)
+_HTML_ITALIC_OPEN = re.compile(r"^<(i|em)\b", re.IGNORECASE)
+_HTML_ITALIC_CLOSE = re.compile(r"^</(i|em)>", re.IGNORECASE)
+_HTML_BREAK = re.compile(r"^<br\b", re.IGNORECASE)
+
+
+def scan_html_blocks(body: str, first_line: int = 1) -> tuple[list[HtmlBlock], list[tuple[int, int]]]:
+    """Collect the ``<div>`` blocks of *body* with their heading anchors.
+
+    Also returns each block's (start, end) body line range, end exclusive,
+    so the markdown inside can be left out of the parse.
+    """
+    blocks: list[HtmlBlock] = []
+    ranges: list[tuple[int, int]] = []
+    depth = 0
+    start = 0
+    block_lines: list[str] = []
+    last_heading: Optional[str] = None
+
+    for number, line in enumerate(body.split("\n")):
+        stripped = line.strip()
+
+        if depth == 0 and _MD_HEADING_RE.match(stripped):
+            last_heading = stripped
+
+        opens = len(_DIV_OPEN_RE.findall(stripped)) if "<div" in stripped else 0
+        closes = stripped.count("</div>")
+
+        if depth > 0 or opens > 0:
+            if not block_lines:
+                start = number
+            block_lines.append(line)
+            depth = max(0, depth + opens - closes)
+            if depth == 0:
+                blocks.append(HtmlBlock(last_heading, "\n".join(block_lines), first_line + start))
+                ranges.append((start, number + 1))
+                block_lines = []
+
+    if block_lines:  # unclosed <div>: it runs to the end of the page
+        ranges.append((start, number + 1))
+    return blocks, ranges
+
+
+def _spans(children) -> list[Span]:
+    """Inline tokens → spans, merging neighbours with the same formatting."""
+    spans: list[Span] = []
+    bold = italic = False
+    link = ""
+
+    def add(text: str) -> None:
+        if spans and (spans[-1].bold, spans[-1].italic, spans[-1].link) == (bold, italic, link):
+            spans[-1].text += text
+        else:
+            spans.append(Span(text, bold, italic, link))
+
+    for tok in children:
+        kind = tok.type
+        if kind == "text" or kind == "code_inline":
+            add(tok.content)
+        elif kind == "softbreak":
+            add(" ")
+        elif kind == "hardbreak":
+            add("\n")
+        elif kind == "strong_open" or kind == "strong_close":
+            bold = kind == "strong_open"
+        elif kind == "em_open" or kind == "em_close":
+            italic = kind == "em_open"
+        elif kind == "link_open":
+            link = tok.attrGet("href") or ""
+        elif kind == "link_close":
+            link = ""
+        elif kind == "html_inline":
+            tag = tok.content
+            if _HTML_BOLD_OPEN.match(tag):
+                bold = True
+            elif _HTML_BOLD_CLOSE.match(tag):
+                bold = False
+            elif _HTML_ITALIC_OPEN.match(tag):
+                italic = True
+            elif _HTML_ITALIC_CLOSE.match(tag):
+                italic = False
+            elif _HTML_BREAK.match(tag):
+                add("\n")
+    return [span for span in spans if span.text]
+
+
+def parse_page(name: str, text: str, sha256: Optional[str] = None) -> Page:
+    """Parse one page's *text*; *name* is its path from the repository root."""
+    front_matter, fields, body = split_front_matter(text)
+    first_line = front_matter.count("\n") + 1  # the body starts on the closing --- line
+    html_blocks, div_ranges = scan_html_blocks(body, first_line)
+    in_div = set()
+    for start, end in div_ranges:
+        in_div.update(range(start, end))
+
+    roots: list[Heading] = []
+    open_headings: list[Heading] = []  # innermost last
+    count = 0  # headings so far (Page.outline() order)
+    paragraphs: list[Paragraph] = []
+    item_depth = 0
+
+    def add_heading(level: int, heading_text: str, line: int, anchor: str = "") -> None:
+        nonlocal count
+        heading = Heading(level, heading_text, first_line + line, anchor)
+        while open_headings and open_headings[-1].level >= level:
+            open_headings.pop()
+        (open_headings[-1].children if open_headings else roots).append(heading)
+        open_headings.append(heading)
+        count += 1
+
+    tokens = _markdown_parser().parse(body)
+    for i, tok in enumerate(tokens):
+        kind = tok.type
+        if kind == "list_item_open":
+            item_depth += 1
+        elif kind == "list_item_close":
+            item_depth -= 1
+        if tok.map is None or tok.map[0] in in_div:
+            continue
+        line = tok.map[0]
+        if kind == "heading_open":
+            inline = tokens[i + 1]
+            add_heading(int(tok.tag[1]), "".join(span.text for span in _spans(inline.children)), line)
+        elif kind == "html_block":
+            m = _HTML_HEADING_RE.match(tok.content.strip())
+            if m:
+                anchor = _ID_RE.search(m.group(2))
+                heading_text = html.unescape(_TAG_RE.sub("", m.group(3))).strip()
+                add_heading(int(m.group(1)), heading_text, line, anchor.group(1) if anchor else "")
+        elif kind == "inline" and tokens[i - 1].type != "heading_open":
+            spans = _spans(tok.children)
+            if spans and any(span.text.strip() for span in spans):
+                paragraphs.append(Paragraph(first_line + line, spans, count - 1, item_depth > 0))
+
+    if sha256 is None:
+        sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return Page(name, sha256, text, front_matter, fields, html_blocks, roots, paragraphs)
+
+
+# ── Cached corpus ────────────────────────────────────────────────────
+
+
+def site_pages(root: Path = REPO_ROOT) -> list[Path]:
+    """The site's markdown pages (``*.md`` and ``tw-*.md`` at the top
+    level, minus what ``.eleventyignore`` lists)."""
+    try:
+        ignored = set((root / ".eleventyignore").read_text(encoding="utf-8").split())
+    except FileNotFoundError:
+        ignored = set()
+    return sorted(path for path in root.glob("*.md") if path.name not in ignored)
+
+
+@dataclass(slots=True)
+class _Entry:
+    size: int
+    mtime_ns: int  # -1: re-hash before trusting (see _RACY_NS)
+    page: Page
+
+
+class Corpus:
+    """Parsed pages, from the on-disk cache where they are unchanged.
+
+    ``page(path)`` returns a page (None if the file does not exist);
+    ``text(path)`` just its text; ``save()`` writes what was parsed back
+    to the cache.
+    """
+
+    def __init__(self, cache: Optional[Path] = None, root: Path = REPO_ROOT):
+        self.root = root
+        self._lock = threading.Lock()  # the pull scripts read from worker threads
+        self.cache = cache if cache is not None else CACHE_DIR / "corpus.pickle"
+        self._entries: Optional[dict[str, _Entry]] = None
+        self._dirty = False
+        self.hits = 0  # size and mtime unchanged
+        self.rehashed = 0  # touched, content unchanged
+        self.parsed = 0
+        self.load_seconds = 0.0
+        self.parse_seconds = 0.0
+
+    def _name(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _load(self) -> dict[str, _Entry]:
+        if self._entries is None:
+            started = time.perf_counter()
+            self._entries = {}
+            try:
+                with open(self.cache, "rb") as fh:
+                    version, entries = pickle.load(fh)
+                if version == CORPUS_FORMAT:
+                    self._entries = entries
+            except FileNotFoundError:
+                pass
+            except Exception as exc:  # a truncated or foreign cache is just a miss
+                print(f"doc-sync warning: ignoring corpus cache {self.cache}: {exc}")
+            self.load_seconds += time.perf_counter() - started
+        return self._entries
+
+    def page(self, path: Path) -> Optional[Page]:
+        with self._lock:
+            return self._page(Path(path))
+
+    def text(self, path: Path) -> Optional[str]:
+        """The text of *path* as written (None if it does not exist).
+
+        Served from a page already in memory when it is unchanged, else
+        read from disk; either way nothing is parsed or cached.
+        """
+        path = Path(path)
+        with self._lock:
+            entry = self._entries.get(self._name(path)) if self._entries is not None else None
+        try:
+            if entry is not None:
+                st = path.stat()
+                if (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                    return entry.page.text
+            return path.read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _page(self, path: Path) -> Optional[Page]:
+        entries = self._load()
+        started = time.perf_counter()
+        name = self._name(path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        entry = entries.get(name)
+        if entry and (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            self.hits += 1
+            self.load_seconds += time.perf_counter() - started
+            return entry.page
+
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry.page.sha256 == digest:
+            self.rehashed += 1
+            page = entry.page
+            self.load_seconds += time.perf_counter() - started
+        else:
+            page = parse_page(name, data.decode("utf-8"), digest)
+            self.parsed += 1
+            self.parse_seconds += time.perf_counter() - started
+        entries[name] = _Entry(st.st_size, st.st_mtime_ns, page)
+        self._dirty = True
+        return page
+
+    def pages(self, paths: Optional[Iterable[Path]] = None) -> Iterator[Page]:
+        """Every site page (or each of *paths* that exists)."""
+        for path in site_pages(self.root) if paths is None else paths:
+            page = self.page(path)
+            if page is not None:
+                yield page
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if not self._dirty:
+            return
+        racy = time.time_ns() - _RACY_NS
+        entries = {
+            name: entry if entry.mtime_ns < racy else _Entry(entry.size, -1, entry.page)
+            for name, entry in self._load().items()
+        }
+        self.cache.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache, pickle.dumps((CORPUS_FORMAT, entries), pickle.HIGHEST_PROTOCOL))
+        self._dirty = False
+
+    def summary(self) -> str:
+        served = self.hits + self.rehashed + self.parsed
+        if not served:
+            return "corpus: no pages read"
+        cached = self.hits + self.rehashed
+        return (
+            f"corpus: {served} pages, {cached} from cache ({cached / served:.0%}"
+            + (f", {self.rehashed} re-hashed" if self.rehashed else "")
+            + f"), {self.parsed} parsed; "
+            f"load {self.load_seconds * 1000:.0f} ms, parse {self.parse_seconds * 1000:.0f} ms"
+        )
+
+
+@lru_cache(maxsize=None)
+def corpus() -> Corpus:
+    """The process's shared ``Corpus`` (callers ``save()`` it when done)."""
+    return Corpus()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="*", type=Path, help="Pages to refresh (default: every site page)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every page again")
+    args = parser.parse_args()
+
+    pages_corpus = corpus()
+    if args.no_cache:
+        pages_corpus._entries = {}
+    pages = list(pages_corpus.pages(args.files or None))
+    pages_corpus.save()
+    headings = sum(len(page.outline()) for page in pages)
+    paragraphs = sum(len(page.paragraphs) for page in pages)
+    print(f"{len(pages)} pages, {headings} headings, {paragraphs} paragraphs")
+    print(pages_corpus.summary())
+
+
+if __name__ == "__main__":
+    # Run through the module so the cache pickles classes under its
+    # importable name rather than __main__.
+    import doc_sync_corpus
+
+    doc_sync_corpus.main()
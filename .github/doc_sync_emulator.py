@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""In-memory stand-in for the Google Docs API used by the sync scripts.
+
+Keeps tabbed documents in memory and implements the subset of
+``documents().get`` / ``documents().batchUpdate`` that the sync scripts
+issue, with Docs index semantics: indices count UTF-16 code units, index 0
+is the tab's section break, and the final newline of a tab can never be
+deleted.
+
+Use ``EmulatedDocsService`` anywhere ``build_docs_service()`` returns a
+service; ``DOC_SYNC_EMULATOR=<snapshot.json>`` makes ``build_docs_service``
+return one seeded from a JSON snapshot (see ``save`` / ``load``).
+
+``PublishedDocServer`` stands in for the published (``/pub``) page that
+``sync_google_doc_tabs.py`` scrapes, serving a fixture over local HTTP.
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import copy
+import email.utils
+import gzip
+import hashlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+ORDERED_PRESETS = {"NUMBERED_DECIMAL_ALPHA_ROMAN"}
+
+
+# google.rpc status names of the HTTP errors the emulator raises.
+_RPC_STATUS = {
+    400: "INVALID_ARGUMENT", 404: "NOT_FOUND", 408: "DEADLINE_EXCEEDED",
+    429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 502: "UNAVAILABLE",
+    503: "UNAVAILABLE", 504: "DEADLINE_EXCEEDED",
+}
+
+
+class EmulatorError(Exception):
+    """A request the real API would reject (HTTP 400 unless *status* says
+    otherwise).
+
+    Carries the JSON error body in ``content``, shaped like the API's
+    ``{"error": {"code", "message", "status"}}``, as ``HttpError`` does.
+    """
+
+    def __init__(self, message: str, status: int = 400, rpc_status: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.content = json.dumps({"error": {
+            "code": status,
+            "message": message,
+            "status": rpc_status or _RPC_STATUS.get(status, "UNKNOWN"),
+        }}).encode("utf-8")
+        self.error_details: list = []
+
+
+# ── Document model ───────────────────────────────────────────────────
+
+
+@dataclass
+class _Para:
+    """Paragraph attributes, stored on the paragraph's closing newline."""
+    style: str = "NORMAL_TEXT"
+    bullet: Optional[tuple[str, int]] = None  # (listId, nestingLevel)
+
+
+@dataclass
+class EmulatedTab:
+    """One tab body as a flat list of UTF-16 code units.
+
+    ``units[i]`` is document index ``i + 1``.  The second half of a
+    surrogate pair is stored as ``""`` so that joining the list yields
+    the original text while ``len(units)`` matches Docs indices.
+    """
+    tab_id: str
+    title: str = ""
+    units: list[str] = field(default_factory=lambda: ["\n"])
+    styles: list[dict] = field(default_factory=lambda: [{}])
+    paras: list[Optional[_Para]] = field(default_factory=lambda: [_Para()])
+    lists: dict[str, dict] = field(default_factory=dict)
+    children: list["EmulatedTab"] = field(default_factory=list)
+
+    @property
+    def end_index(self) -> int:
+        return len(self.units) + 1
+
+    def _para_at(self, index: int) -> _Para:
+        """Attributes of the paragraph containing document *index*."""
+        pos = index - 1
+        while pos < len(self.units) and self.units[pos] != "\n":
+            pos += 1
+        return self.paras[min(pos, len(self.units) - 1)]
+
+    def _check_range(self, start: int, end: int) -> None:
+        if not 1 <= start <= end <= self.end_index:
+            raise EmulatorError(
+                f"Invalid range {start}-{end} in tab {self.tab_id} "
+                f"(end index {self.end_index})"
+            )
+
+    # ── edits ──
+
+    def insert_text(self, index: int, text: str) -> None:
+        if not 1 <= index < self.end_index:
+            raise EmulatorError(f"Insertion index {index} out of bounds in tab {self.tab_id}")
+        pos = index - 1
+        base_para = self._para_at(index)
+        # inserted text picks up the style of the preceding character
+        # within the same paragraph, else of the following one
+        if pos > 0 and self.units[pos - 1] != "\n":
+            inherited = self.styles[pos - 1]
+        else:
+            inherited = self.styles[pos]
+        units: list[str] = []
+        for ch in text:
+            units.append(ch)
+            if ord(ch) > 0xFFFF:
+                units.append("")
+        self.units[pos:pos] = units
+        self.styles[pos:pos] = [dict(inherited) for _ in units]
+        self.paras[pos:pos] = [
+            copy.deepcopy(base_para) if u == "\n" else None for u in units
+        ]
+
+    def delete_range(self, start: int, end: int) -> None:
+        self._check_range(start, end)
+        if end >= self.end_index:
+            raise EmulatorError(
+                f"Cannot delete the final newline of tab {self.tab_id}"
+            )
+        if start == end:
+            raise EmulatorError("The range should not be empty.")
+        lo, hi = start - 1, end - 1
+        del self.units[lo:hi]
+        del self.styles[lo:hi]
+        del self.paras[lo:hi]
+
+    def _para_positions(self, start: int, end: int) -> list[int]:
+        """Newline positions of paragraphs overlapping [start, end)."""
+        self._check_range(start, end)
+        positions = []
+        pos = start - 1
+        while pos < len(self.units):
+            if self.units[pos] == "\n":
+                positions.append(pos)
+                if pos >= end - 2:
+                    break
+            pos += 1
+        return positions
+
+    def update_paragraph_style(self, start: int, end: int, style: dict, fields: str) -> None:
+        if "namedStyleType" not in fields.split(","):
+            return
+        for pos in self._para_positions(start, end):
+            self.paras[pos].style = style.get("namedStyleType", "NORMAL_TEXT")
+
+    def update_text_style(self, start: int, end: int, style: dict, fields: str) -> None:
+        self._check_range(start, end)
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        for pos in range(start - 1, end - 1):
+            current = self.styles[pos]
+            for name in names:
+                if name in style and style[name] not in (False, None):
+                    current[name] = copy.deepcopy(style[name])
+                else:
+                    current.pop(name, None)
+
+    def create_bullets(self, start: int, end: int, preset: str, list_id: str) -> None:
+        ordered = preset in ORDERED_PRESETS
+        level = {"glyphType": "DECIMAL", "glyphFormat": "%0."} if ordered else {"glyphSymbol": "●"}
+        self.lists[list_id] = {"listProperties": {"nestingLevels": [level]}}
+        for pos in self._para_positions(start, end):
+            self.paras[pos].bullet = (list_id, 0)
+
+    def delete_bullets(self, start: int, end: int) -> None:
+        for pos in self._para_positions(start, end):
+            self.paras[pos].bullet = None
+
+    # ── serialisation ──
+
+    def text(self) -> str:
+        return "".join(self.units)
+
+    def body(self) -> dict:
+        content: list[dict] = [{"endIndex": 1, "sectionBreak": {}}]
+        para_start = 0
+        for pos, unit in enumerate(self.units):
+            if unit != "\n":
+                continue
+            elements: list[dict] = []
+            run_start = para_start
+            for i in range(para_start, pos + 1):
+                if i == pos or self.styles[i + 1] != self.styles[run_start]:
+                    elements.append({
+                        "startIndex": run_start + 1,
+                        "endIndex": i + 2,
+                        "textRun": {
+                            "content": "".join(self.units[run_start:i + 1]),
+                            "textStyle": copy.deepcopy(self.styles[run_start]),
+                        },
+                    })
+                    run_start = i + 1
+            attrs = self.paras[pos]
+            paragraph: dict = {
+                "elements": elements,
+                "paragraphStyle": {"namedStyleType": attrs.style},
+            }
+            if attrs.bullet:
+                paragraph["bullet"] = {"listId": attrs.bullet[0]}
+                if attrs.bullet[1]:
+                    paragraph["bullet"]["nestingLevel"] = attrs.bullet[1]
+            content.append({
+                "startIndex": para_start + 1,
+                "endIndex": pos + 2,
+                "paragraph": paragraph,
+            })
+            para_start = pos + 1
+        return {"content": content}
+
+    def to_json(self) -> dict:
+        used = {p.bullet[0] for p in self.paras if p and p.bullet}
+        return {
+            "tabProperties": {"tabId": self.tab_id, "title": self.title},
+            "documentTab": {
+                "body": self.body(),
+                "lists": {k: copy.deepcopy(v) for k, v in self.lists.items() if k in used},
+            },
+            "childTabs": [child.to_json() for child in self.children],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "EmulatedTab":
+        props = data.get("tabProperties", {})
+        tab = cls(props["tabId"], props.get("title", ""), [], [], [])
+        doc_tab = data.get("documentTab", {})
+        tab.lists = copy.deepcopy(doc_tab.get("lists", {}))
+        for elem in doc_tab.get("body", {}).get("content", []):
+            para = elem.get("paragraph")
+            if not para:
+                continue
+            for el in para.get("elements", []):
+                run = el.get("textRun")
+                if not run:
+                    continue
+                for ch in run.get("content", ""):
+                    tab.units.append(ch)
+                    tab.styles.append(copy.deepcopy(run.get("textStyle", {})))
+                    tab.paras.append(None)
+                    if ord(ch) > 0xFFFF:
+                        tab.units.append("")
+                        tab.styles.append(copy.deepcopy(run.get("textStyle", {})))
+                        tab.paras.append(None)
+            bullet = para.get("bullet")
+            tab.paras[-1] = _Para(
+                para.get("paragraphStyle", {}).get("namedStyleType", "NORMAL_TEXT"),
+                (bullet["listId"], bullet.get("nestingLevel", 0)) if bullet else None,
+            )
+        if not tab.units:
+            tab.units, tab.styles, tab.paras = ["\n"], [{}], [_Para()]
+        tab.children = [cls.from_json(c) for c in data.get("childTabs", [])]
+        return tab
+
+
+@dataclass
+class EmulatedDocument:
+    document_id: str
+    title: str = ""
+    tabs: list[EmulatedTab] = field(default_factory=list)
+    revision: int = 1
+
+    @property
+    def revision_id(self) -> str:
+        return f"emu-{self.document_id[:8]}-{self.revision:06d}"
+
+    def find_tab(self, tab_id: str) -> Optional[EmulatedTab]:
+        stack = list(self.tabs)
+        while stack:
+            tab = stack.pop()
+            if tab.tab_id == tab_id:
+                return tab
+            stack.extend(tab.children)
+        return None
+
+    def add_tab(self, tab_id: str, text: str = "", title: str = "") -> EmulatedTab:
+        """Append a tab whose body is *text* as plain NORMAL_TEXT paragraphs."""
+        tab = EmulatedTab(tab_id, title)
+        if text:
+            tab.insert_text(1, text)
+        self.tabs.append(tab)
+        return tab
+
+    def to_json(self) -> dict:
+        return {
+            "documentId": self.document_id,
+            "title": self.title,
+            "revisionId": self.revision_id,
+            "tabs": [tab.to_json() for tab in self.tabs],
+        }
+
+
+# ── Request application ──────────────────────────────────────────────
+
+
+def _range(req: dict) -> tuple[str, int, int]:
+    rng = req["range"]
+    return rng.get("tabId", ""), rng["startIndex"], rng["endIndex"]
+
+
+def _apply(doc: EmulatedDocument, request: dict, new_list_id) -> dict:
+    (kind, req), = request.items()
+
+    def tab_for(tab_id: str) -> EmulatedTab:
+        tab = doc.find_tab(tab_id) if tab_id else (doc.tabs[0] if doc.tabs else None)
+        if tab is None:
+            raise EmulatorError(f"Tab not found: {tab_id}")
+        return tab
+
+    if kind == "insertText":
+        loc = req["location"]
+        tab_for(loc.get("tabId", "")).insert_text(loc["index"], req["text"])
+    elif kind == "deleteContentRange":
+        tab_id, start, end = _range(req)
+        tab_for(tab_id).delete_range(start, end)
+    elif kind == "updateParagraphStyle":
+        tab_id, start, end = _range(req)
+        tab_for(tab_id).update_paragraph_style(start, end, req["paragraphStyle"], req["fields"])
+    elif kind == "updateTextStyle":
+        tab_id, start, end = _range(req)
+        tab_for(tab_id).update_text_style(start, end, req["textStyle"], req["fields"])
+    elif kind == "createParagraphBullets":
+        tab_id, start, end = _range(req)
+        tab_for(tab_id).create_bullets(start, end, req["bulletPreset"], new_list_id())
+    elif kind == "deleteParagraphBullets":
+        tab_id, start, end = _range(req)
+        tab_for(tab_id).delete_bullets(start, end)
+    else:
+        raise EmulatorError(f"Unsupported request: {kind}")
+    return {}
+
+
+# ── Field masks ──────────────────────────────────────────────────────
+
+
+def _parse_mask(mask: str) -> dict:
+    """Parse a partial-response mask (``a,b/c,d(e,f)``) into a tree.
+
+    Leaves map to ``None`` (keep the whole value).
+    """
+    pos = 0
+
+    def parse_items(end_char: str) -> dict:
+        nonlocal pos
+        items: dict = {}
+        while pos < len(mask) and mask[pos] != end_char:
+            start = pos
+            while pos < len(mask) and mask[pos] not in ",()":
+                pos += 1
+            path = [p for p in mask[start:pos].strip().split("/") if p]
+            sub = None
+            if pos < len(mask) and mask[pos] == "(":
+                pos += 1
+                sub = parse_items(")")
+                pos += 1  # ")"
+            node = items
+            for name in path[:-1]:
+                if node.get(name) is None:
+                    node[name] = {}
+                node = node[name]
+            if path:
+                leaf = path[-1]
+                if leaf in node and node[leaf] is not None and sub is not None:
+                    node[leaf].update(sub)
+                elif leaf not in node or sub is None:
+                    node[leaf] = sub
+            if pos < len(mask) and mask[pos] == ",":
+                pos += 1
+        return items
+
+    return parse_items("")
+
+
+def _apply_mask(data, tree: Optional[dict]):
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [_apply_mask(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {k: _apply_mask(data[k], sub) for k, sub in tree.items() if k in data}
+    return data
+
+
+# ── Service facade ───────────────────────────────────────────────────
+
+
+class _Call:
+    """Mimics googleapiclient's HttpRequest: work happens in execute()."""
+
+    def __init__(self, fn, service: "EmulatedDocsService"):
+        self._fn = fn
+        self._service = service
+
+    def execute(self, num_retries: int = 0):
+        if self._service.latency:
+            time.sleep(self._service.latency)  # simulated network round trip
+        if self._service.faults:
+            fault = self._service.faults.pop(0)
+            if callable(fault):
+                fault()
+            elif fault:
+                raise EmulatorError(f"Injected HTTP {fault}", fault)
+        return self._fn()
+
+
+class _Documents:
+    def __init__(self, service: "EmulatedDocsService"):
+        self._service = service
+
+    def get(
+        self,
+        documentId: str,
+        includeTabsContent: bool = False,
+        fields: Optional[str] = None,
+        **_kwargs,
+    ) -> _Call:
+        def run() -> dict:
+            service = self._service
+            service.calls.append(("get", documentId))
+            doc = service.document(documentId)
+            data = doc.to_json()
+            if not includeTabsContent:
+                first = data["tabs"][0] if data["tabs"] else {}
+                data = {k: v for k, v in data.items() if k != "tabs"}
+                data["body"] = first.get("documentTab", {}).get("body", {})
+            if fields:
+                data = _apply_mask(data, _parse_mask(fields))
+            service.bytes_out += len(json.dumps(data))
+            return data
+        return _Call(run, self._service)
+
+    def batchUpdate(self, documentId: str, body: dict) -> _Call:
+        def run() -> dict:
+            service = self._service
+            service.calls.append(("batchUpdate", documentId))
+            doc = service.document(documentId)
+            required = body.get("writeControl", {}).get("requiredRevisionId")
+            if required and required != doc.revision_id:
+                raise EmulatorError(
+                    f"Document {documentId} was modified (revision {doc.revision_id}, "
+                    f"required {required})",
+                    rpc_status="FAILED_PRECONDITION",
+                )
+            requests = body.get("requests", [])
+            if not requests:
+                raise EmulatorError("Must specify at least one request.")
+            service.bytes_in += len(json.dumps(body))
+            service.requests_applied += len(requests)
+            # batchUpdate is atomic: apply to a copy, commit on success
+            work = copy.deepcopy(doc)
+            replies = [_apply(work, req, service.new_list_id) for req in requests]
+            work.revision += 1
+            service.documents_by_id[documentId] = work
+            return {
+                "documentId": documentId,
+                "replies": replies,
+                "writeControl": {"requiredRevisionId": work.revision_id},
+            }
+        return _Call(run, self._service)
+
+
+class EmulatedDocsService:
+    """Drop-in for the ``googleapiclient`` Docs v1 resource."""
+
+    def __init__(
+        self,
+        documents: Optional[list[EmulatedDocument]] = None,
+        latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.documents_by_id: dict[str, EmulatedDocument] = {
+            doc.document_id: doc for doc in documents or []
+        }
+        # itertools.count is safe to advance from several threads
+        self._list_counter = itertools.count(1)
+        self.calls: list[tuple[str, str]] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.requests_applied = 0
+        # Faults to inject, consumed one per call: an HTTP status to fail
+        # with, a callable run before the call (e.g. a concurrent edit), or
+        # None to let the call through.
+        self.faults: list = []
+
+    def documents(self) -> _Documents:
+        return _Documents(self)
+
+    def new_list_id(self) -> str:
+        return f"kix.emu{next(self._list_counter)}"
+
+    def document(self, document_id: str) -> EmulatedDocument:
+        try:
+            return self.documents_by_id[document_id]
+        except KeyError:
+            raise EmulatorError(f"Requested entity was not found: {document_id}", 404) from None
+
+    def add_document(self, document_id: str, title: str = "") -> EmulatedDocument:
+        doc = EmulatedDocument(document_id, title)
+        self.documents_by_id[document_id] = doc
+        return doc
+
+    def save(self, path: Path) -> None:
+        data = [doc.to_json() for doc in self.documents_by_id.values()]
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "EmulatedDocsService":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        docs = []
+        for item in data:
+            doc = EmulatedDocument(item["documentId"], item.get("title", ""))
+            doc.tabs = [EmulatedTab.from_json(t) for t in item.get("tabs", [])]
+            docs.append(doc)
+        return cls(docs)
+
+
+def service_for_sync_files(
+    texts: Optional[dict[str, str]] = None,
+    latency: float = 0.0,
+) -> EmulatedDocsService:
+    """Return a service with one empty tab per synced file.
+
+    *texts* optionally seeds tabs with plain text, keyed by filename;
+    *latency* adds a simulated round trip (seconds) to every call.
+    """
+    from doc_sync_config import sync_plan
+
+    service = EmulatedDocsService(latency=latency)
+    for filename, route in sync_plan().routes.items():
+        doc = service.documents_by_id.get(route.doc_id) or service.add_document(route.doc_id)
+        doc.add_tab(route.tab_id, (texts or {}).get(filename, ""), title=filename)
+    return service
+
+
+def open_snapshot(path: Path) -> EmulatedDocsService:
+    """Load the emulator state from *path* and save it back at exit.
+
+    A missing snapshot starts from one empty tab per synced file.
+    """
+    service = EmulatedDocsService.load(path) if path.exists() else service_for_sync_files()
+    atexit.register(service.save, path)
+    return service
+
+
+# ── Published page ───────────────────────────────────────────────────
+
+
+class PublishedDocServer:
+    """Serves a fixture of the published Doc page on localhost.
+
+    Answers conditional GETs like Google's front end (``ETag`` /
+    ``Last-Modified``, 304 when they match) and counts responses by
+    status in ``responses``.  With ``validators=False`` it sends neither
+    header, so clients must fall back to comparing bodies.  With
+    ``compress=True`` it gzips the body for clients that accept it.
+    ``faults`` lists statuses to answer with instead, consumed one per
+    request (None lets a request through).  Use as a context manager;
+    ``url`` is the page address.
+    """
+
+    def __init__(self, html: str, validators: bool = True, compress: bool = False):
+        self.validators = validators
+        self.compress = compress
+        self.faults: list[Optional[int]] = []
+        self.responses: collections.Counter[int] = collections.Counter()
+        self.publish(html)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                fault = server.faults.pop(0) if server.faults else None
+                if fault:
+                    server.responses[fault] += 1
+                    self.send_error(fault)
+                    return
+                body, etag, modified = server.body, server.etag, server.last_modified
+                # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+                if not server.validators:
+                    fresh = False
+                elif "If-None-Match" in self.headers:
+                    fresh = self.headers["If-None-Match"] == etag
+                else:
+                    fresh = self.headers.get("If-Modified-Since") == modified
+                status = 304 if fresh else 200
+                server.responses[status] += 1
+                self.send_response(status)
+                if server.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", modified)
+                if fresh:
+                    self.end_headers()
+                    return
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if server.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/pub"
+        # a short poll interval keeps shutdown (each __exit__) quick
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def publish(self, html: str) -> None:
+        """Replace the page, as re-publishing the Doc would."""
+        self.body = html.encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        self.last_modified = email.utils.formatdate(usegmt=True)
+
+    def __enter__(self) -> "PublishedDocServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,226 @@
+"""Execution helpers shared by the doc-sync scripts.
+
+``run_per_document`` runs each Google Doc's work in its own worker
+thread, so a document's API calls stay serialised while different
+documents (EN and TW) overlap.  Workers hand their output lines to a
+``log`` callback; the lines are printed in document order once all
+workers finish, and errors are collected rather than interrupting the
+other documents.
+
+``ApiExecutor`` executes individual Docs API calls, retrying quota
+(429), server (5xx) and network errors with exponential backoff, and
+turns a ``writeControl.requiredRevisionId`` mismatch into
+``RevisionConflict`` so callers can re-fetch and re-plan instead of
+overwriting a concurrent edit.  It records per-call latency and retries.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+MAX_WORKERS = int(os.environ.get("DOC_SYNC_WORKERS", "4"))
+
+Log = Callable[[str], None]  # receives a worker's output, one line per call
+
+
+def run_per_document(
+    groups: dict[str, list],
+    work: Callable[[str, list, Log], T],
+    max_workers: Optional[int] = None,
+) -> list[T]:
+    """Call ``work(doc_id, targets, log)`` for every group, one thread per doc.
+
+    *work* reports through ``log(line)`` rather than printing; the lines
+    are printed from the calling thread, in the order of *groups*, once
+    every document is done (straight away when there is one worker).
+    Returns results in the order of *groups*.  If any document failed,
+    the other documents still complete; their output is printed and the
+    first error is re-raised afterwards.
+    """
+    workers = max(1, min(len(groups), max_workers or MAX_WORKERS))
+    if workers == 1:
+        return [work(did, targets, print) for did, targets in groups.items()]
+
+    output: dict[str, list[str]] = {did: [] for did in groups}
+
+    def run(did: str, targets: list) -> tuple[Optional[T], Optional[BaseException]]:
+        try:
+            return work(did, targets, output[did].append), None
+        except BaseException as exc:  # noqa: BLE001 — re-raised below
+            return None, exc
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doc-sync") as pool:
+        futures = [pool.submit(run, did, targets) for did, targets in groups.items()]
+        outcomes = [future.result() for future in futures]
+
+    results: list[T] = []
+    errors: list[tuple[str, BaseException]] = []
+    for did, (result, exc) in zip(groups, outcomes):
+        for line in output[did]:
+            print(line)
+        if exc is not None:
+            errors.append((did, exc))
+        results.append(result)
+    sys.stdout.flush()
+
+    for did, exc in errors[1:]:
+        print(f"doc-sync error: {did}: {exc}", file=sys.stderr)
+    if errors:
+        raise errors[0][1]
+    return results
+
+
+# ── API call execution ───────────────────────────────────────────────
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 6
+BASE_DELAY = 1.0  # seconds; doubled on each retry
+MAX_DELAY = 32.0
+
+
+class RevisionConflict(Exception):
+    """The document changed since it was fetched; re-fetch and re-plan."""
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status of an API error (googleapiclient or emulator)."""
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None) or getattr(exc, "status", None)
+    return int(status) if status else None
+
+
+def _rpc_status(exc: BaseException) -> str:
+    """The ``error.status`` of an API error's JSON body (e.g.
+    ``FAILED_PRECONDITION``), or "" if it has none."""
+    content = getattr(exc, "content", None)
+    if not content:
+        return ""
+    try:
+        error = json.loads(content).get("error", {})
+    except (ValueError, AttributeError):
+        return ""
+    return error.get("status", "") if isinstance(error, dict) else ""
+
+
+def _is_network_error(exc: BaseException) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError, socket.timeout)):
+        return True
+    # httplib2 transport errors, without importing httplib2 here
+    return any(cls.__name__ == "HttpLib2Error" for cls in type(exc).__mro__)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    resp = getattr(exc, "resp", None)
+    value = resp.get("retry-after") if hasattr(resp, "get") else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class _CallStats:
+    latencies: list[float] = field(default_factory=list)
+    retries: int = 0
+    conflicts: int = 0
+    failures: int = 0
+
+
+@dataclass
+class ApiExecutor:
+    """Executes Docs API requests with retries and records metrics.
+
+    Safe to share between worker threads.
+    """
+    max_attempts: int = MAX_ATTEMPTS
+    base_delay: float = BASE_DELAY
+    max_delay: float = MAX_DELAY
+    sleep: Callable[[float], None] = time.sleep
+    stats: dict[str, _CallStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _record(
+        self,
+        kind: str,
+        latency: Optional[float] = None,
+        retry: bool = False,
+        conflict: bool = False,
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(kind, _CallStats())
+            if latency is not None:
+                stats.latencies.append(latency)
+            stats.retries += retry
+            stats.conflicts += conflict
+            stats.failures += failed
+
+    def execute(self, kind: str, request) -> dict:
+        """Run ``request.execute()``, retrying transient failures.
+
+        Raises ``RevisionConflict`` when a ``requiredRevisionId`` no
+        longer matches the document.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.perf_counter()
+            try:
+                result = request.execute()
+            except Exception as exc:
+                self._record(kind, time.perf_counter() - started)
+                status = _status_of(exc)
+                # A failed writeControl.requiredRevisionId comes back as
+                # 400 FAILED_PRECONDITION.
+                if status == 400 and _rpc_status(exc) == "FAILED_PRECONDITION":
+                    self._record(kind, conflict=True)
+                    raise RevisionConflict(str(exc)) from exc
+                transient = status in RETRYABLE_STATUS or (status is None and _is_network_error(exc))
+                if not transient or attempt == self.max_attempts:
+                    self._record(kind, failed=True)
+                    raise
+                delay = _retry_after(exc)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                self._record(kind, retry=True)
+                print(
+                    f"doc-sync: {kind} failed ({status or type(exc).__name__}), "
+                    f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s",
+                    file=sys.stderr,
+                )
+                self.sleep(delay)
+                continue
+            self._record(kind, time.perf_counter() - started)
+            return result
+        raise AssertionError("unreachable")
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = []
+            for kind, s in self.stats.items():
+                if not s.latencies:
+                    continue
+                part = (
+                    f"{kind} {len(s.latencies)}× "
+                    f"p50 {statistics.median(s.latencies) * 1000:,.0f} ms "
+                    f"max {max(s.latencies) * 1000:,.0f} ms"
+                )
+                if s.retries:
+                    part += f", {s.retries} retries"
+                if s.conflicts:
+                    part += f", {s.conflicts} revision conflicts"
+                if s.failures:
+                    part += f", {s.failures} failed"
+                parts.append(part)
+        return "api: " + ("; ".join(parts) if parts else "no calls")
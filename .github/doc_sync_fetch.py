@@ -0,0 +1,144 @@
+"""Field-masked Google Docs fetches shared by the sync scripts.
+
+``documents().get`` cannot be limited to particular tabs, but a ``fields``
+mask can drop everything the sync scripts never read (fonts, colours,
+positioned objects, headers, suggestions, …).  Each operation asks only for
+what it uses:
+
+* ``revision``  — ``revisionId`` alone, for cache checks;
+* ``tab_ids``   — the tab tree without content, cached on disk per doc;
+* ``content``   — paragraph text, named styles, bullets, bold/italic,
+  link URLs and indices for every tab, returned as a ``FetchedDocument``
+  whose tabs are indexed by ID once, at fetch time.
+
+Calls go through an ``ApiExecutor`` (retries, latency metrics) and
+record payload bytes and latency; ``summary()`` reports them.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+
+from doc_sync_config import CACHE_DIR
+from doc_sync_executor import ApiExecutor
+from doc_sync_telemetry import Telemetry
+from doc_sync_writeback import write_atomic
+
+# Docs tabs nest at most three levels deep.
+_TAB_DEPTH = 3
+
+_CONTENT_FIELDS = (
+    "documentTab("
+    "body(content(startIndex,endIndex,paragraph("
+    "elements(startIndex,endIndex,textRun(content,textStyle(bold,italic,link(url)))),"
+    "paragraphStyle(namedStyleType),bullet(listId,nestingLevel)))),"
+    "lists)"
+)
+
+
+def _tabs_mask(tab_fields: str, depth: int = _TAB_DEPTH) -> str:
+    inner = tab_fields
+    for _ in range(depth - 1):
+        inner = f"{tab_fields},childTabs({inner})"
+    return f"tabs({inner})"
+
+
+REVISION_FIELDS = "revisionId"
+TAB_IDS_FIELDS = "revisionId," + _tabs_mask("tabProperties(tabId,title)")
+CONTENT_FIELDS = "revisionId," + _tabs_mask("tabProperties(tabId)," + _CONTENT_FIELDS)
+
+
+@dataclass(frozen=True)
+class FetchedDocument:
+    """A fetched document: its revision and every tab in its tree by ID."""
+    revision_id: str
+    tabs: dict[str, dict]
+
+    @classmethod
+    def index(cls, doc: dict) -> "FetchedDocument":
+        """Walk *doc*'s tab tree once (the first of duplicate IDs wins)."""
+        tabs: dict[str, dict] = {}
+        stack = list(reversed(doc.get("tabs", [])))
+        while stack:
+            tab = stack.pop()
+            tabs.setdefault(tab["tabProperties"]["tabId"], tab)
+            stack.extend(reversed(tab.get("childTabs", [])))
+        return cls(doc.get("revisionId", ""), tabs)
+
+
+@dataclass
+class FetchStats:
+    calls: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class DocFetcher:
+    """Wraps a Docs service with field-masked, measured ``get`` calls."""
+    service: object
+    executor: ApiExecutor = field(default_factory=ApiExecutor)
+    telemetry: Telemetry = field(default_factory=Telemetry)
+    stats: dict[str, FetchStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def for_service(self, service: object) -> "DocFetcher":
+        """Return a fetcher for another (per-thread) service sharing these stats."""
+        return DocFetcher(service, self.executor, self.telemetry, self.stats, self._lock)
+
+    def _get(self, kind: str, document_id: str, fields: str, tabs: bool) -> dict:
+        started = time.perf_counter()
+        doc = self.executor.execute("get", self.service.documents().get(
+            documentId=document_id,
+            includeTabsContent=tabs,
+            fields=fields,
+        ))
+        elapsed = time.perf_counter() - started
+        size = len(json.dumps(doc, ensure_ascii=False).encode("utf-8"))
+        self.telemetry.record(f"fetch {kind}", elapsed, document_id, bytes=size)
+        with self._lock:
+            stats = self.stats.setdefault(kind, FetchStats())
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.bytes += size
+        return doc
+
+    def revision(self, document_id: str) -> str:
+        return self._get("revision", document_id, REVISION_FIELDS, False).get("revisionId", "")
+
+    def tab_ids(self, document_id: str, refresh: bool = False) -> set[str]:
+        """Return every tab ID in the document, cached across runs."""
+        path = CACHE_DIR / f"{document_id}.tabs.json"
+        if not refresh:
+            try:
+                return set(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                pass
+        doc = self._get("tab_ids", document_id, TAB_IDS_FIELDS, True)
+        ids = set(FetchedDocument.index(doc).tabs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(sorted(ids)).encode("utf-8"))
+        return ids
+
+    def present_tabs(self, document_id: str, wanted: set[str]) -> set[str]:
+        """Return the subset of *wanted* tab IDs the document has.
+
+        Uses the cached tab list, re-discovering once if it looks stale.
+        """
+        known = self.tab_ids(document_id)
+        if not wanted <= known:
+            known = self.tab_ids(document_id, refresh=True)
+        return wanted & known
+
+    def content(self, document_id: str) -> FetchedDocument:
+        return FetchedDocument.index(self._get("content", document_id, CONTENT_FIELDS, True))
+
+    def summary(self) -> str:
+        parts = [
+            f"{kind} {s.calls}× {s.bytes / 1024:,.1f} KiB {s.seconds * 1000:,.0f} ms"
+            for kind, s in self.stats.items()
+        ]
+        return "fetch: " + ("; ".join(parts) if parts else "none")
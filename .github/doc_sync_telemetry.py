@@ -0,0 +1,118 @@
+"""Phase-level timing telemetry for doc-sync runs.
+
+The sync scripts time each phase (OAuth, fetch, parse, build,
+batchUpdate, …) per document and per file, along with request counts and
+payload sizes.  At the end of a run ``Telemetry.write()`` emits:
+
+* one JSON object per measurement, appended to the file named by
+  ``DOC_SYNC_TELEMETRY`` (if set), so runs can be compared over time;
+* a Markdown table appended to ``$GITHUB_STEP_SUMMARY`` (if set).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+
+@dataclass
+class Event:
+    phase: str
+    seconds: float
+    doc: str = ""
+    file: str = ""
+    requests: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class Telemetry:
+    """Collects phase timings; safe to share between worker threads."""
+    script: str = ""
+    events: list[Event] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, phase: str, seconds: float, doc: str = "", file: str = "", requests: int = 0, bytes: int = 0) -> None:
+        with self._lock:
+            self.events.append(Event(phase, seconds, doc, file, requests, bytes))
+
+    @contextlib.contextmanager
+    def phase(self, phase: str, doc: str = "", file: str = "") -> Iterator[Event]:
+        """Time the ``with`` body; set ``requests``/``bytes`` on the yielded event."""
+        event = Event(phase, 0.0, doc, file)
+        started = time.perf_counter()
+        try:
+            yield event
+        finally:
+            event.seconds = time.perf_counter() - started
+            with self._lock:
+                self.events.append(event)
+
+    def rows(self, by_phase: bool = False) -> list[Event]:
+        """Events summed per (phase, doc, file), or per phase, in first-seen order."""
+        totals: dict[tuple[str, ...], Event] = {}
+        with self._lock:
+            for e in self.events:
+                key = (e.phase,) if by_phase else (e.phase, e.doc, e.file)
+                row = totals.setdefault(key, Event(e.phase, 0.0, *key[1:]))
+                row.seconds += e.seconds
+                row.requests += e.requests
+                row.bytes += e.bytes
+        return list(totals.values())
+
+    def markdown(self) -> str:
+        """Per-phase totals, then a collapsed per-document/per-file table."""
+        def cells(row: Event) -> str:
+            size = f"{row.bytes / 1024:,.1f}" if row.bytes else ""
+            return f"{row.seconds * 1000:,.1f} | {row.requests or ''} | {size} |"
+
+        elapsed = time.perf_counter() - self.started
+        lines = [
+            f"### {self.script or 'doc-sync'}: {elapsed:.2f}s",
+            "",
+            "| Phase | Time (ms) | Requests | Payload (KiB) |",
+            "|---|---:|---:|---:|",
+        ]
+        lines += [f"| {row.phase} | {cells(row)}" for row in self.rows(by_phase=True)]
+        lines += [
+            "",
+            "<details><summary>Per document and file</summary>",
+            "",
+            "| Phase | Document | File | Time (ms) | Requests | Payload (KiB) |",
+            "|---|---|---|---:|---:|---:|",
+        ]
+        lines += [
+            f"| {row.phase} | {row.doc[:12]} | {row.file} | {cells(row)}"
+            for row in self.rows()
+        ]
+        lines += ["", "</details>"]
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Append JSON lines and the step-summary table where configured."""
+        jsonl = os.environ.get("DOC_SYNC_TELEMETRY")
+        if jsonl:
+            run = {
+                "script": self.script,
+                "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "commit": os.environ.get("GITHUB_SHA", ""),
+            }
+            with self._lock:
+                events = list(self.events)
+            with Path(jsonl).open("a", encoding="utf-8") as fh:
+                for event in events:
+                    record = {**run, **asdict(event), "seconds": round(event.seconds, 6)}
+                    fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        summary = os.environ.get("GITHUB_STEP_SUMMARY")
+        if summary:
+            with Path(summary).open("a", encoding="utf-8") as fh:
+                fh.write(self.markdown() + "\n")
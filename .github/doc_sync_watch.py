@@ -0,0 +1,145 @@
+"""File watching for ``sync_to_google_doc.py --watch``.
+
+``FileWatcher.batches()`` yields sets of changed files.  On Linux it uses
+inotify (through ctypes, so no extra packages) on the files' directories
+rather than the files themselves, so saves that replace a file (write a
+temporary file, then rename) are seen too.  Where inotify is unavailable
+it polls each file's mtime and size.
+
+Changes are debounced: a batch is yielded once no further change has
+arrived for ``debounce`` seconds, so an editor's burst of writes (or a
+``git checkout`` touching several pages) becomes one push.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+DEBOUNCE = 0.5  # seconds of quiet before a batch is released
+POLL_INTERVAL = 0.25
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_Q_OVERFLOW = 0x4000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Inotify:
+    kind = "inotify"
+
+    def __init__(self, paths: dict[Path, Path]):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._paths = paths  # resolved path → caller's path
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        for directory in {path.parent for path in paths}:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = directory
+
+    def read(self, timeout: Optional[float]) -> set[Path]:
+        """Changed paths seen within *timeout* seconds (None: wait for one)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                return set(self._paths.values())
+            path = self._paths.get(self._dirs.get(wd, Path()) / os.fsdecode(name))
+            if path is not None:
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _Poller:
+    kind = "polling"
+
+    def __init__(self, paths: dict[Path, Path], interval: float = POLL_INTERVAL):
+        self._paths = paths
+        self._interval = interval
+        self._state = {path: self._stat(path) for path in paths}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def read(self, timeout: Optional[float]) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, caller_path in self._paths.items():
+                state = self._stat(path)
+                if state != self._state[path]:
+                    self._state[path] = state
+                    changed.add(caller_path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self._interval if deadline is None else min(self._interval, deadline - time.monotonic())
+            time.sleep(max(0.0, wait))
+
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """Watches *paths* and yields debounced batches of changed ones."""
+
+    def __init__(self, paths: list[Path], debounce: float = DEBOUNCE, polling: bool = False):
+        resolved = {path.resolve(): path for path in paths}
+        self.debounce = debounce
+        self._source: _Inotify | _Poller
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self._source = _Inotify(resolved)
+            except (OSError, AttributeError) as exc:
+                print(f"doc-sync warning: inotify unavailable ({exc}); polling instead")
+                self._source = _Poller(resolved)
+        else:
+            self._source = _Poller(resolved)
+        self.kind = self._source.kind
+
+    def batches(self) -> Iterator[set[Path]]:
+        pending: set[Path] = set()
+        while True:
+            if not pending:
+                pending = self._source.read(None)
+                continue
+            more = self._source.read(self.debounce)
+            if more:
+                pending |= more
+                continue
+            yield pending
+            pending = set()
+
+    def close(self) -> None:
+        self._source.close()
@@ -0,0 +1,132 @@
+"""Write-back of regenerated markdown, shared by the pull scripts.
+
+``write_back`` takes the new text of every target file and, in parallel:
+
+* compares it with what is on disk and leaves identical files alone, so
+  their mtimes don't trigger rebuilds;
+* writes changed files atomically (temporary file in the same directory,
+  then rename), keeping the existing file mode, so an interrupted run
+  never leaves a half-written page;
+* reports how many bytes changed in each file.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from doc_sync_executor import MAX_WORKERS
+
+
+@dataclass
+class WriteResult:
+    path: Path
+    old_size: int  # -1 if the file did not exist
+    new_size: int
+    changed_bytes: int  # 0 when the file was left alone
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return self.changed_bytes > 0
+
+    def describe(self) -> str:
+        if not self.changed:
+            return "unchanged"
+        if self.old_size < 0:
+            return f"new, {self.new_size:,} bytes"
+        return f"{self.changed_bytes:,} bytes changed, {self.old_size:,} → {self.new_size:,}"
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    """Length of the common prefix, by binary search over slice compares."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def changed_bytes(old: bytes, new: bytes) -> int:
+    """Size of the edited region: what is left of the longer side once the
+    common prefix and suffix are trimmed (0 if identical)."""
+    if old == new:
+        return 0
+    prefix = _common_prefix(old, new)
+    limit = min(len(old), len(new)) - prefix
+    suffix = _common_prefix(old[::-1][:limit], new[::-1][:limit])
+    return max(len(old), len(new)) - prefix - suffix
+
+
+@contextmanager
+def open_atomic(path: Path) -> Iterator[BinaryIO]:
+    """A file to write the new contents of *path* to, piece by piece; it
+    replaces *path* (via rename) only once the block exits cleanly."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace *path* with *data* via a temporary file and rename."""
+    with open_atomic(path) as fh:
+        fh.write(data)
+
+
+def _write_one(path: Path, text: str, current: Optional[str]) -> WriteResult:
+    started = time.perf_counter()
+    new = text.encode("utf-8")
+    if current is not None:
+        old: Optional[bytes] = current.encode("utf-8")
+    else:
+        try:
+            old = path.read_bytes()
+        except FileNotFoundError:
+            old = None
+    if old is None:
+        write_atomic(path, new)
+        return WriteResult(path, -1, len(new), len(new), time.perf_counter() - started)
+    delta = changed_bytes(old, new)
+    if delta:
+        write_atomic(path, new)
+    return WriteResult(path, len(old), len(new), delta, time.perf_counter() - started)
+
+
+def write_back(
+    outputs: dict[Path, str],
+    current: Optional[dict[Path, str]] = None,
+    jobs: Optional[int] = None,
+) -> list[WriteResult]:
+    """Write each ``path: text`` in *outputs* that differs from disk.
+
+    *current* may supply texts the caller has already read, to avoid
+    reading those files again.  Results are in the order of *outputs*.
+    """
+    current = current or {}
+    workers = max(1, min(len(outputs), jobs or MAX_WORKERS))
+    if workers == 1:
+        return [_write_one(path, text, current.get(path)) for path, text in outputs.items()]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doc-sync-write") as pool:
+        futures = [
+            pool.submit(_write_one, path, text, current.get(path))
+            for path, text in outputs.items()
+        ]
+        return [future.result() for future in futures]
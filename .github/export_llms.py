@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Export the site's pages as one ``llms-full.txt``-style text bundle.
+
+Each page becomes a section of plain Markdown, with its ``<div>`` blocks
+and front matter dropped (the text ``Page.prose()`` of the shared parsed
+corpus, doc_sync_corpus, returns):
+
+    # <title>
+    Source: https://civic.ai/<permalink>
+
+    <body>
+
+Pages are taken in priority order — the reading order below, then with
+``--all`` the language's other pages by name — and packed greedily into
+``--budget`` tokens: a page that no longer fits is skipped, and later,
+smaller pages may still go in.  Sections are written out one at a time,
+so nothing holds the whole bundle in memory.
+
+    python3 .github/export_llms.py --lang tw | pbcopy
+    python3 .github/export_llms.py --all --budget 200000 --out llms-full.txt
+    python3 .github/export_llms.py --all --list          # token counts only
+
+Tokens are counted with tiktoken's ``o200k_base`` encoding when tiktoken
+is installed, and otherwise estimated (a Han character or four letters
+of a word per token).  Counts are cached in ``CACHE_DIR/llms-tokens.pickle``
+by page content hash and encoding, so deciding what fits only renders
+the pages that changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from doc_sync_config import CACHE_DIR
+from doc_sync_corpus import REPO_ROOT, Page, corpus, site_pages
+from doc_sync_writeback import open_atomic, write_atomic
+
+EXPORT_FORMAT = 1  # bump when section() changes
+ENCODING = "o200k_base"
+
+# The English reading order; a translation's is the same with "tw-".
+READING_ORDER = (
+    "index.md", "manifesto.md", "1.md", "2.md", "3.md", "4.md", "5.md", "6.md",
+    "measures.md", "faq.md", "ai-alignment-cannot-be-top-down.md",
+    "ai-crisis-diplomacy.md", "ai-democracy-podcast.md", "podcast.md",
+    "doom-debate.md", "inside-the-kami.md", "ciudadania-digital.md",
+)
+
+_HAN = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # CJK ideographs
+_ESTIMATE_RE = re.compile(rf"[{_HAN}]|[^\W_{_HAN}]+|[^\w\s]")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+# ── Token counting ───────────────────────────────────────────────────
+
+
+def _tokenizer():
+    """(name, count function): tiktoken's when installed, else an estimate."""
+    try:
+        import tiktoken
+    except ImportError:
+        return "estimate", _estimate_tokens
+    encoding = tiktoken.get_encoding(ENCODING)
+    return ENCODING, lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _estimate_tokens(text: str) -> int:
+    tokens = 0
+    for match in _ESTIMATE_RE.finditer(text):
+        tokens += (len(match.group(0)) + 3) // 4
+    return tokens
+
+
+class TokenCounts:
+    """Token counts of pages' sections, cached by content hash."""
+
+    def __init__(self, site_url: str) -> None:
+        self.encoding, self._count = _tokenizer()
+        self.site_url = site_url
+        self.cached = 0
+        self.counted = 0
+        self._counts: dict[tuple[str, str, str], int] = {}
+        self._used: set[tuple[str, str, str]] = set()
+        try:
+            with open(self.path(), "rb") as fh:
+                version, counts = pickle.load(fh)
+            if version == EXPORT_FORMAT:
+                self._counts = counts
+        except FileNotFoundError:
+            pass
+        except Exception as exc:  # a truncated or foreign cache is recounted
+            print(f"doc-sync warning: ignoring token count cache: {exc}", file=sys.stderr)
+
+    @staticmethod
+    def path() -> Path:
+        return CACHE_DIR / "llms-tokens.pickle"
+
+    def __call__(self, page: Page) -> int:
+        key = (page.sha256, self.encoding, self.site_url)
+        self._used.add(key)
+        count = self._counts.get(key)
+        if count is None:
+            count = self._counts[key] = self._count(section(page, self.site_url))
+            self.counted += 1
+        else:
+            self.cached += 1
+        return count
+
+    def save(self) -> None:
+        """Write the cache back, keeping only the counts used this run."""
+        if not self.counted and self._used == self._counts.keys():
+            return
+        counts = {key: self._counts[key] for key in self._used}
+        self.path().parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path(), pickle.dumps((EXPORT_FORMAT, counts), pickle.HIGHEST_PROTOCOL))
+
+
+# ── Export ───────────────────────────────────────────────────────────
+
+
+def section(page: Page, site_url: str) -> str:
+    """*page* as a section of the bundle, ending in a blank line."""
+    body = _BLANK_LINES_RE.sub("\n\n", page.prose()).strip()
+    return f"# {page.title}\nSource: {site_url}{page.url}\n\n{body}\n\n"
+
+
+def priority(lang: str, include_all: bool, root: Path = REPO_ROOT) -> list[Path]:
+    """The pages of *lang* ("en" or "tw") in export order."""
+    prefix = "tw-" if lang == "tw" else ""
+    ordered = [root / (prefix + name) for name in READING_ORDER]
+    if include_all:
+        listed = set(ordered)
+        ordered += [
+            path for path in sorted(site_pages(root))
+            if path not in listed and path.name.startswith("tw-") == (lang == "tw")
+        ]
+    return ordered
+
+
+def pack(pages: Iterable[Page], tokens: TokenCounts, budget: Optional[int]) -> Iterator[tuple[Page, int, bool]]:
+    """(page, tokens, included) for *pages* in order, fitting greedily
+    within *budget* tokens (None: no limit)."""
+    used = 0
+    for page in pages:
+        count = tokens(page)
+        included = budget is None or used + count <= budget
+        if included:
+            used += count
+        yield page, count, included
+
+
+def export(packed: Iterable[tuple[Page, int, bool]], out: BinaryIO, site_url: str) -> None:
+    for page, _, included in packed:
+        if included:
+            out.write(section(page, site_url).encode("utf-8"))
+
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="*", type=Path, help="Pages to export, in order (default: the reading order)")
+    parser.add_argument("--lang", choices=("en", "tw"), default="en", help="Language of the default pages")
+    parser.add_argument("--all", action="store_true", help="Follow the reading order with the language's other pages")
+    parser.add_argument("--budget", type=int, help="Maximum tokens to export")
+    parser.add_argument("--out", type=Path, help="Write to this file instead of stdout")
+    parser.add_argument("--list", action="store_true", help="Print each page's token count instead of exporting")
+    args = parser.parse_args()
+    if args.budget is not None and args.budget < 1:
+        raise SystemExit("doc-sync error: --budget must be at least 1")
+
+    started = time.perf_counter()
+    paths = args.files or priority(args.lang, args.all)
+    pages = []
+    for path in paths:
+        page = corpus().page(path)
+        if page is None:
+            raise SystemExit(f"doc-sync error: no such page: {path}")
+        pages.append(page)
+
+    site_url = json.loads((REPO_ROOT / "_data/site.json").read_text(encoding="utf-8"))["url"]
+    tokens = TokenCounts(site_url)
+    packed = list(pack(pages, tokens, args.budget))
+    if args.list:
+        for page, count, included in packed:
+            print(f"{count:>9,}  {'' if included else '(over budget) '}{page.name}")
+    elif args.out:
+        with open_atomic(args.out) as fh:
+            export(packed, fh, site_url)
+    else:
+        try:
+            export(packed, sys.stdout.buffer, site_url)
+            sys.stdout.flush()
+        except BrokenPipeError:  # e.g. piped into head; still save the caches
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    tokens.save()
+    corpus().save()
+
+    included = [count for _, count, fits in packed if fits]
+    skipped = [page.name for page, _, fits in packed if not fits]
+    print(
+        f"export: {len(included)} pages, {sum(included):,} {tokens.encoding} tokens"
+        + (f" of {args.budget:,}" if args.budget is not None else "")
+        + (f" ({len(skipped)} over budget: {', '.join(skipped)})" if skipped else "")
+        + f"; token counts {tokens.cached} cached, {tokens.counted} counted"
+        + f" in {(time.perf_counter() - started) * 1000:.0f} ms",
+        file=sys.stderr,
+    )
+    print(corpus().summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,28 +5,40 @@ Reads each tab listed in TAB_MAP, converts structured content back to
 markdown, preserves YAML front matter from existing local files, and
 writes the result.
 
+The converted markdown of every tab is cached per document together with
+the document's revisionId (under DOC_SYNC_CACHE_DIR).  A pull first asks
+for the revisionId alone; if it is unchanged, the full document is not
+downloaded and no tab is re-converted.  Each local file is read once;
+the write-back stage (doc_sync_writeback) only rewrites it, atomically,
+when its content differs, so unchanged pages keep their mtimes.
+
 Auth: expects GOOGLE_REFRESH_TOKEN, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
 in the environment (e.g. from GitHub Secrets).
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import re
-import sys
-from collections import defaultdict
-from dataclasses import dataclass
+import unicodedata
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from doc_sync_config import (
-    CONTENT_START,
+    CACHE_DIR,
     SITE_URL,
     SITE_URL_ALIASES,
     SYNC_FILES,
-    TAB_MAP,
-    doc_id_for,
-    validate_sync_config,
+    sync_plan,
 )
-from doc_sync_auth import build_docs_service
+from doc_sync_auth import docs_service_factory
+from doc_sync_corpus import HtmlBlock, corpus
+from doc_sync_executor import Log, run_per_document
+from doc_sync_fetch import DocFetcher
+from doc_sync_telemetry import Telemetry
+from doc_sync_writeback import write_atomic, write_back
 
 ORDERED_GLYPH_TYPES = {
     "DECIMAL", "ZERO_DECIMAL", "ALPHA", "UPPER_ALPHA", "ROMAN", "UPPER_ROMAN",
@@ -43,22 +55,26 @@ def _validate_targets(targets: list[str]) -> list[Path]:
     return paths
 
 
-def _warn_no_tab_mapping(filename: str) -> None:
-    print(f"doc-sync warning: {filename}: missing tab mapping")
+def _warn_no_tab_mapping(filename: str, log: Log = print) -> None:
+    log(f"doc-sync warning: {filename}: missing tab mapping")
 
 
-def _warn_tab_not_found(filename: str, tab_id: str) -> None:
-    print(f"doc-sync warning: {filename}: mapped tab not found in Google Doc: {tab_id}")
+def _warn_tab_not_found(filename: str, tab_id: str, log: Log = print) -> None:
+    log(f"doc-sync warning: {filename}: mapped tab not found in Google Doc: {tab_id}")
 
 
-def _find_tab(tabs: list[dict], target_id: str):
-    for tab in tabs:
-        if tab["tabProperties"]["tabId"] == target_id:
-            return tab
-        found = _find_tab(tab.get("childTabs", []), target_id)
-        if found:
-            return found
-    return None
+def _targets_with_tabs(fetcher: DocFetcher, did: str, targets: list[Path], log: Log = print) -> list[Path]:
+    """Drop targets whose mapped tab does not exist in document *did*."""
+    plan = sync_plan()
+    routes = [plan.route(t.name) for t in targets]
+    present = fetcher.present_tabs(did, {r.tab_id for r in routes if r})
+    kept = []
+    for target, route in zip(targets, routes):
+        if route and route.tab_id not in present:
+            _warn_tab_not_found(target.name, route.tab_id, log)
+            continue
+        kept.append(target)
+    return kept
 
 
 def _relativise_url(url: str, page_path: str) -> str:
@@ -76,93 +92,71 @@ def _relativise_url(url: str, page_path: str) -> str:
     return url
 
 
-def _extract_front_matter(path: Path) -> str:
-    """Preserve existing YAML front matter from the local file."""
-    if path.exists():
-        text = path.read_text(encoding="utf-8")
-        if text.startswith("---"):
-            parts = text.split("---", 2)
-            if len(parts) >= 3:
-                return "---" + parts[1] + "---\n\n"
-    return ""
-
+# ── Local file model ─────────────────────────────────────────────────
 
-def _extract_html_blocks(path: Path) -> list[tuple[str | None, str]]:
-    """Extract multi-line <div> blocks from existing file.
+@dataclass
+class _LocalFile:
+    """What a pull keeps from the existing local file, read once.
 
-    Returns a list of (heading_anchor, block) tuples where
-    *heading_anchor* is the nearest preceding markdown heading
-    (e.g. ``"## About the Project"``), or ``None`` if the block
-    appears before any heading (i.e. top of body).
+    *html_blocks* holds the multi-line ``<div>`` blocks, each with the
+    nearest preceding markdown heading line (e.g. ``"## About the
+    Project"``) or ``None`` for blocks before any heading (top of body).
+    """
+    path: Path
+    text: str = ""
+    front_matter: str = ""
+    html_blocks: list[HtmlBlock] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> "_LocalFile":
+        page = corpus().page(path)
+        if page is None:
+            return cls(path)
+        front = page.front_matter + "\n\n" if page.front_matter else ""
+        return cls(path, page.text, front, page.html_blocks)
+
+
+def _reinject_html_blocks(md: str, blocks: list[HtmlBlock]) -> str:
+    """Re-insert preserved HTML blocks after their heading anchors.
+
+    One pass over *md*: blocks are indexed by heading line and placed
+    after the first line matching their heading, in their original order.
+    Blocks whose heading is gone are dropped.
     """
-    if not path.exists():
-        return []
-    text = path.read_text(encoding="utf-8")
-    # strip front matter
-    if text.startswith("---"):
-        parts = text.split("---", 2)
-        if len(parts) >= 3:
-            text = parts[2]
-
-    lines = text.split("\n")
-    blocks: list[tuple[str | None, str]] = []
-    depth = 0
-    block_lines: list[str] = []
-    last_heading: str | None = None
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # track headings
-        if depth == 0 and re.match(r"^#{1,6}\s", stripped):
-            last_heading = stripped
-
-        opens = len(re.findall(r"<div\b", stripped))
-        closes = len(re.findall(r"</div>", stripped))
-
-        if depth > 0 or opens > 0:
-            block_lines.append(line)
-            depth += opens - closes
-            if depth < 0:
-                depth = 0
-            if depth == 0:
-                blocks.append((last_heading, "\n".join(block_lines)))
-                block_lines = []
-            i += 1
-            continue
-        i += 1
-
-    return blocks
-
-
-def _reinject_html_blocks(md: str, blocks: list[tuple[str | None, str]]) -> str:
-    """Re-insert preserved HTML blocks after their heading anchors."""
     if not blocks:
         return md
-    for heading, block in blocks:
-        if heading is None:
-            # top-of-body block — prepend with one blank line
-            md = block + "\n\n" + md.lstrip("\n")
-            continue
-        idx = md.find(heading)
-        if idx == -1:
-            continue  # heading removed — drop the block
-        # find end of the heading line
-        eol = md.find("\n", idx)
-        if eol == -1:
-            eol = len(md)
-        # insert after the heading line, preserving blank line spacing
-        insert_at = eol + 1
-        md = md[:insert_at] + "\n" + block + "\n\n" + md[insert_at:].lstrip("\n")
-    return md
+
+    top: list[str] = []
+    by_heading: dict[str, list[str]] = {}
+    for block in blocks:
+        if block.heading is None:
+            top.append(block.source)
+        else:
+            by_heading.setdefault(block.heading, []).append(block.source)
+
+    out: list[str] = []
+    for block in top:
+        out += [block, ""]
+    skip_blank = bool(top)
+    for line in md.split("\n"):
+        if skip_blank:
+            if not line:
+                continue
+            skip_blank = False
+        out.append(line)
+        pending = by_heading.pop(line, None) if line.startswith("#") else None
+        if pending:
+            out.append("")
+            for block in pending:
+                out += [block, ""]
+            skip_blank = True
+    return "\n".join(out)
 
 
 # ── Docs API content → markdown ──────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class _Span:
     """Inline text span with formatting metadata."""
     text: str
@@ -172,8 +166,13 @@ class _Span:
 
 
 def _collect_spans(elements: list[dict], page_path: str, in_heading: bool = False) -> list[_Span]:
-    """Extract formatted spans from paragraph elements."""
+    """Extract formatted spans from paragraph elements.
+
+    Adjacent runs with identical formatting are merged as they are
+    collected.
+    """
     spans: list[_Span] = []
+    prev: _Span | None = None
     for el in elements:
         tr = el.get("textRun")
         if not tr:
@@ -181,33 +180,27 @@ def _collect_spans(elements: list[dict], page_path: str, in_heading: bool = Fals
         content = tr.get("content", "")
         if not content or content == "\n":
             continue
-        style = tr.get("textStyle", {})
-        bold = style.get("bold", False) and not in_heading
-        italic = style.get("italic", False)
-        link = style.get("link", {}).get("url", "")
-        if link:
-            link = _relativise_url(link, page_path)
-        spans.append(_Span(
-            text=content.rstrip("\n"),
-            bold=bold,
-            italic=italic,
-            link=link,
-        ))
+        style = tr.get("textStyle")
+        if style:
+            bold = style.get("bold", False) and not in_heading
+            italic = style.get("italic", False)
+            link = style.get("link")
+            link = _relativise_url(link["url"], page_path) if link and link.get("url") else ""
+        else:
+            bold = italic = False
+            link = ""
+        text = content.rstrip("\n")
+        if prev is not None and prev.bold == bold and prev.italic == italic and prev.link == link:
+            prev.text += text
+        else:
+            prev = _Span(text, bold, italic, link)
+            spans.append(prev)
     return spans
 
 
-def _coalesce_spans(spans: list[_Span]) -> list[_Span]:
-    """Merge adjacent spans with identical formatting."""
-    if not spans:
-        return spans
-    merged: list[_Span] = [_Span(spans[0].text, spans[0].bold, spans[0].italic, spans[0].link)]
-    for s in spans[1:]:
-        prev = merged[-1]
-        if prev.bold == s.bold and prev.italic == s.italic and prev.link == s.link:
-            prev.text += s.text
-        else:
-            merged.append(_Span(s.text, s.bold, s.italic, s.link))
-    return merged
+# Unicode categories CommonMark treats as punctuation for emphasis flanking.
+_PUNCT_CATS = frozenset({"Pc", "Pd", "Pe", "Pf", "Pi", "Po", "Ps", "Sc", "Sk", "Sm", "So"})
+_FLANKING_CATS = _PUNCT_CATS | {"Zs"}
 
 
 def _needs_html_emphasis(text: str, prev_char: str, next_char: str) -> bool:
@@ -218,32 +211,33 @@ def _needs_html_emphasis(text: str, prev_char: str, next_char: str) -> bool:
     closer before a non-punctuation char fails if the last inner char is Unicode
     punctuation.  Fall back to HTML tags in these cases.
     """
-    import unicodedata
-    _PUNCT_CATS = {"Pc", "Pd", "Pe", "Pf", "Pi", "Po", "Ps", "Sc", "Sk", "Sm", "So"}
-
     if not text:
         return False
-    first, last = text[0], text[-1]
-    first_cat = unicodedata.category(first)
-    last_cat = unicodedata.category(last)
-    prev_cat = unicodedata.category(prev_char) if prev_char else "Zs"
-    next_cat = unicodedata.category(next_char) if next_char else "Zs"
-
     # Opening delimiter: if inner-first is punctuation, preceding must be
     # punctuation or whitespace for the delimiter to be left-flanking.
-    if first_cat in _PUNCT_CATS and prev_cat not in (_PUNCT_CATS | {"Zs"}):
+    if (
+        unicodedata.category(text[0]) in _PUNCT_CATS
+        and prev_char
+        and unicodedata.category(prev_char) not in _FLANKING_CATS
+    ):
         return True
     # Closing delimiter: if inner-last is punctuation, following must be
     # punctuation or whitespace for the delimiter to be right-flanking.
-    if last_cat in _PUNCT_CATS and next_cat not in (_PUNCT_CATS | {"Zs"}):
+    if (
+        unicodedata.category(text[-1]) in _PUNCT_CATS
+        and next_char
+        and unicodedata.category(next_char) not in _FLANKING_CATS
+    ):
         return True
     return False
 
 
 def _spans_to_md(spans: list[_Span]) -> str:
-    """Convert a list of formatted spans to an inline markdown string."""
-    spans = _coalesce_spans(spans)
+    """Convert a list of coalesced spans to an inline markdown string."""
+    if len(spans) == 1 and not (spans[0].bold or spans[0].italic or spans[0].link):
+        return spans[0].text  # the common case: one plain run
     parts: list[str] = []
+    last = len(spans) - 1
     for i, s in enumerate(spans):
         text = s.text
         if s.link:
@@ -252,7 +246,7 @@ def _spans_to_md(spans: list[_Span]) -> str:
         if s.bold or s.italic:
             # Determine surrounding chars for emphasis-safety check
             prev_char = parts[-1][-1] if parts and parts[-1] else ""
-            next_char = spans[i + 1].text[0] if i + 1 < len(spans) and spans[i + 1].text else ""
+            next_char = spans[i + 1].text[:1] if i < last else ""
             use_html = _needs_html_emphasis(s.text, prev_char, next_char)
 
             if s.bold and s.italic:
@@ -308,6 +302,7 @@ def tab_to_markdown(
     seen_h1 = False
     capturing = content_start is None
     prev_kind = ""  # "heading", "list", "para", "blank"
+    ordered_levels: dict[tuple[str, int], bool] = {}
 
     for elem in content:
         para = elem.get("paragraph")
@@ -350,9 +345,11 @@ def tab_to_markdown(
 
         # list item
         if bullet:
-            list_id = bullet.get("listId", "")
-            nesting = bullet.get("nestingLevel", 0)
-            ordered = _is_ordered(lists_meta, list_id, nesting)
+            key = (bullet.get("listId", ""), bullet.get("nestingLevel", 0))
+            ordered = ordered_levels.get(key)
+            if ordered is None:
+                ordered = ordered_levels[key] = _is_ordered(lists_meta, *key)
+            nesting = key[1]
             indent = "  " * nesting
             prefix = "1." if ordered else "-"
             if prev_kind not in ("list", "blank") and lines:
@@ -419,57 +416,149 @@ def _faq_postprocess(md: str) -> str:
     return "\n".join(out)
 
 
+# ── Snapshot cache ───────────────────────────────────────────────────
+
+# Cached markdown is only valid for the converter that produced it.
+_CONVERTER_ID = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def _snapshot_path(doc_id: str) -> Path:
+    return CACHE_DIR / f"{doc_id}.json"
+
+
+def _load_snapshot(doc_id: str) -> dict:
+    """Return the cached {revisionId, tabs} for *doc_id*, or an empty one."""
+    try:
+        snapshot = json.loads(_snapshot_path(doc_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"revisionId": "", "tabs": {}}
+    if snapshot.get("converter") != _CONVERTER_ID:
+        return {"revisionId": "", "tabs": {}}
+    return snapshot
+
+
+def _save_snapshot(doc_id: str, revision_id: str, tabs: dict[str, str]) -> None:
+    path = _snapshot_path(doc_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {"revisionId": revision_id, "converter": _CONVERTER_ID, "tabs": tabs}
+    write_atomic(path, json.dumps(snapshot, ensure_ascii=False).encode("utf-8"))
+
+
 # ── Main ─────────────────────────────────────────────────────────────
 
 
-def main() -> None:
-    validate_sync_config()
-    raw_targets = sys.argv[1:] if len(sys.argv) > 1 else list(SYNC_FILES)
-    target_paths = _validate_targets(raw_targets)
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Markdown files to pull (default: all synced files)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the snapshot cache and re-convert every tab",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Documents to sync concurrently (default: DOC_SYNC_WORKERS or 4)",
+    )
+    return parser
 
-    service = build_docs_service()
 
-    # Group targets by doc ID so each document is fetched once.
-    groups: dict[str, list[Path]] = defaultdict(list)
-    for target in target_paths:
-        groups[doc_id_for(target.name)].append(target)
+def main() -> None:
+    args = build_parser().parse_args()
+    plan = sync_plan()
+    raw_targets = args.targets or list(SYNC_FILES)
+    target_paths = _validate_targets(raw_targets)
 
-    for did, targets in groups.items():
-        doc = (
-            service.documents()
-            .get(documentId=did, includeTabsContent=True)
-            .execute()
-        )
+    telemetry = Telemetry("sync_from_google_doc")
+    with telemetry.phase("oauth"):
+        make_service = docs_service_factory()
+
+    groups = plan.group(target_paths)
+
+    fetcher = DocFetcher(None, telemetry=telemetry)
+
+    def pull_document(did: str, targets: list[Path], log: Log) -> None:
+        doc_fetcher = fetcher.for_service(make_service())
+        # Without the cache there is nothing to validate, so skip the
+        # revision round trip; the content fetch carries it anyway.
+        cached: dict[str, str] = {}
+        revision = ""
+        if not args.no_cache:
+            snapshot = _load_snapshot(did)
+            revision = doc_fetcher.revision(did)
+            if revision and revision == snapshot["revisionId"]:
+                cached = snapshot["tabs"]
+
+        tabs: dict[str, dict] = {}
+        if any(target.name not in cached for target in targets):
+            targets = _targets_with_tabs(doc_fetcher, did, targets, log)
+            doc = doc_fetcher.content(did)
+            tabs = doc.tabs
+            if doc.revision_id != revision:
+                revision = doc.revision_id
+                cached = {}
+        else:
+            log(f"doc {did[:12]}…: revision {revision[:12]}… unchanged, using cached tabs")
 
+        tabs_md = dict(cached)
+        outputs: dict[Path, str] = {}
+        current: dict[Path, str] = {}
+        tab_of: dict[Path, str] = {}
         for target in targets:
             filename = target.name
-            tab_id = TAB_MAP.get(filename)
-            if not tab_id:
-                _warn_no_tab_mapping(filename)
+            route = plan.route(filename)
+            if not route:
+                _warn_no_tab_mapping(filename, log)
                 continue
-
-            tab = _find_tab(doc["tabs"], tab_id)
-            if not tab:
-                _warn_tab_not_found(filename, tab_id)
-                continue
-
-            page_path = "/" + Path(filename).stem + "/"
-            md = tab_to_markdown(
-                tab, page_path,
-                skip_first_h1=True,
-                content_start=CONTENT_START.get(filename),
-            )
-
-            front = _extract_front_matter(target)
-            html_blocks = _extract_html_blocks(target)
-            md = _reinject_html_blocks(md, html_blocks)
-            # FAQ pages: reconstruct <h4> anchors and --- separators
-            if filename in ("faq.md", "tw-faq.md"):
-                md = _faq_postprocess(md)
-            # Strip leading blank lines — front matter already ends with \n\n
-            md = md.lstrip("\n")
-            target.write_text(front + md, encoding="utf-8")
-            print(f"{filename} ← tab {tab_id}")
+            tab_id = route.tab_id
+
+            md = cached.get(filename)
+            if md is None:
+                tab = tabs.get(tab_id)
+                if not tab:
+                    _warn_tab_not_found(filename, tab_id, log)
+                    continue
+
+                page_path = "/" + Path(filename).stem + "/"
+                with telemetry.phase("convert", did, filename) as event:
+                    md = tab_to_markdown(
+                        tab, page_path,
+                        skip_first_h1=True,
+                        content_start=route.content_start,
+                    )
+                    event.bytes = len(md.encode("utf-8"))
+                tabs_md[filename] = md
+
+            with telemetry.phase("merge", did, filename):
+                local = _LocalFile.load(target)
+                md = _reinject_html_blocks(md, local.html_blocks)
+                # FAQ pages: reconstruct <h4> anchors and --- separators
+                if filename in ("faq.md", "tw-faq.md"):
+                    md = _faq_postprocess(md)
+                # Strip leading blank lines — front matter already ends with \n\n
+                md = md.lstrip("\n")
+            outputs[target] = local.front_matter + md
+            current[target] = local.text
+            tab_of[target] = tab_id
+
+        for result in write_back(outputs, current):
+            telemetry.record("write", result.seconds, did, result.path.name, bytes=result.changed_bytes)
+            log(f"{result.path.name} ← tab {tab_of[result.path]} ({result.describe()})")
+
+        if revision and not args.no_cache:
+            _save_snapshot(did, revision, tabs_md)
+
+    # EN and TW documents are independent: pull them concurrently.
+    run_per_document(groups, pull_document, args.jobs)
+    corpus().save()
+    print(fetcher.summary())
+    print(corpus().summary())
+    print(fetcher.executor.summary())
+    telemetry.write()
 
 
 if __name__ == "__main__":
@@ -1,40 +1,130 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""Fetch markdown tabs from the published Google Doc via curl and regenerate local files."""
+"""Fetch markdown tabs from the published Google Doc and regenerate local files.
+
+The page is fetched with a conditional GET: its ETag, Last-Modified and
+content hash are kept in the doc-sync cache, and when the Doc is unchanged
+(HTTP 304, or an identical body) nothing is parsed or written.
+"""
 
 from __future__ import annotations
 
 import argparse
-import subprocess
+import gzip
+import hashlib
+import json
 import re
+import time
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from urllib.error import HTTPError, URLError
 from urllib.parse import parse_qs, unquote, urlparse
+from urllib.request import Request, urlopen
 
 from bs4 import BeautifulSoup, NavigableString, Tag
 
+from doc_sync_config import CACHE_DIR
+from doc_sync_corpus import corpus, split_front_matter
+from doc_sync_writeback import WriteResult, write_atomic, write_back
+
 DEFAULT_DOC_URL = "https://docs.google.com/document/d/e/2PACX-1vTvWQ1BT8cUYdjPNCTFt-LL0tm_zv1KpvJyIzdS7NuHIbIdjFrwD243eMGie5O2um-iEuAGRRRLZ6PQ/pub"
 PACK_PATTERN = re.compile(r"^Pack ([1-6]):\s*(.+)$")
 
-
-def _run_curl(url: str) -> str:
-    try:
-        result = subprocess.run(
-            ["curl", "-fsSL", "--max-time", "30", "--retry", "2", url],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-    except FileNotFoundError as exc:
-        raise SystemExit("curl is required but was not found in PATH") from exc
-    except subprocess.CalledProcessError as exc:
-        stderr = exc.stderr.strip() if exc.stderr else ""
-        message = stderr or exc.stdout.strip() if exc.stdout else ""
-        raise SystemExit(
-            f"curl failed with exit code {exc.returncode}"
-            + (f": {message}" if message else "")
-        ) from exc
-    return result.stdout
+FETCH_TIMEOUT = 30  # seconds
+FETCH_RETRIES = 2
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class FetchCache:
+    """Validators and content hash of the last published page we rendered.
+
+    ``files`` holds the hash of each file as last written, so a skipped
+    run can confirm the working tree still has that output.
+    """
+    url: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    sha256: str = ""
+    files: Dict[str, str] = field(default_factory=dict)
+
+    @staticmethod
+    def path() -> Path:
+        return CACHE_DIR / "published-doc.json"
+
+    @classmethod
+    def load(cls) -> "FetchCache":
+        try:
+            return cls(**json.loads(cls.path().read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return cls()
+
+    def save(self) -> None:
+        path = self.path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(asdict(self), indent=1).encode("utf-8"))
+
+    def files_intact(self) -> bool:
+        if not self.files:
+            return False
+        for name, digest in self.files.items():
+            try:
+                if _sha256(Path(name).read_bytes()) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+
+def fetch_published(url: str, cache: FetchCache) -> Optional[str]:
+    """GET *url*, conditionally if *cache* is valid for it.
+
+    Returns the page HTML, or None when the Doc is unchanged since the
+    cached run (HTTP 304 or a body with the cached hash).  Updates the
+    validators in *cache*; the caller saves it.
+    """
+    headers = {"Accept-Encoding": "gzip", "User-Agent": "civic-ai-sync-index"}
+    conditional = cache.url == url and cache.files_intact()
+    if conditional:
+        if cache.etag:
+            headers["If-None-Match"] = cache.etag
+        if cache.last_modified:
+            headers["If-Modified-Since"] = cache.last_modified
+
+    for attempt in range(FETCH_RETRIES + 1):
+        try:
+            with urlopen(Request(url, headers=headers), timeout=FETCH_TIMEOUT) as response:
+                body = response.read()
+                if response.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                charset = response.headers.get_content_charset() or "utf-8"
+                etag = response.headers.get("ETag", "")
+                last_modified = response.headers.get("Last-Modified", "")
+            break
+        except HTTPError as exc:
+            if exc.code == 304:
+                print("Published Doc unchanged (HTTP 304); skipping")
+                return None
+            transient = exc.code == 429 or exc.code >= 500
+            if not transient or attempt == FETCH_RETRIES:
+                raise SystemExit(f"Fetching the published Doc failed: HTTP {exc.code} {exc.reason}") from exc
+        except (URLError, OSError) as exc:
+            if attempt == FETCH_RETRIES:
+                reason = getattr(exc, "reason", exc)
+                raise SystemExit(f"Fetching the published Doc failed: {reason}") from exc
+        time.sleep(2 ** attempt)
+
+    digest = _sha256(body)
+    cache.etag, cache.last_modified = etag, last_modified
+    if conditional and digest == cache.sha256:
+        print("Published Doc unchanged (identical content); skipping")
+        return None
+    cache.url, cache.sha256 = url, digest
+    return body.decode(charset, errors="replace")
 
 
 def detect_locale(tab_name: str) -> str:
@@ -72,7 +162,21 @@ def inline_text(node, bold_classes: Set[str]) -> str:
     return text
 
 
-def render_section(nodes: Iterable, locale: str, bold_classes: Set[str], skip_first_h1: bool = False) -> str:
+# Text that marks the start of the next chapter inside a section.
+CHAPTER_STOPS = ("Chapter 8:", "# Chapter 8:", "ch8:", "**ch8:", "**ch9:", "Chapter 9:")
+
+
+def render_section(
+    nodes: Iterable,
+    locale: str,
+    bold_classes: Set[str],
+    skip_first_h1: bool = False,
+    index: TextIndex | None = None,
+) -> str:
+    return _render_nodes(nodes, locale, SoupView(bold_classes, index), skip_first_h1)
+
+
+def _render_nodes(nodes: Iterable, locale: str, view: "SoupView | LxmlView", skip_first_h1: bool) -> str:
     lines: List[str] = []
     state = {"pack": False, "seen_h1": False}
 
@@ -86,18 +190,15 @@ def render_section(nodes: Iterable, locale: str, bold_classes: Set[str], skip_fi
             state["pack"] = False
 
     for node in nodes:
-        if isinstance(node, NavigableString):
+        if view.skip(node):
             continue
-        name = getattr(node, "name", "").lower()
-        
+        name = view.name(node)
+
         # Check if this node contains text that indicates start of next chapter
-        node_text = node.get_text(strip=True)
-        if node_text and (node_text.startswith("Chapter 8:") or node_text.startswith("# Chapter 8:") or 
-                         node_text.startswith("ch8:") or node_text.startswith("**ch8:") or
-                         node_text.startswith("**ch9:") or node_text.startswith("Chapter 9:")):
+        if view.stops(node):
             # Stop processing this section
             break
-            
+
         if name in {"h1", "h2", "h3", "h4", "h5", "h6"}:
             finish_pack()
             level = int(name[1])
@@ -106,11 +207,11 @@ def render_section(nodes: Iterable, locale: str, bold_classes: Set[str], skip_fi
                 state["seen_h1"] = True
                 continue
             ensure_blank()
-            heading = node.get_text(strip=True)
+            heading = view.text(node)
             lines.append("#" * level + " " + heading)
             ensure_blank()
         elif name in {"p", "li"}:
-            text = inline_text(node, bold_classes).strip()
+            text = view.inline(node).strip()
             if not text:
                 continue
             match = PACK_PATTERN.match(text) if locale == "en" else None
@@ -146,14 +247,14 @@ def render_section(nodes: Iterable, locale: str, bold_classes: Set[str], skip_fi
             finish_pack()
             bullet = "-" if name == "ul" else "1."
             ensure_blank()
-            for li in node.find_all("li", recursive=False):
-                text = inline_text(li, bold_classes).strip()
+            for li in view.items(node):
+                text = view.inline(li).strip()
                 if text:
                     lines.append(f"{bullet} {text}")
             ensure_blank()
         else:
             finish_pack()
-            html_block = node.decode().strip()
+            html_block = view.html(node).strip()
             if html_block:
                 ensure_blank()
                 lines.append(html_block)
@@ -175,16 +276,6 @@ def render_section(nodes: Iterable, locale: str, bold_classes: Set[str], skip_fi
     return "\n".join(cleaned).strip() + "\n"
 
 
-def extract_front_matter(path: Path) -> str:
-    if path.exists():
-        text = path.read_text(encoding="utf-8")
-        if text.startswith("---"):
-            parts = text.split("---", 2)
-            if len(parts) >= 3:
-                return "---" + parts[1] + "---\n\n"
-    return ""
-
-
 def _clean_href(href: str) -> str:
     if not href:
         return href
@@ -205,91 +296,465 @@ def _clean_href(href: str) -> str:
     return href
 
 
-def gather_sections(contents: Tag) -> Dict[str, List]:
-    sections: Dict[str, List] = {}
-    seen: set[str] = set()
-    markers: List[Tag] = []
-    for tag in contents.find_all(True):
-        text = tag.get_text(strip=True)
-        if text.endswith(".md") and text not in seen:
-            markers.append(tag)
-            seen.add(text)
-    for marker in markers:
-        name = marker.get_text(strip=True)
-        nodes: List[Tag] = []
-        for sibling in marker.next_siblings:
-            if isinstance(sibling, NavigableString):
+class TextIndex:
+    """Stripped-text summaries of every tag under a root, built in one pass.
+
+    The marker scan used to call ``tag.get_text(strip=True)`` on every tag
+    and every sibling, and ``render_section`` again on every node, each
+    call re-walking the subtree.  This index walks the tree once, recording
+    for each tag the length of that text plus its first and last ``EDGE``
+    characters — all the marker and stop checks need — and collects the
+    ``.md`` markers on the way.  Full text is only rebuilt for long tags.
+    """
+
+    EDGE = 32
+
+    def __init__(self, root: Tag):
+        self.markers: List[Tag] = []  # tags whose text ends with ".md", document order
+        self._summary: Dict[int, tuple[int, str, str]] = {}
+        main = Tag.MAIN_CONTENT_STRING_TYPES
+        edge = self.EDGE
+        summary = self._summary
+        candidates: List[tuple[int, Tag]] = []
+        position = 0
+        # Iterative post-order walk; children are summarised before parents.
+        stack: List[tuple[Tag, int]] = [(root, -1)]
+        while stack:
+            tag, seen_at = stack.pop()
+            if seen_at < 0:
+                stack.append((tag, position))
+                position += 1
+                stack.extend((child, -1) for child in reversed(tag.contents) if isinstance(child, Tag))
                 continue
-            if not hasattr(sibling, "get_text"):
+            if tag.interesting_string_types is not main:
+                # <style>, <script>, …: their own string types; small, so direct
+                text = tag.get_text(strip=True)
+                summary[id(tag)] = (len(text), text[:edge], text[-edge:])
                 continue
-            text = sibling.get_text(strip=True)
-            if text.lower().endswith(".md") or text.strip().lower() == "manifesto":
+            length, head, tail = 0, "", ""
+            for child in tag.contents:
+                if isinstance(child, Tag):
+                    if child.interesting_string_types is not main:
+                        continue  # not part of this tag's text
+                    n, h, t = summary[id(child)]
+                elif type(child) in main:
+                    h = t = child.strip()
+                    n = len(h)
+                else:
+                    continue  # comments, doctypes, …
+                if not n:
+                    continue
+                if len(head) < edge:
+                    head = (head + h)[:edge]
+                tail = (tail + t)[-edge:]
+                length += n
+            summary[id(tag)] = (length, head, tail)
+            if tail.endswith(".md") and tag is not root:
+                candidates.append((seen_at, tag))
+        candidates.sort(key=lambda item: item[0])
+        self.markers = [tag for _, tag in candidates]
+
+    def text(self, tag: Tag) -> str:
+        """``tag.get_text(strip=True)``, without a subtree walk for short tags."""
+        length, head, _ = self._summary[id(tag)]
+        return head if length <= self.EDGE else tag.get_text(strip=True)
+
+    def siblings(self, tag: Tag) -> Iterator[Tag]:
+        return (sibling for sibling in tag.next_siblings if isinstance(sibling, Tag))
+
+    def startswith(self, tag: Tag, prefixes: tuple[str, ...]) -> bool:
+        return self._summary[id(tag)][1].startswith(prefixes)
+
+    def ends_section(self, tag: Tag) -> bool:
+        """Whether *tag* is the next tab's marker or the "manifesto" heading."""
+        length, head, tail = self._summary[id(tag)]
+        return tail.lower().endswith(".md") or length == 9 and head.lower() == "manifesto"
+
+
+def gather_sections(contents: Tag, index: "TextIndex | LxmlTextIndex | None" = None) -> Dict[str, List]:
+    """Map each ``*.md`` tab marker to the sibling nodes that follow it."""
+    index = index or TextIndex(contents)
+    sections: Dict[str, List] = {}
+    for marker in index.markers:
+        name = index.text(marker)
+        if name in sections:
+            continue
+        nodes: List[Tag] = []
+        for sibling in index.siblings(marker):
+            if index.ends_section(sibling):
                 break
             nodes.append(sibling)
         sections[name] = nodes
     return sections
 
 
+def _bold_classes_from_css(css: str) -> Set[str]:
+    bold: Set[str] = set()
+    for match in re.finditer(r"\.([a-zA-Z0-9_-]+)\s*\{[^}]*font-weight\s*:\s*([^;}]*)", css):
+        cls, weight = match.groups()
+        weight_clean = weight.strip().lower()
+        if any(token in weight_clean for token in ("bold", "600", "700", "800", "900")):
+            bold.add(cls)
+    return bold
+
+
 def extract_bold_classes(contents: Tag) -> Set[str]:
     bold: Set[str] = set()
     for style_tag in contents.find_all("style"):
-        css = style_tag.string or ""
-        for match in re.finditer(r"\.([a-zA-Z0-9_-]+)\s*\{[^}]*font-weight\s*:\s*([^;}]*)", css):
-            cls, weight = match.groups()
-            weight_clean = weight.strip().lower()
-            if any(token in weight_clean for token in ("bold", "600", "700", "800", "900")):
-                bold.add(cls)
+        bold |= _bold_classes_from_css(style_tag.string or "")
     return bold
 
 
-def regenerate_markdown(doc_url: str) -> List[str]:
-    html = _run_curl(doc_url)
-    soup = BeautifulSoup(html, "lxml")
-    contents = soup.find("div", id="contents")
+class SoupView:
+    """How ``render_section`` reads nodes of a BeautifulSoup tree."""
+
+    def __init__(self, bold_classes: Set[str], index: TextIndex | None = None):
+        self.bold_classes = bold_classes
+        self.index = index
+
+    def skip(self, node) -> bool:
+        return isinstance(node, NavigableString)
+
+    def name(self, node: Tag) -> str:
+        return getattr(node, "name", "").lower()
+
+    def stops(self, node: Tag) -> bool:
+        if self.index is not None:
+            return self.index.startswith(node, CHAPTER_STOPS)
+        return node.get_text(strip=True).startswith(CHAPTER_STOPS)
+
+    def text(self, node: Tag) -> str:
+        return node.get_text(strip=True)
+
+    def inline(self, node: Tag) -> str:
+        return inline_text(node, self.bold_classes)
+
+    def items(self, node: Tag) -> List[Tag]:
+        return node.find_all("li", recursive=False)
+
+    def html(self, node: Tag) -> str:
+        return node.decode()
+
+
+# ── lxml backend ──────────────────────────────────────────────────────
+#
+# The same rendering, straight from lxml's tree instead of BeautifulSoup's
+# copy of it.  Output matches the BeautifulSoup path, so the text rules
+# below mirror what BeautifulSoup does while building its tree: strings of
+# only ASCII whitespace collapse to a single space or newline (outside
+# <pre>/<textarea>), comment text counts as text in ``inline_text`` but
+# not in ``get_text``, and <style>/<script>/… strings are left out of
+# their ancestors' text.
+
+_ASCII_SPACES = frozenset("\x20\x0a\x09\x0c\x0d")
+_PRESERVE_WHITESPACE = frozenset({"pre", "textarea"})
+_OWN_STRINGS = frozenset({"rt", "rp", "style", "script", "template"})
+_BOLD_STYLE_TOKENS = ("font-weight:bold", "font-weight:600", "font-weight:700", "font-weight:800", "font-weight:900")
+_NEEDS_NORMALISING = re.compile(r"[\t\n\f\v]")
+_TABS_RE = re.compile(r"[\t\f\v]+")
+_NEWLINE_SPACES_RE = re.compile(r" *\n *")
+
+
+def _soup_string(text: str, preserve: bool) -> str:
+    """*text* as BeautifulSoup stores it."""
+    if preserve or not _ASCII_SPACES.issuperset(text):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _normalise(text: str) -> str:
+    return _NEWLINE_SPACES_RE.sub("\n", _TABS_RE.sub(" ", text))
+
+
+class LxmlTextIndex(TextIndex):
+    """``TextIndex`` over an lxml element tree."""
+
+    def __init__(self, root):
+        self.markers = []
+        self._summary: Dict[object, tuple[int, str, str]] = {}
+        edge = self.EDGE
+        summary = self._summary
+        candidates = []
+        position = 0
+
+        def add(length: int, head: str, tail: str, text: Optional[str]) -> tuple[int, str, str]:
+            if text:
+                text = text.strip()
+                if text:
+                    if len(head) < edge:
+                        head = (head + text)[:edge]
+                    return length + len(text), head, (tail + text)[-edge:]
+            return length, head, tail
+
+        stack = [(root, -1)]
+        while stack:
+            el, seen_at = stack.pop()
+            if seen_at < 0:
+                stack.append((el, position))
+                position += 1
+                stack.extend((child, -1) for child in reversed(el) if isinstance(child.tag, str))
+                continue
+            if el.tag in _OWN_STRINGS:
+                text = self._full_text(el)
+                summary[el] = (len(text), text[:edge], text[-edge:])
+                continue
+            # Keys are the elements themselves: that keeps lxml's proxies,
+            # and so their identities, alive for the life of the index.
+            length, head, tail = add(0, "", "", el.text)
+            for child in el:
+                if isinstance(child.tag, str) and child.tag not in _OWN_STRINGS:
+                    n, h, t = summary[child]
+                    if n:
+                        if len(head) < edge:
+                            head = (head + h)[:edge]
+                        tail = (tail + t)[-edge:]
+                        length += n
+                length, head, tail = add(length, head, tail, child.tail)
+            summary[el] = (length, head, tail)
+            if tail.endswith(".md") and el is not root:
+                candidates.append((seen_at, el))
+        candidates.sort(key=lambda item: item[0])
+        self.markers = [el for _, el in candidates]
+
+    @staticmethod
+    def _full_text(el) -> str:
+        pieces: List[str] = []
+
+        def walk(node, own: bool) -> None:
+            if node.text and isinstance(node.tag, str):
+                pieces.append(node.text.strip())
+            for child in node:
+                if isinstance(child.tag, str) and (own or child.tag not in _OWN_STRINGS):
+                    walk(child, own)
+                if child.tail:
+                    pieces.append(child.tail.strip())
+
+        walk(el, el.tag in _OWN_STRINGS)
+        return "".join(pieces)
+
+    def text(self, el) -> str:
+        length, head, _ = self._summary[el]
+        return head if length <= self.EDGE else self._full_text(el)
+
+    def siblings(self, el) -> Iterator:
+        return (sibling for sibling in el.itersiblings() if isinstance(sibling.tag, str))
+
+    def startswith(self, el, prefixes: tuple[str, ...]) -> bool:
+        return self._summary[el][1].startswith(prefixes)
+
+    def ends_section(self, el) -> bool:
+        length, head, tail = self._summary[el]
+        return tail.lower().endswith(".md") or length == 9 and head.lower() == "manifesto"
+
+
+class LxmlView:
+    """How ``render_section`` reads nodes of an lxml tree.
+
+    Each element's markdown wrapper (bold, italic, link, line break or
+    none) is looked up by ``(tag, class, style)`` in an index filled on
+    first sight, so class and style attributes are parsed once per
+    distinct combination.  Inline text is collected into one list per
+    block and joined once; whitespace normalisation only runs on
+    elements whose text contains tabs or newlines, the only case where
+    it changes anything.
+    """
+
+    def __init__(self, bold_classes: Set[str], index: LxmlTextIndex):
+        self.bold_classes = frozenset(bold_classes)
+        self.index = index
+        self._kinds: Dict[tuple, str] = {}
+
+    def skip(self, node) -> bool:
+        return not isinstance(node.tag, str)
+
+    def name(self, node) -> str:
+        return node.tag.lower()
+
+    def stops(self, node) -> bool:
+        return self.index.startswith(node, CHAPTER_STOPS)
+
+    def text(self, node) -> str:
+        return self.index.text(node)
+
+    def items(self, node) -> List:
+        return [child for child in node if child.tag == "li"]
+
+    def html(self, node) -> str:
+        # Rare (tables, rules, …): serialise as BeautifulSoup would.
+        from lxml import etree
+
+        fragment = etree.tostring(node, method="html", encoding="unicode", with_tail=False)
+        return BeautifulSoup(fragment, "lxml").find(node.tag).decode()
+
+    def _kind(self, el) -> str:
+        key = (el.tag, el.get("class"), el.get("style"))
+        kind = self._kinds.get(key)
+        if kind is None:
+            name, classes, style = key
+            name = name.lower()
+            style_lower = (style or "").lower().replace(" ", "")
+            if (
+                name in {"strong", "b"}
+                or any(token in style_lower for token in _BOLD_STYLE_TOKENS)
+                or classes and not self.bold_classes.isdisjoint(classes.split())
+            ):
+                kind = "bold"
+            elif name in {"em", "i"}:
+                kind = "italic"
+            elif name in {"a", "br"}:
+                kind = name
+            else:
+                kind = ""
+            self._kinds[key] = kind
+        return kind
+
+    def _collect(self, el, out: List[str], preserve: bool) -> bool:
+        """Append *el*'s inline markdown to *out*; True if it may need normalising."""
+        dirty = False
+        inner = preserve or el.tag in _PRESERVE_WHITESPACE
+        if el.text:
+            text = _soup_string(el.text, inner)
+            out.append(text)
+            dirty = _NEEDS_NORMALISING.search(text) is not None
+        for child in el:
+            if not isinstance(child.tag, str):
+                # Comments: BeautifulSoup's inline_text keeps their text.
+                if child.text:
+                    text = _soup_string(child.text, inner)
+                    out.append(text)
+                    dirty = dirty or _NEEDS_NORMALISING.search(text) is not None
+            else:
+                kind = self._kind(child)
+                if kind == "br":
+                    out.append("\n")
+                    dirty = True
+                elif kind == "a":
+                    href = _clean_href(child.get("href", "").strip())
+                    text = self.inline(child, inner).strip() or href
+                    text = f"[{text}]({href})" if href else text
+                    out.append(text)
+                    dirty = dirty or "\n" in text
+                else:
+                    marker = "**" if kind == "bold" else "*" if kind == "italic" else ""
+                    if marker:
+                        out.append(marker)
+                    start = len(out)
+                    if self._collect(child, out, inner):
+                        text = _normalise("".join(out[start:]))
+                        del out[start:]
+                        out.append(text)
+                        dirty = dirty or "\n" in text
+                    if marker:
+                        out.append(marker)
+            if child.tail:
+                text = _soup_string(child.tail, inner)
+                out.append(text)
+                dirty = dirty or _NEEDS_NORMALISING.search(text) is not None
+        return dirty
+
+    def inline(self, node, preserve: bool = False) -> str:
+        out: List[str] = []
+        dirty = self._collect(node, out, preserve)
+        text = "".join(out)
+        return _normalise(text) if dirty else text
+
+
+# Map chapter tab names to numbered files
+CHAPTER_MAPPING = {
+    "ch1: attentiveness.md": "1.md",
+    "ch2: responsibility.md": "2.md",
+    "ch3: competence.md": "3.md",
+    "ch4: responsiveness.md": "4.md",
+    "ch5: solidarity.md": "5.md",
+    "ch6: symbiosis.md": "6.md",
+    "ch7: faq.md": "7.md"
+}
+
+
+def render_tabs(html: str, backend: str = "lxml") -> Dict[str, str]:
+    """Render each ``*.md`` tab of the published HTML, keyed by target file.
+
+    *backend* is ``"lxml"`` (fast) or ``"soup"`` (BeautifulSoup); both
+    give the same output.
+    """
+    if backend == "lxml":
+        from lxml import etree
+
+        root = etree.HTML(html)
+        contents = root.find(".//div[@id='contents']") if root is not None else None
+    else:
+        contents = BeautifulSoup(html, "lxml").find("div", id="contents")
     if contents is None:
         raise SystemExit("Could not locate contents div in published document")
 
-    sections = gather_sections(contents)
+    if backend == "lxml":
+        index = LxmlTextIndex(contents)
+        bold_classes = set().union(*(_bold_classes_from_css(style.text or "") for style in contents.iter("style")))
+        view = LxmlView(bold_classes, index)
+    else:
+        index = TextIndex(contents)
+        view = SoupView(extract_bold_classes(contents), index)
+    sections = gather_sections(contents, index)
     if not sections:
         raise SystemExit("No .md tabs found in document")
 
-    bold_classes = extract_bold_classes(contents)
-
-    updated: List[str] = []
+    rendered: Dict[str, str] = {}
     for tab, nodes in sections.items():
-        # Map chapter names to numbered files
-        chapter_mapping = {
-            "ch1: attentiveness.md": "1.md",
-            "ch2: responsibility.md": "2.md", 
-            "ch3: competence.md": "3.md",
-            "ch4: responsiveness.md": "4.md",
-            "ch5: solidarity.md": "5.md",
-            "ch6: symbiosis.md": "6.md",
-            "ch7: faq.md": "7.md"
-        }
-        
-        target_name = chapter_mapping.get(tab, tab)
-        target = Path(target_name)
+        target_name = CHAPTER_MAPPING.get(tab, tab)
         locale = detect_locale(tab)
         # Skip first H1 for chapter files (they have title in front matter)
-        is_chapter = target_name in chapter_mapping.values() or target_name.startswith("tw-") and target_name[3:] in chapter_mapping.values()
-        content = render_section(nodes, locale, bold_classes, skip_first_h1=is_chapter)
-        front = extract_front_matter(target)
-        target.write_text(front + content, encoding="utf-8")
-        updated.append(target_name)
-    return updated
+        is_chapter = target_name in CHAPTER_MAPPING.values() or target_name.startswith("tw-") and target_name[3:] in CHAPTER_MAPPING.values()
+        rendered[target_name] = _render_nodes(nodes, locale, view, skip_first_h1=is_chapter)
+    return rendered
+
+
+def regenerate_markdown(doc_url: str, use_cache: bool = True, backend: str = "lxml") -> List[WriteResult]:
+    cache = FetchCache.load() if use_cache else FetchCache()
+    html = fetch_published(doc_url, cache)
+    if html is None:
+        cache.save()
+        return []
+    outputs: Dict[Path, str] = {}
+    current: Dict[Path, str] = {}
+    for target_name, content in render_tabs(html, backend).items():
+        target = Path(target_name)
+        text = corpus().text(target)
+        if text is None:
+            outputs[target] = content
+            continue
+        front_matter = split_front_matter(text)[0]
+        current[target] = text
+        outputs[target] = (front_matter + "\n\n" if front_matter else "") + content
+    results = write_back(outputs, current)
+    cache.files = {str(path): _sha256(text.encode("utf-8")) for path, text in outputs.items()}
+    cache.save()
+    return results
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--doc-url", default=DEFAULT_DOC_URL, help="Published Google Doc URL")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch and regenerate even if the published Doc looks unchanged",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("lxml", "soup"),
+        default="lxml",
+        help="Render from the lxml tree (default) or through BeautifulSoup",
+    )
     args = parser.parse_args()
 
-    updated = regenerate_markdown(args.doc_url)
-    if updated:
-        print("Updated:", ", ".join(sorted(updated)))
-    else:
+    results = regenerate_markdown(args.doc_url, use_cache=not args.no_cache, backend=args.backend)
+    updated = [result for result in results if result.changed]
+    for result in sorted(updated, key=lambda result: str(result.path)):
+        print(f"Updated {result.path}: {result.describe()}")
+    if not updated:
         print("No markdown tabs updated")
+    elif len(updated) < len(results):
+        print(f"{len(results) - len(updated)} tabs unchanged")
 
 
 if __name__ == "__main__":
@@ -3,7 +3,29 @@
 
 Reads YAML front matter for the page title (→ HEADING_1), parses the
 markdown body into headings / paragraphs / lists with inline formatting,
-then clears the target tab and rebuilds it via a single batchUpdate.
+then updates the target tabs with one batchUpdate per document (split
+into chained chunks when the payload is large).
+
+By default only the paragraphs that differ from the tab's current content
+are deleted and re-inserted, so comments anchored elsewhere in the tab
+survive.  ``--full`` clears the tab and rebuilds it from scratch instead.
+Updates require the revision they were planned against, so if someone
+edits the doc mid-sync the script re-fetches and re-plans.
+
+``--dry-run`` plans every tab as a rewrite of an empty tab without
+credentials or network access and reports request counts and payload
+sizes; ``--emit-requests PATH`` also writes the planned batchUpdate
+bodies as JSON.
+
+``--changed-since REV`` pushes just the synced files changed since REV
+(e.g. ``HEAD~1``), so a whole change set shares one OAuth refresh and one
+fetch per document.
+
+``--watch`` keeps running for local editing: each save (debounced) pushes
+the files whose content changed and reports the save→Doc latency.
+
+Phase timings go to ``DOC_SYNC_TELEMETRY`` / ``$GITHUB_STEP_SUMMARY``
+(see doc_sync_telemetry).
 
 Auth: expects GOOGLE_REFRESH_TOKEN, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
 in the environment (e.g. from GitHub Secrets).
@@ -11,18 +33,35 @@ in the environment (e.g. from GitHub Secrets).
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import re
+import signal
+import subprocess
 import sys
-from collections import defaultdict
+import time
 from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from markdown_it import MarkdownIt
-from doc_sync_config import SITE_URL, TAB_MAP, SYNC_FILES, CONTENT_START, doc_id_for, validate_sync_config
-from doc_sync_auth import build_docs_service
+from doc_sync_config import SITE_URL, SYNC_FILES, Route, sync_plan
+from doc_sync_auth import docs_service_factory
+from doc_sync_corpus import corpus, split_front_matter
+from doc_sync_executor import ApiExecutor, Log, RevisionConflict, run_per_document
+from doc_sync_fetch import DocFetcher, FetchedDocument
+from doc_sync_telemetry import Telemetry
+
+
+@lru_cache(maxsize=None)
+def _markdown_parser():
+    # Imported on first use so --help and config checks start instantly.
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt()
 
-_md = MarkdownIt()
 
 HEADING_STYLE = {
     1: "HEADING_1",
@@ -80,7 +119,7 @@ _HTML_ITALIC_CLOSE = re.compile(r"^</(i|em)>", re.IGNORECASE)
 
 def _parse_inline(text: str, page_path: str = "/faq/") -> list[Span]:
     """Parse inline markdown (bold, italic, links) into Spans via CommonMark."""
-    tokens = _md.parseInline(text, {})
+    tokens = _markdown_parser().parseInline(text, {})
     if not tokens or not tokens[0].children:
         return [Span(text)]
 
@@ -119,30 +158,12 @@ def _parse_inline(text: str, page_path: str = "/faq/") -> list[Span]:
     return spans or [Span(text)]
 
 
-# ── Front-matter parser ─────────────────────────────────────────────
-
-
-def _parse_front_matter(text: str) -> tuple[dict[str, str], str]:
-    if not text.startswith("---"):
-        return {}, text
-    parts = text.split("---", 2)
-    if len(parts) < 3:
-        return {}, text
-
-    fm: dict[str, str] = {}
-    for line in parts[1].strip().splitlines():
-        if ":" in line:
-            key, _, val = line.partition(":")
-            fm[key.strip()] = val.strip().strip("\"'")
-
-    return fm, parts[2].strip()
-
-
 # ── Markdown → Block list ───────────────────────────────────────────
 
 _H4_RE = re.compile(r"<h4[^>]*>(.*?)</h4>", re.DOTALL)
 _HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
 _NUM_LIST_RE = re.compile(r"^(\d+)\.\s+(.+)$")
+_DIV_OPEN_RE = re.compile(r"<div\b")
 
 
 def _strip_html_blocks(body: str) -> str:
@@ -154,8 +175,8 @@ def _strip_html_blocks(body: str) -> str:
     depth = 0
     for line in lines:
         stripped = line.strip()
-        opens = len(re.findall(r"<div\b", stripped))
-        closes = len(re.findall(r"</div>", stripped))
+        opens = len(_DIV_OPEN_RE.findall(stripped)) if "<div" in stripped else 0
+        closes = stripped.count("</div>")
         if depth > 0 or opens > 0:
             depth += opens - closes
             if depth < 0:
@@ -167,7 +188,8 @@ def _strip_html_blocks(body: str) -> str:
 
 def parse_markdown(text: str, filename: str = "faq.md") -> tuple[str, list[Block]]:
     """Return (title_from_frontmatter, blocks)."""
-    fm, body = _parse_front_matter(text)
+    _, fm, body = split_front_matter(text)
+    body = body.strip()
     title = fm.get("title", "")
     # derive page_path from permalink or filename
     permalink = fm.get("permalink", "")
@@ -260,37 +282,22 @@ def parse_markdown(text: str, filename: str = "faq.md") -> tuple[str, list[Block
 # ── Block list → Docs API requests ──────────────────────────────────
 
 
-def _build_requests(
-    title: str,
-    blocks: list[Block],
-    tab_id: str,
-    end_index: int,
-    insert_at: int = 1,
-) -> tuple[list[dict], str]:
-    """Return (requests, assembled_text).
+def _utf16_len(text: str) -> int:
+    """Length of *text* in Docs API index units (UTF-16 code units)."""
+    return len(text.encode("utf-16-le")) // 2
 
-    *insert_at* is the document index where new content is placed.
-    For full-tab sync this is 1 (right after the section break).
-    For partial-tab sync it is the startIndex of the boundary heading,
-    so everything before it is preserved.
-    """
-    requests: list[dict] = []
 
-    # 1. clear managed range
-    if end_index > insert_at + 1:
-        requests.append(
-            {
-                "deleteContentRange": {
-                    "range": {
-                        "startIndex": insert_at,
-                        "endIndex": end_index - 1,
-                        "tabId": tab_id,
-                    }
-                }
-            }
-        )
+@dataclass
+class _Layout:
+    """Assembled tab text plus formatting ranges (offsets from 0)."""
+    text: str
+    para_styles: list[tuple[int, int, str]]
+    text_styles: list[tuple[int, int, Span]]
+    bullet_ranges: list[tuple[int, int, bool]]
 
-    # 2. assemble text and collect formatting metadata
+
+def _assemble(title: str, blocks: list[Block]) -> _Layout:
+    """Lay out *title* and *blocks* as one string with style ranges."""
     parts: list[str] = []
     para_styles: list[tuple[int, int, str]] = []
     text_styles: list[tuple[int, int, Span]] = []
@@ -302,7 +309,7 @@ def _build_requests(
     if title:
         start = cursor
         parts.append(title + "\n")
-        cursor += len(title) + 1
+        cursor += _utf16_len(title) + 1
         para_styles.append((start, cursor, "HEADING_1"))
         # blank line after title
         parts.append("\n")
@@ -319,7 +326,7 @@ def _build_requests(
         for span in block.spans:
             span_start = cursor
             parts.append(span.text)
-            cursor += len(span.text)
+            cursor += _utf16_len(span.text)
             if span.bold or span.italic or span.link:
                 text_styles.append((span_start, cursor, span))
 
@@ -335,7 +342,67 @@ def _build_requests(
         if block.is_list_item:
             bullet_ranges.append((block_start, block_end, block.list_ordered))
 
-    full_text = "".join(parts)
+    return _Layout("".join(parts), para_styles, text_styles, bullet_ranges)
+
+
+def _text_style(bold: bool, italic: bool, link: Optional[str]) -> tuple[dict, list[str]]:
+    """Return (textStyle, fields) setting only the attributes that are on."""
+    style: dict = {}
+    fields: list[str] = []
+    if bold:
+        style["bold"] = True
+        fields.append("bold")
+    if italic:
+        style["italic"] = True
+        fields.append("italic")
+    if link:
+        style["link"] = {"url": link}
+        fields.append("link")
+    return style, fields
+
+
+def _bullet_preset(ordered: bool) -> str:
+    return (
+        "NUMBERED_DECIMAL_ALPHA_ROMAN"
+        if ordered
+        else "BULLET_DISC_CIRCLE_SQUARE"
+    )
+
+
+def _build_requests(
+    title: str,
+    blocks: list[Block],
+    tab_id: str,
+    end_index: int,
+    insert_at: int = 1,
+) -> tuple[list[dict], str]:
+    """Return (requests, assembled_text).
+
+    *insert_at* is the document index where new content is placed.
+    For full-tab sync this is 1 (right after the section break).
+    For partial-tab sync it is the startIndex of the boundary heading,
+    so everything before it is preserved.
+    """
+    requests: list[dict] = []
+
+    # 1. clear managed range
+    if end_index > insert_at + 1:
+        requests.append(
+            {
+                "deleteContentRange": {
+                    "range": {
+                        "startIndex": insert_at,
+                        "endIndex": end_index - 1,
+                        "tabId": tab_id,
+                    }
+                }
+            }
+        )
+
+    # 2. assemble text and collect formatting metadata
+    layout = _assemble(title, blocks)
+    full_text = layout.text
+    text_len = _utf16_len(full_text)
 
     # 3. insert all text
     requests.append(
@@ -356,7 +423,7 @@ def _build_requests(
                 "updateTextStyle": {
                     "range": {
                         "startIndex": insert_at,
-                        "endIndex": insert_at + len(full_text),
+                        "endIndex": insert_at + text_len,
                         "tabId": tab_id,
                     },
                     "textStyle": {"bold": False, "italic": False},
@@ -366,7 +433,7 @@ def _build_requests(
         )
 
     # 5. paragraph styles (headings)
-    for start, end, style in para_styles:
+    for start, end, style in layout.para_styles:
         requests.append(
             {
                 "updateParagraphStyle": {
@@ -382,20 +449,10 @@ def _build_requests(
         )
 
     # 6. text styles (bold, italic, links)
-    for start, end, span in text_styles:
+    for start, end, span in layout.text_styles:
         if start >= end:
             continue
-        style: dict = {}
-        fields: list[str] = []
-        if span.bold:
-            style["bold"] = True
-            fields.append("bold")
-        if span.italic:
-            style["italic"] = True
-            fields.append("italic")
-        if span.link:
-            style["link"] = {"url": span.link}
-            fields.append("link")
+        style, fields = _text_style(span.bold, span.italic, span.link)
         if fields:
             requests.append(
                 {
@@ -413,18 +470,13 @@ def _build_requests(
 
     # 7. bullets — merge consecutive same-type items into one range
     merged: list[tuple[int, int, bool]] = []
-    for start, end, ordered in bullet_ranges:
+    for start, end, ordered in layout.bullet_ranges:
         if merged and merged[-1][2] == ordered and start == merged[-1][1]:
             merged[-1] = (merged[-1][0], end, ordered)
         else:
             merged.append((start, end, ordered))
 
     for start, end, ordered in merged:
-        preset = (
-            "NUMBERED_DECIMAL_ALPHA_ROMAN"
-            if ordered
-            else "BULLET_DISC_CIRCLE_SQUARE"
-        )
         requests.append(
             {
                 "createParagraphBullets": {
@@ -433,7 +485,7 @@ def _build_requests(
                         "endIndex": end + insert_at,
                         "tabId": tab_id,
                     },
-                    "bulletPreset": preset,
+                    "bulletPreset": _bullet_preset(ordered),
                 }
             }
         )
@@ -441,6 +493,385 @@ def _build_requests(
     return requests, full_text
 
 
+# ── Paragraph model for diff sync ───────────────────────────────────
+
+# Style runs inside a paragraph: (start, end, bold, italic, link) with
+# offsets relative to the paragraph start, trailing newline excluded.
+_Run = tuple[int, int, bool, bool, Optional[str]]
+
+ORDERED_GLYPH_TYPES = {
+    "DECIMAL", "ZERO_DECIMAL", "ALPHA", "UPPER_ALPHA", "ROMAN", "UPPER_ROMAN",
+}
+
+
+@dataclass(frozen=True)
+class _Paragraph:
+    """One Docs paragraph reduced to what _build_requests controls."""
+    text: str  # including the trailing "\n"
+    style: str = "NORMAL_TEXT"
+    runs: tuple[_Run, ...] = ()
+    bullet: Optional[bool] = None  # None = no bullet, else ordered?
+
+
+@dataclass
+class _TabParagraph:
+    """A structural element already in the tab, with its Docs indices.
+
+    *para* is ``None`` for anything the paragraph model cannot describe
+    (tables, inline objects, …); such elements never compare equal.
+    """
+    start: int
+    end: int
+    para: Optional[_Paragraph]
+
+
+def _add_run(runs: list[_Run], start: int, end: int, bold: bool, italic: bool, link: Optional[str]) -> None:
+    """Append a styled run, merging it into an identical neighbour."""
+    if start >= end or not (bold or italic or link):
+        return
+    if runs and runs[-1][1] == start and runs[-1][2:] == (bold, italic, link):
+        runs[-1] = (runs[-1][0], end, bold, italic, link)
+    else:
+        runs.append((start, end, bold, italic, link))
+
+
+def _layout_paragraphs(layout: _Layout) -> list[_Paragraph]:
+    """Split an assembled layout into per-paragraph records."""
+    paragraphs: list[_Paragraph] = []
+    cursor = 0
+    for line in layout.text.split("\n")[:-1]:
+        start = cursor
+        body_end = start + _utf16_len(line)
+        end = body_end + 1
+        cursor = end
+
+        style = "NORMAL_TEXT"
+        for s, e, named in layout.para_styles:
+            if s <= start < e:
+                style = named
+        bullet: Optional[bool] = None
+        for s, e, ordered in layout.bullet_ranges:
+            if s <= start < e:
+                bullet = ordered
+        runs: list[_Run] = []
+        for s, e, span in layout.text_styles:
+            lo, hi = max(s, start), min(e, body_end)
+            if lo < hi:
+                _add_run(runs, lo - start, hi - start, span.bold, span.italic, span.link)
+        paragraphs.append(_Paragraph(line + "\n", style, tuple(runs), bullet))
+    return paragraphs
+
+
+def _is_ordered(lists_meta: dict, bullet: dict) -> bool:
+    props = lists_meta.get(bullet.get("listId", ""), {})
+    levels = props.get("listProperties", {}).get("nestingLevels", [])
+    nesting = bullet.get("nestingLevel", 0)
+    if nesting < len(levels):
+        level = levels[nesting]
+        if level.get("glyphType", "") in ORDERED_GLYPH_TYPES:
+            return True
+        return bool(re.match(r"^%\d", level.get("glyphFormat", "")))
+    return False
+
+
+def _tab_paragraphs(body: dict, lists_meta: dict, start: int) -> list[_TabParagraph]:
+    """Read the tab's structural elements from *start* onward."""
+    result: list[_TabParagraph] = []
+    for elem in body.get("content", []):
+        elem_start = elem.get("startIndex", 0)
+        if elem_start < start:
+            continue
+        elem_end = elem["endIndex"]
+        para = elem.get("paragraph")
+        if not para:
+            result.append(_TabParagraph(elem_start, elem_end, None))
+            continue
+
+        parts: list[str] = []
+        runs: list[_Run] = []
+        offset = 0
+        opaque = False
+        for el in para.get("elements", []):
+            tr = el.get("textRun")
+            if tr is None:
+                opaque = True
+                break
+            content = tr.get("content", "")
+            parts.append(content)
+            length = _utf16_len(content)
+            style = tr.get("textStyle", {})
+            _add_run(
+                runs, offset, offset + length - content.endswith("\n"),
+                bool(style.get("bold")), bool(style.get("italic")),
+                style.get("link", {}).get("url"),
+            )
+            offset += length
+        text = "".join(parts)
+        if opaque or offset != elem_end - elem_start or not text.endswith("\n"):
+            result.append(_TabParagraph(elem_start, elem_end, None))
+            continue
+
+        bullet = para.get("bullet")
+        result.append(_TabParagraph(elem_start, elem_end, _Paragraph(
+            text,
+            para.get("paragraphStyle", {}).get("namedStyleType", "NORMAL_TEXT"),
+            tuple(runs),
+            _is_ordered(lists_meta, bullet) if bullet else None,
+        )))
+    return result
+
+
+def _tab_matches(layout: _Layout, body: dict, lists_meta: dict, start: int) -> bool:
+    """True if the tab from *start* on already holds exactly *layout*.
+
+    Text, named paragraph styles, bold/italic/link runs and bullets must
+    all match, followed by the empty final paragraph that a rewrite
+    leaves behind.
+    """
+    old = _tab_paragraphs(body, lists_meta, start)
+    if not old or old[-1].para is None or old[-1].para.text != "\n":
+        return False
+    return [p.para for p in old[:-1]] == _layout_paragraphs(layout)
+
+
+def _insert_paragraph_requests(
+    paragraphs: list[_Paragraph],
+    tab_id: str,
+    at: int,
+    successor: Optional[_Paragraph],
+) -> list[dict]:
+    """Insert *paragraphs* at index *at* and give them their final styles.
+
+    New paragraphs inherit paragraph style and bullets from the paragraph
+    they are inserted into (*successor*), so every inserted paragraph gets
+    an explicit named style and inherited bullets are removed first.
+    """
+    text = "".join(p.text for p in paragraphs)
+    end = at + _utf16_len(text)
+    requests: list[dict] = [
+        {"insertText": {"location": {"index": at, "tabId": tab_id}, "text": text}},
+        {
+            "updateTextStyle": {
+                "range": {"startIndex": at, "endIndex": end, "tabId": tab_id},
+                "textStyle": {"bold": False, "italic": False},
+                "fields": "bold,italic,link",
+            }
+        },
+    ]
+
+    # paragraph styles, one request per run of equal named styles
+    para_ranges: list[tuple[int, int, str]] = []
+    bullet_ranges: list[tuple[int, int, bool]] = []
+    text_styles: list[tuple[int, int, _Run]] = []
+    cursor = at
+    for para in paragraphs:
+        p_end = cursor + _utf16_len(para.text)
+        if para_ranges and para_ranges[-1][2] == para.style:
+            para_ranges[-1] = (para_ranges[-1][0], p_end, para.style)
+        else:
+            para_ranges.append((cursor, p_end, para.style))
+        if para.bullet is not None:
+            if bullet_ranges and bullet_ranges[-1][2] == para.bullet and bullet_ranges[-1][1] == cursor:
+                bullet_ranges[-1] = (bullet_ranges[-1][0], p_end, para.bullet)
+            else:
+                bullet_ranges.append((cursor, p_end, para.bullet))
+        for run in para.runs:
+            text_styles.append((cursor + run[0], cursor + run[1], run))
+        cursor = p_end
+
+    for start, stop, named in para_ranges:
+        requests.append(
+            {
+                "updateParagraphStyle": {
+                    "range": {"startIndex": start, "endIndex": stop, "tabId": tab_id},
+                    "paragraphStyle": {"namedStyleType": named},
+                    "fields": "namedStyleType",
+                }
+            }
+        )
+
+    for start, stop, (_, _, bold, italic, link) in text_styles:
+        style, fields = _text_style(bold, italic, link)
+        requests.append(
+            {
+                "updateTextStyle": {
+                    "range": {"startIndex": start, "endIndex": stop, "tabId": tab_id},
+                    "textStyle": style,
+                    "fields": ",".join(fields),
+                }
+            }
+        )
+
+    if successor is None or successor.bullet is not None:
+        requests.append(
+            {
+                "deleteParagraphBullets": {
+                    "range": {"startIndex": at, "endIndex": end, "tabId": tab_id},
+                }
+            }
+        )
+    for start, stop, ordered in bullet_ranges:
+        requests.append(
+            {
+                "createParagraphBullets": {
+                    "range": {"startIndex": start, "endIndex": stop, "tabId": tab_id},
+                    "bulletPreset": _bullet_preset(ordered),
+                }
+            }
+        )
+    return requests
+
+
+def _build_diff_requests(
+    title: str,
+    blocks: list[Block],
+    tab_id: str,
+    body: dict,
+    lists_meta: dict,
+    insert_at: int = 1,
+) -> Optional[list[dict]]:
+    """Return requests that only touch paragraphs that actually changed.
+
+    The paragraphs already in the tab (from *insert_at* on) are aligned
+    with the paragraphs ``_build_requests`` would produce; each changed
+    region is deleted and re-inserted, working from the end of the tab
+    towards the start so earlier indices stay valid.
+
+    The tab's final paragraph is kept as a sentinel, just as the full
+    rewrite keeps it.  Returns ``None`` when that paragraph is not empty
+    (e.g. the tab was edited by hand); callers then fall back to a full
+    rewrite.
+    """
+    old = _tab_paragraphs(body, lists_meta, insert_at)
+    if not old or old[-1].para is None or old[-1].para.text != "\n":
+        return None
+    sentinel = old.pop()
+    new = _layout_paragraphs(_assemble(title, blocks))
+
+    # opaque elements get a fresh object so they never match anything
+    old_keys = [p.para if p.para is not None else object() for p in old]
+    matcher = SequenceMatcher(None, old_keys, new, autojunk=False)
+
+    requests: list[dict] = []
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+        at = old[i1].start if i1 < len(old) else sentinel.start
+        if i2 > i1:
+            requests.append(
+                {
+                    "deleteContentRange": {
+                        "range": {
+                            "startIndex": at,
+                            "endIndex": old[i2 - 1].end,
+                            "tabId": tab_id,
+                        }
+                    }
+                }
+            )
+        if j2 > j1:
+            successor = old[i2].para if i2 < len(old) else sentinel.para
+            requests.extend(
+                _insert_paragraph_requests(new[j1:j2], tab_id, at, successor)
+            )
+    return requests
+
+
+# ── Request optimisation ────────────────────────────────────────────
+
+# batchUpdate payload bounds; larger request lists are split into
+# ordered chunks.
+MAX_BATCH_REQUESTS = 500
+MAX_BATCH_BYTES = 512 * 1024
+
+# Re-fetch and re-plan this many times when the doc changes mid-sync.
+MAX_REPLANS = 3
+
+_MERGEABLE = ("updateTextStyle", "updateParagraphStyle")
+
+
+def _coalesce_requests(requests: list[dict]) -> list[dict]:
+    """Merge consecutive style requests that cover adjacent ranges.
+
+    Two ``updateTextStyle`` (or ``updateParagraphStyle``) requests in a
+    row with the same tab, style and fields, where the first ends where
+    the second starts, are equivalent to one request over the union.
+    Only neighbours in list order are merged, so the order in which
+    requests take effect is unchanged.
+    """
+    merged: list[dict] = []
+    for req in requests:
+        (kind, body), = req.items()
+        if merged and kind in _MERGEABLE and kind in merged[-1]:
+            prev = merged[-1][kind]
+            prev_range, cur_range = prev["range"], body["range"]
+            same = {k: v for k, v in prev.items() if k != "range"} == {
+                k: v for k, v in body.items() if k != "range"
+            }
+            if (
+                same
+                and prev_range.get("tabId") == cur_range.get("tabId")
+                and prev_range["endIndex"] == cur_range["startIndex"]
+            ):
+                prev_range["endIndex"] = cur_range["endIndex"]
+                continue
+        merged.append({kind: {**body, "range": dict(body["range"])}} if kind in _MERGEABLE else req)
+    return merged
+
+
+def _json_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _chunk_requests(
+    requests: list[dict],
+    max_requests: int = MAX_BATCH_REQUESTS,
+    max_bytes: int = MAX_BATCH_BYTES,
+) -> list[list[dict]]:
+    """Split *requests* into ordered chunks within the payload bounds."""
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    size = 0
+    for req in requests:
+        req_size = _json_size(req)
+        if current and (len(current) >= max_requests or size + req_size > max_bytes):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(req)
+        size += req_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _send_requests(
+    service,
+    executor: ApiExecutor,
+    document_id: str,
+    requests: list[dict],
+    revision_id: str,
+) -> tuple[int, str]:
+    """Send *requests* as chained batchUpdates; return (batches, revision).
+
+    The first chunk requires *revision_id* (the revision the requests
+    were planned against) and every later chunk the revision returned by
+    the previous one, so the chunks apply in order to exactly the state
+    they were planned for.  A concurrent edit raises RevisionConflict.
+    """
+    chunks = _chunk_requests(requests, MAX_BATCH_REQUESTS, MAX_BATCH_BYTES)
+    rev = revision_id
+    for chunk in chunks:
+        body: dict = {"requests": chunk}
+        if rev:
+            body["writeControl"] = {"requiredRevisionId": rev}
+        result = executor.execute("batchUpdate", service.documents().batchUpdate(
+            documentId=document_id,
+            body=body,
+        ))
+        rev = result.get("writeControl", {}).get("requiredRevisionId", "")
+    return len(chunks), rev
+
+
 # ── Helpers ──────────────────────────────────────────────────────────
 
 
@@ -452,22 +883,26 @@ def _validate_paths(files: list[str]) -> list[Path]:
     return paths
 
 
-def _warn_no_tab_mapping(filename: str) -> None:
-    print(f"doc-sync warning: {filename}: missing tab mapping")
+def _warn_no_tab_mapping(filename: str, log: Log = print) -> None:
+    log(f"doc-sync warning: {filename}: missing tab mapping")
 
 
-def _warn_tab_not_found(filename: str, tab_id: str) -> None:
-    print(f"doc-sync warning: {filename}: mapped tab not found in Google Doc: {tab_id}")
+def _warn_tab_not_found(filename: str, tab_id: str, log: Log = print) -> None:
+    log(f"doc-sync warning: {filename}: mapped tab not found in Google Doc: {tab_id}")
 
 
-def _find_tab(tabs: list[dict], target_id: str):
-    for tab in tabs:
-        if tab["tabProperties"]["tabId"] == target_id:
-            return tab
-        found = _find_tab(tab.get("childTabs", []), target_id)
-        if found:
-            return found
-    return None
+def _targets_with_tabs(fetcher: DocFetcher, did: str, targets: list[Path], log: Log = print) -> list[Path]:
+    """Drop targets whose mapped tab does not exist in document *did*."""
+    plan = sync_plan()
+    routes = [plan.route(t.name) for t in targets]
+    present = fetcher.present_tabs(did, {r.tab_id for r in routes if r})
+    kept = []
+    for target, route in zip(targets, routes):
+        if route and route.tab_id not in present:
+            _warn_tab_not_found(target.name, route.tab_id, log)
+            continue
+        kept.append(target)
+    return kept
 
 
 def _find_content_start(body: dict, prefix: str) -> Optional[int]:
@@ -496,63 +931,448 @@ def _find_content_start(body: dict, prefix: str) -> Optional[int]:
 # ── Main ─────────────────────────────────────────────────────────────
 
 
-def main() -> None:
-    validate_sync_config()
-    md_files = sys.argv[1:] if len(sys.argv) > 1 else list(SYNC_FILES)
-    md_paths = _validate_paths(md_files)
+def _changed_files(rev: str) -> list[str]:
+    """Return synced files that differ between *rev* and HEAD."""
+    result = subprocess.run(
+        ["git", "diff", "--name-only", rev, "HEAD", "--", *SYNC_FILES],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(
+            f"doc-sync error: git diff against {rev} failed: {result.stderr.strip()}"
+        )
+    changed = set(result.stdout.split())
+    return [name for name in SYNC_FILES if name in changed]
 
-    service = build_docs_service()
 
-    # Group files by doc ID so each document is fetched once.
-    groups: dict[str, list[Path]] = defaultdict(list)
-    for md_path in md_paths:
-        groups[doc_id_for(md_path.name)].append(md_path)
+def _read_file_list(source: str) -> list[str]:
+    """Read whitespace-separated filenames from *source* (``-`` = stdin)."""
+    if source == "-":
+        return sys.stdin.read().split()
+    return Path(source).read_text(encoding="utf-8").split()
 
-    for did, targets in groups.items():
-        doc = service.documents().get(
-            documentId=did,
-            includeTabsContent=True,
-        ).execute()
 
+def _plan_tab(
+    md_path: Path,
+    tabs: dict[str, dict],
+    full: bool,
+    telemetry: Telemetry,
+    log: Log = print,
+) -> Optional[tuple[list[dict], str]]:
+    """Return (requests, summary) for one file, or None to skip it.
+
+    *tabs* is the fetched document's ``FetchedDocument.tabs``.
+    """
+    filename = md_path.name
+    route = sync_plan().route(filename)
+    if not route:
+        _warn_no_tab_mapping(filename, log)
+        return None
+    tab_id = route.tab_id
+
+    tab = tabs.get(tab_id)
+    if not tab:
+        _warn_tab_not_found(filename, tab_id, log)
+        return None
+
+    did = route.doc_id
+    with telemetry.phase("parse", did, filename) as event:
+        md_text = corpus().text(md_path)
+        title, blocks = parse_markdown(md_text, filename=filename)
+        event.bytes = len(md_text.encode("utf-8"))
+
+    with telemetry.phase("build", did, filename) as event:
+        requests, mode, full_count = _tab_requests(tab, route, title, blocks, full)
+        event.requests = len(requests)
+        event.bytes = _json_size(requests)
+
+    if mode == "unchanged":
+        # The tab already holds exactly what a rewrite would produce
+        # (e.g. right after a pull from the Doc).
+        return [], f"{filename} → tab {tab_id}: unchanged (full rewrite: {full_count} requests)"
+    return requests, (
+        f"{filename} → tab {tab_id}: "
+        f"{len(blocks)} blocks, {len(requests)} requests ({mode}; "
+        f"full rewrite: {full_count})"
+    )
+
+
+def _tab_requests(
+    tab: dict,
+    route: Route,
+    title: str,
+    blocks: list[Block],
+    full: bool,
+) -> tuple[list[dict], str, int]:
+    """Return (requests, mode, full_rewrite_count) for one parsed file."""
+    tab_id = route.tab_id
+    body = tab["documentTab"]["body"]
+    end_index = body["content"][-1]["endIndex"]
+
+    # Determine where managed content starts in the tab.
+    content_prefix = route.content_start
+    if content_prefix:
+        boundary = _find_content_start(body, content_prefix)
+        offset = boundary if boundary is not None else end_index - 1
+    else:
+        offset = 1  # full-tab sync (after section break)
+
+    lists_meta = tab["documentTab"].get("lists", {})
+    requests, full_text = _build_requests(
+        title, blocks, tab_id, end_index, insert_at=offset,
+    )
+    full_count = len(requests)
+
+    if _tab_matches(_assemble(title, blocks), body, lists_meta, offset):
+        return [], "unchanged", full_count
+
+    if not full:
+        diff_requests = _build_diff_requests(
+            title, blocks, tab_id, body, lists_meta, insert_at=offset,
+        )
+        if diff_requests is not None:
+            return diff_requests, "diff", full_count
+    return requests, "full", full_count
+
+
+def _push_document(
+    service,
+    fetcher: DocFetcher,
+    did: str,
+    targets: list[Path],
+    full: bool,
+    telemetry: Telemetry,
+    doc: Optional[FetchedDocument] = None,
+    log: Log = print,
+) -> tuple[int, Optional[FetchedDocument]]:
+    """Plan and apply one document's update.
+
+    Plans against *doc* if given (a copy fetched earlier), else fetches
+    it.  A stale copy fails the revision check and is re-fetched.
+    Returns (requests sent, the document as planned against).
+    """
+    for attempt in range(1, MAX_REPLANS + 1):
+        if doc is None:
+            doc = fetcher.content(did)
+
+        # Tabs have independent index spaces, so every tab's requests
+        # go into one ordered batchUpdate per document.
+        requests: list[dict] = []
+        summaries: list[str] = []
+        for md_path in targets:
+            tab_plan = _plan_tab(md_path, doc.tabs, full, telemetry, log)
+            if tab_plan is None:
+                continue
+            tab_requests, summary = tab_plan
+            requests.extend(tab_requests)
+            summaries.append(summary)
+        if not requests:
+            for summary in summaries:
+                log(summary)
+            return 0, doc
+
+        optimised = _coalesce_requests(requests)
+        try:
+            with telemetry.phase("batchUpdate", did) as event:
+                event.requests = len(optimised)
+                event.bytes = _json_size(optimised)
+                batches, rev = _send_requests(
+                    service, fetcher.executor, did, optimised, doc.revision_id,
+                )
+        except RevisionConflict:
+            # Someone edited the doc since the fetch: re-plan against
+            # the new revision rather than clobbering their change.
+            log(f"doc {did[:12]}…: changed since fetched, re-planning (attempt {attempt})")
+            doc = None
+            continue
+
+        for summary in summaries:
+            log(summary)
+        log(
+            f"doc {did[:12]}…: {len(requests)} → {len(optimised)} requests "
+            f"after coalescing, {batches} batchUpdate(s), rev {(rev or '?')[:12]}…"
+        )
+        return len(optimised), doc
+
+    raise SystemExit(
+        f"doc-sync error: {did}: document kept changing; gave up after {MAX_REPLANS} attempts"
+    )
+
+
+# ── Dry run ──────────────────────────────────────────────────────────
+
+def _blank_document(targets: list[Path]) -> FetchedDocument:
+    """A document holding an empty tab for each of *targets*."""
+    plan = sync_plan()
+    empty_body = {
+        "content": [
+            {"startIndex": 0, "endIndex": 1, "sectionBreak": {}},
+            {
+                "startIndex": 1,
+                "endIndex": 2,
+                "paragraph": {
+                    "elements": [{"startIndex": 1, "endIndex": 2, "textRun": {"content": "\n"}}],
+                    "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                },
+            },
+        ]
+    }
+    tabs = [
+        {
+            "tabProperties": {"tabId": plan.routes[p.name].tab_id},
+            "documentTab": {"body": empty_body, "lists": {}},
+        }
+        for p in targets
+        if p.name in plan.routes
+    ]
+    return FetchedDocument.index({"revisionId": "", "tabs": tabs})
+
+
+def _dry_run(groups: dict[str, list[Path]], emit: Optional[str], telemetry: Telemetry) -> int:
+    """Plan every document offline; return the number of requests."""
+    # With JSON on stdout, the human-readable report goes to stderr.
+    log = sys.stderr if emit == "-" else sys.stdout
+    planned = []
+    total = 0
+    for did, targets in groups.items():
+        tabs = _blank_document(targets).tabs
+        requests: list[dict] = []
+        files = []
         for md_path in targets:
-            filename = md_path.name
-            tab_id = TAB_MAP.get(filename)
-            if not tab_id:
-                _warn_no_tab_mapping(filename)
+            tab_plan = _plan_tab(md_path, tabs, True, telemetry)
+            if tab_plan is None:
                 continue
+            tab_requests, summary = tab_plan
+            requests.extend(tab_requests)
+            print(f"{summary}, {_json_size(tab_requests) / 1024:,.1f} KiB", file=log)
+            files.append({
+                "file": md_path.name,
+                "tabId": sync_plan().routes[md_path.name].tab_id,
+                "requests": len(tab_requests),
+                "bytes": _json_size(tab_requests),
+            })
+        optimised = _coalesce_requests(requests)
+        chunks = _chunk_requests(optimised, MAX_BATCH_REQUESTS, MAX_BATCH_BYTES)
+        size = _json_size(optimised)
+        print(
+            f"doc {did[:12]}…: {len(requests)} → {len(optimised)} requests after "
+            f"coalescing, {len(chunks)} batchUpdate(s), {size / 1024:,.1f} KiB (dry run)",
+            file=log,
+        )
+        planned.append({
+            "documentId": did,
+            "files": files,
+            "requests": len(optimised),
+            "bytes": size,
+            "batchUpdates": [{"requests": chunk} for chunk in chunks],
+        })
+        total += len(optimised)
+
+    if emit:
+        text = json.dumps({"documents": planned}, ensure_ascii=False, indent=1) + "\n"
+        if emit == "-":
+            sys.stdout.write(text)
+        else:
+            Path(emit).write_text(text, encoding="utf-8")
+            print(f"doc-sync: wrote planned requests to {emit}")
+    return total
+
+
+# ── Watch mode ───────────────────────────────────────────────────────
+
+
+def _digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _watch(md_paths: list[Path], full: bool, debounce: float, polling: bool, telemetry: Telemetry) -> None:
+    """Push *md_paths* to their Docs whenever they are saved, until interrupted.
 
-            tab = _find_tab(doc["tabs"], tab_id)
-            if not tab:
-                _warn_tab_not_found(filename, tab_id)
+    One service and one fetched copy of each document are kept for the
+    whole session; a copy made stale by someone else's edit fails the
+    revision check and is re-fetched.  Only files whose content changed
+    are pushed, and each push reports the time from the save (the
+    file's mtime) to the Doc update.
+    """
+    from doc_sync_watch import FileWatcher
+
+    plan = sync_plan()
+    with telemetry.phase("oauth"):
+        service = docs_service_factory()()
+    fetcher = DocFetcher(service, telemetry=telemetry)
+    docs: dict[str, Optional[FetchedDocument]] = {}
+    for did, targets in plan.group(md_paths).items():
+        _targets_with_tabs(fetcher, did, targets)
+        docs[did] = fetcher.content(did)
+    pushed = {path: _digest(path) for path in md_paths}
+
+    # Stop cleanly (with the latency summary) on SIGTERM too.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    watcher = FileWatcher(md_paths, debounce, polling)
+    print(
+        f"doc-sync: watching {len(md_paths)} files ({watcher.kind}, "
+        f"{debounce:g}s debounce); Ctrl-C to stop",
+        flush=True,
+    )
+    latencies: list[float] = []
+    try:
+        for batch in watcher.batches():
+            changed = [path for path in md_paths if path in batch and _digest(path) != pushed[path]]
+            if not changed:
                 continue
+            for did, targets in plan.group(changed).items():
+                saved = max(path.stat().st_mtime for path in targets)
+                started = time.time()
+                sent, doc = _push_document(service, fetcher, did, targets, full, telemetry, docs.get(did))
+                done = time.time()
+                latency = done - saved
+                latencies.append(latency)
+                telemetry.record("save→doc", latency, did, ", ".join(p.name for p in targets), requests=sent)
+                print(
+                    f"doc-sync: {', '.join(p.name for p in targets)} → doc {did[:12]}… "
+                    f"{latency:.2f}s after save ({started - saved:.2f}s debounce, {done - started:.2f}s push)",
+                    flush=True,
+                )
+                for path in targets:
+                    pushed[path] = _digest(path)
+                # Refresh the cached copy now, off the save→Doc path.
+                docs[did] = fetcher.content(did) if sent else doc
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    if latencies:
+        latencies.sort()
+        print(
+            f"doc-sync: {len(latencies)} pushes, save→Doc p50 {latencies[len(latencies) // 2]:.2f}s "
+            f"max {latencies[-1]:.2f}s"
+        )
+    print(fetcher.summary())
+    print(fetcher.executor.summary())
 
-            body = tab["documentTab"]["body"]
-            end_index = body["content"][-1]["endIndex"]
 
-            # Determine where managed content starts in the tab.
-            content_prefix = CONTENT_START.get(filename)
-            if content_prefix:
-                boundary = _find_content_start(body, content_prefix)
-                offset = boundary if boundary is not None else end_index - 1
-            else:
-                offset = 1  # full-tab sync (after section break)
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Markdown files to push (default: all synced files)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REV",
+        help="Push the synced files that changed between REV and HEAD",
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="PATH",
+        help="Read files to push from PATH (whitespace-separated, - for stdin)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Clear and rebuild each tab instead of updating changed paragraphs",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Plan requests against empty tabs without credentials or network access",
+    )
+    parser.add_argument(
+        "--emit-requests",
+        metavar="PATH",
+        help="Write the planned batchUpdate bodies as JSON to PATH (- for stdout); implies --dry-run",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Documents to sync concurrently (default: DOC_SYNC_WORKERS or 4)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and push files (default: all synced files) whenever they are saved",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="With --watch: wait this long after the last save before pushing",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch: poll file mtimes instead of using inotify",
+    )
+    return parser
 
-            md_text = md_path.read_text(encoding="utf-8")
-            title, blocks = parse_markdown(md_text, filename=filename)
-            requests, full_text = _build_requests(
-                title, blocks, tab_id, end_index, insert_at=offset,
-            )
 
-            result = service.documents().batchUpdate(
-                documentId=did,
-                body={"requests": requests},
-            ).execute()
+def main() -> None:
+    args = build_parser().parse_args()
+    plan = sync_plan()
+    started = time.perf_counter()
+    telemetry = Telemetry("sync_to_google_doc")
+
+    md_files = list(args.files)
+    if args.files_from:
+        md_files += _read_file_list(args.files_from)
+    if args.changed_since:
+        md_files += _changed_files(args.changed_since)
+        if not md_files:
+            print(f"doc-sync: no synced files changed since {args.changed_since}")
+            return
+    md_files = list(dict.fromkeys(md_files or SYNC_FILES))
+    md_paths = _validate_paths(md_files)
 
-            rev = result.get("writeControl", {}).get("requiredRevisionId", "?")
-            print(
-                f"{filename} → tab {tab_id}: "
-                f"{len(blocks)} blocks, {len(requests)} requests, rev {rev[:12]}…"
-            )
+    groups = plan.group(md_paths)
+
+    if args.watch:
+        _watch(md_paths, args.full, args.debounce, args.poll, telemetry)
+        telemetry.write()
+        return
+
+    if args.dry_run or args.emit_requests:
+        total_requests = _dry_run(groups, args.emit_requests, telemetry)
+        elapsed = time.perf_counter() - started
+        print(
+            f"doc-sync: {len(md_paths)} files, {len(groups)} documents, "
+            f"{total_requests} requests planned in {elapsed:.2f}s (dry run)",
+            file=sys.stderr if args.emit_requests == "-" else sys.stdout,
+        )
+        telemetry.write()
+        return
+
+    with telemetry.phase("oauth"):
+        make_service = docs_service_factory()
+
+    fetcher = DocFetcher(None, telemetry=telemetry)
+
+    def push_document(did: str, targets: list[Path], log: Log) -> int:
+        """Fetch, plan and update one document; return requests sent."""
+        service = make_service()
+        doc_fetcher = fetcher.for_service(service)
+        targets = _targets_with_tabs(doc_fetcher, did, targets, log)
+        if not targets:
+            return 0
+        return _push_document(service, doc_fetcher, did, targets, args.full, telemetry, log=log)[0]
+
+    # EN and TW documents are independent: update them concurrently.
+    total_requests = sum(run_per_document(groups, push_document, args.jobs))
+
+    elapsed = time.perf_counter() - started
+    print(fetcher.summary())
+    print(fetcher.executor.summary())
+    print(
+        f"doc-sync: {len(md_paths)} files, {len(groups)} documents, "
+        f"{total_requests} requests in {elapsed:.2f}s"
+    )
+    telemetry.write()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+"""Make the flat .github modules importable, as running them as scripts does."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
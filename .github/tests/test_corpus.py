@@ -0,0 +1,34 @@
+"""Corpus.text reads pages without parsing them."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from doc_sync_corpus import Corpus
+
+PAGE = "---\ntitle: FAQ\n---\n\nIntro.\n\n<div class=\"audio\">\n\n## Listen\n\n</div>\n"
+
+
+def test_text_is_read_without_parsing_or_loading_the_cache(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_text(PAGE, encoding="utf-8")
+    pages = Corpus(tmp_path / "corpus.pickle", tmp_path)
+
+    assert pages.text(path) == PAGE
+    assert pages.text(tmp_path / "missing.md") is None
+    assert pages.parsed == 0
+    assert pages._entries is None
+
+
+def test_text_follows_edits_to_a_parsed_page(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_text(PAGE, encoding="utf-8")
+    pages = Corpus(tmp_path / "corpus.pickle", tmp_path)
+    assert pages.page(path).text == PAGE
+    assert pages.text(path) == PAGE
+
+    path.write_text(PAGE + "More.\n", encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+    assert pages.text(path) == PAGE + "More.\n"
+    assert pages.parsed == 1
@@ -0,0 +1,149 @@
+"""Diff-mode pushes must leave a tab exactly as a full rewrite would.
+
+Random pages are pushed to the emulator, edited at random, and pushed
+again in diff mode; the tab is then compared with a fresh tab that got
+the edited page as a full rewrite.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from doc_sync_config import Route
+from doc_sync_emulator import EmulatedDocsService
+from doc_sync_fetch import FetchedDocument
+from sync_to_google_doc import _tab_paragraphs, _tab_requests, parse_markdown
+
+DOC_ID = "doc"
+TAB_ID = "t.0"
+ROUTE = Route("faq.md", DOC_ID, TAB_ID)
+
+WORDS = ("civic", "care", "plurality", "公民", "照顧", "🌱", "AI", "trust", "x")
+
+
+def _words(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+
+
+def _inline(rng: random.Random) -> str:
+    text = _words(rng)
+    kind = rng.randrange(5)
+    if kind == 0:
+        text += f" **{_words(rng)}**"
+    elif kind == 1:
+        text += f" *{_words(rng)}*"
+    elif kind == 2:
+        text += f" [{_words(rng)}](/{rng.choice(WORDS[:3])}/)"
+    return text
+
+
+def _line(rng: random.Random) -> str:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return "#" * rng.randint(2, 4) + " " + _inline(rng)
+    if kind == 1:
+        return "- " + _inline(rng)
+    if kind == 2:
+        return f"{rng.randint(1, 3)}. " + _inline(rng)
+    if kind == 3:
+        return ""
+    return _inline(rng)
+
+
+def _page(lines: list[str], title: str = "Page") -> str:
+    return f"---\ntitle: {title}\n---\n\n" + "\n".join(lines) + "\n"
+
+
+def _edit(rng: random.Random, lines: list[str]) -> list[str]:
+    lines = list(lines)
+    for _ in range(rng.randint(1, 4)):
+        op = rng.randrange(4)
+        at = rng.randrange(len(lines) + 1)
+        if op == 0 or not lines:
+            lines.insert(at, _line(rng))
+        elif op == 1:
+            del lines[min(at, len(lines) - 1)]
+        elif op == 2:
+            lines[min(at, len(lines) - 1)] = _line(rng)
+        else:
+            i, j = rng.randrange(len(lines)), rng.randrange(len(lines))
+            lines[i], lines[j] = lines[j], lines[i]
+    return lines
+
+
+def _service(text: str = "") -> EmulatedDocsService:
+    service = EmulatedDocsService()
+    service.add_document(DOC_ID).add_tab(TAB_ID, text)
+    return service
+
+
+def _tab(service: EmulatedDocsService) -> dict:
+    doc = service.documents().get(documentId=DOC_ID, includeTabsContent=True).execute()
+    return FetchedDocument.index(doc).tabs[TAB_ID]
+
+
+def _push(service: EmulatedDocsService, page: str, full: bool) -> str:
+    title, blocks = parse_markdown(page, ROUTE.filename)
+    requests, mode, _ = _tab_requests(_tab(service), ROUTE, title, blocks, full)
+    if requests:
+        service.documents().batchUpdate(documentId=DOC_ID, body={"requests": requests}).execute()
+    return mode
+
+
+def _paragraphs(service: EmulatedDocsService) -> list:
+    tab = _tab(service)["documentTab"]
+    return [p.para for p in _tab_paragraphs(tab["body"], tab.get("lists", {}), 1)]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_diff_push_matches_full_rewrite(seed: int) -> None:
+    rng = random.Random(seed)
+    before = [_line(rng) for _ in range(rng.randint(0, 12))]
+    after = _edit(rng, before)
+
+    synced = _service()
+    _push(synced, _page(before), full=True)
+    assert _push(synced, _page(after), full=False) in ("diff", "unchanged")
+
+    rewritten = _service()
+    _push(rewritten, _page(after), full=True)
+
+    assert _paragraphs(synced) == _paragraphs(rewritten)
+    assert synced.document(DOC_ID).find_tab(TAB_ID).text() == rewritten.document(DOC_ID).find_tab(TAB_ID).text()
+    assert _push(synced, _page(after), full=False) == "unchanged"
+
+
+def test_diff_push_into_empty_tab() -> None:
+    rng = random.Random(0)
+    page = _page([_line(rng) for _ in range(8)])
+    synced, rewritten = _service(), _service()
+    assert _push(synced, page, full=False) == "diff"
+    _push(rewritten, page, full=True)
+    assert _paragraphs(synced) == _paragraphs(rewritten)
+
+
+def test_diff_touches_only_changed_paragraphs() -> None:
+    lines = [f"Paragraph {i} {_words(random.Random(i))}" for i in range(20)]
+    service = _service()
+    _push(service, _page(lines), full=True)
+    applied = service.requests_applied
+
+    lines[10] = "Paragraph 10 rewritten"
+    assert _push(service, _page(lines), full=False) == "diff"
+    # one paragraph deleted and re-inserted, not the whole tab
+    assert service.requests_applied - applied <= 4
+
+
+def test_hand_edited_tail_falls_back_to_full_rewrite() -> None:
+    page = _page(["First paragraph", "", "Second paragraph"])
+    service = _service()
+    _push(service, page, full=True)
+    tab = service.document(DOC_ID).find_tab(TAB_ID)
+    tab.insert_text(tab.end_index - 1, "typed by hand")
+
+    assert _push(service, page, full=False) == "full"
+    rewritten = _service()
+    _push(rewritten, page, full=True)
+    assert _paragraphs(service) == _paragraphs(rewritten)
@@ -0,0 +1,167 @@
+"""ApiExecutor retries and revision conflicts, driven by the emulator's
+fault injection."""
+
+from __future__ import annotations
+
+import pytest
+
+from doc_sync_config import REPO_ROOT, sync_plan
+from doc_sync_emulator import EmulatedDocsService, EmulatorError, service_for_sync_files
+from doc_sync_executor import ApiExecutor, RevisionConflict
+from doc_sync_fetch import DocFetcher
+from doc_sync_telemetry import Telemetry
+from sync_to_google_doc import MAX_REPLANS, _push_document
+
+
+class _Response(dict):
+    """httplib2-style response: headers by key plus a ``status``."""
+
+    def __init__(self, status: int, **headers: str):
+        super().__init__(headers)
+        self.status = status
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, **headers: str):
+        super().__init__(f"HTTP {status}")
+        self.resp = _Response(status, **headers)
+
+
+class _Failing:
+    """A request that raises each of *errors* in turn, then succeeds."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def execute(self) -> dict:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+def _executor(delays: list[float], **kwargs) -> ApiExecutor:
+    return ApiExecutor(sleep=delays.append, **kwargs)
+
+
+def _service() -> EmulatedDocsService:
+    service = EmulatedDocsService()
+    service.add_document("doc").add_tab("t.0", "hello\n")
+    return service
+
+
+def test_quota_error_is_retried_then_succeeds() -> None:
+    service, delays = _service(), []
+    service.faults = [429, None]
+    executor = _executor(delays, base_delay=1.0)
+
+    doc = executor.execute("get", service.documents().get(documentId="doc"))
+
+    assert doc["documentId"] == "doc"
+    assert len(delays) == 1 and 0.5 <= delays[0] <= 1.0
+    assert executor.stats["get"].retries == 1
+    assert executor.stats["get"].failures == 0
+
+
+def test_server_error_gives_up_after_max_attempts() -> None:
+    service, delays = _service(), []
+    service.faults = [503] * 3
+    executor = _executor(delays, max_attempts=3, base_delay=1.0, max_delay=1.5)
+
+    with pytest.raises(EmulatorError) as raised:
+        executor.execute("get", service.documents().get(documentId="doc"))
+
+    assert raised.value.status == 503
+    assert len(delays) == 2
+    assert delays[1] <= 1.5  # capped at max_delay
+    assert executor.stats["get"].failures == 1
+    assert not service.faults
+
+
+def test_client_error_is_not_retried() -> None:
+    delays: list[float] = []
+    executor = _executor(delays)
+    with pytest.raises(EmulatorError):
+        executor.execute("get", _service().documents().get(documentId="missing"))
+    assert delays == []
+
+
+def test_retry_after_header_sets_the_delay() -> None:
+    delays: list[float] = []
+    request = _Failing(_HttpError(429, **{"retry-after": "7"}), _HttpError(503))
+    executor = _executor(delays, base_delay=1.0)
+
+    assert executor.execute("batchUpdate", request) == {"ok": True}
+    assert request.calls == 3
+    assert delays[0] == 7.0
+    assert 1.0 <= delays[1] <= 2.0  # no header: exponential backoff
+
+
+def test_unparsable_retry_after_falls_back_to_backoff() -> None:
+    delays: list[float] = []
+    request = _Failing(_HttpError(429, **{"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}))
+    _executor(delays, base_delay=1.0).execute("get", request)
+    assert 0.5 <= delays[0] <= 1.0
+
+
+def test_stale_revision_raises_revision_conflict() -> None:
+    service = _service()
+    executor = _executor([])
+    body = {
+        "requests": [{"insertText": {"location": {"index": 1, "tabId": "t.0"}, "text": "x"}}],
+        "writeControl": {"requiredRevisionId": "stale"},
+    }
+    with pytest.raises(RevisionConflict):
+        executor.execute("batchUpdate", service.documents().batchUpdate(documentId="doc", body=body))
+    assert executor.stats["batchUpdate"].conflicts == 1
+
+
+# ── Re-planning in _push_document ──
+
+
+def _concurrent_edit(service: EmulatedDocsService, did: str, tab_id: str):
+    """A fault that edits *tab_id* as another Docs user would."""
+    def edit() -> None:
+        doc = service.document(did)
+        doc.find_tab(tab_id).insert_text(1, "Edited meanwhile\n")
+        doc.revision += 1
+    return edit
+
+
+def test_revision_conflict_replans_against_the_new_revision() -> None:
+    plan = sync_plan()
+    route = plan.route("faq.md")
+    other = next(r for r in plan.routes.values() if r.doc_id == route.doc_id and r != route)
+    service = service_for_sync_files()
+    fetcher = DocFetcher(service, _executor([]))
+    # content fetch, then the concurrent edit just before the batchUpdate
+    service.faults = [None, _concurrent_edit(service, route.doc_id, other.tab_id)]
+    log: list[str] = []
+
+    sent, _ = _push_document(
+        service, fetcher, route.doc_id, [REPO_ROOT / "faq.md"], False, Telemetry(), log=log.append,
+    )
+
+    assert sent > 0
+    # the rejected batchUpdate, then a fresh fetch and plan that applies
+    assert service.calls == [("get", route.doc_id), ("batchUpdate", route.doc_id)] * 2
+    assert fetcher.executor.stats["batchUpdate"].conflicts == 1
+    assert any("re-planning" in line for line in log)
+    doc = service.document(route.doc_id)
+    assert doc.find_tab(other.tab_id).text().startswith("Edited meanwhile\n")
+    assert doc.find_tab(route.tab_id).text() != "\n"
+
+
+def test_document_that_keeps_changing_gives_up() -> None:
+    route = sync_plan().route("faq.md")
+    service = service_for_sync_files()
+    fetcher = DocFetcher(service, _executor([]))
+    edit = _concurrent_edit(service, route.doc_id, route.tab_id)
+    service.faults = [None, edit] * MAX_REPLANS
+
+    with pytest.raises(SystemExit, match="kept changing"):
+        _push_document(
+            service, fetcher, route.doc_id, [REPO_ROOT / "faq.md"], False, Telemetry(), log=lambda line: None,
+        )
+    assert fetcher.executor.stats["batchUpdate"].conflicts == MAX_REPLANS
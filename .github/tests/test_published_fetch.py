@@ -0,0 +1,152 @@
+"""Conditional fetches of the published Doc against PublishedDocServer."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+import pytest
+
+import sync_google_doc_tabs
+from doc_sync_emulator import PublishedDocServer
+from sync_google_doc_tabs import FetchCache, fetch_published
+
+PAGE = "<html><body><p>公民 AI — civic.ai</p></body></html>"
+REPUBLISHED = "<html><body><p>Edited</p></body></html>"
+
+
+@pytest.fixture(autouse=True)
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Run in a scratch directory with its own cache; record retry sleeps."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sync_google_doc_tabs, "CACHE_DIR", tmp_path / "cache")
+    delays: list[float] = []
+    monkeypatch.setattr(sync_google_doc_tabs.time, "sleep", delays.append)
+    return delays
+
+
+def _written(cache: FetchCache, name: str = "faq.md", text: str = "# FAQ\n") -> None:
+    """Record *name* as written by the last run, as regenerate_markdown does."""
+    Path(name).write_text(text, encoding="utf-8")
+    cache.files = {name: hashlib.sha256(text.encode("utf-8")).hexdigest()}
+
+
+def test_first_fetch_stores_validators() -> None:
+    with PublishedDocServer(PAGE) as server:
+        cache = FetchCache()
+        assert fetch_published(server.url, cache) == PAGE
+    assert cache.url == server.url
+    assert cache.etag == server.etag
+    assert cache.last_modified == server.last_modified
+    assert cache.sha256 == hashlib.sha256(PAGE.encode("utf-8")).hexdigest()
+    assert server.responses == {200: 1}
+
+
+def test_unchanged_doc_is_a_304() -> None:
+    with PublishedDocServer(PAGE) as server:
+        cache = FetchCache()
+        fetch_published(server.url, cache)
+        _written(cache)
+        assert fetch_published(server.url, cache) is None
+    assert server.responses == {200: 1, 304: 1}
+
+
+def test_last_modified_alone_is_sent_back() -> None:
+    with PublishedDocServer(PAGE) as server:
+        cache = FetchCache()
+        fetch_published(server.url, cache)
+        _written(cache)
+        cache.etag = ""
+        assert fetch_published(server.url, cache) is None
+    assert server.responses[304] == 1
+
+
+def test_republished_doc_is_fetched_again() -> None:
+    with PublishedDocServer(PAGE) as server:
+        cache = FetchCache()
+        fetch_published(server.url, cache)
+        _written(cache)
+        server.publish(REPUBLISHED)
+        assert fetch_published(server.url, cache) == REPUBLISHED
+    assert cache.etag == server.etag
+    assert server.responses == {200: 2}
+
+
+def test_identical_body_without_validators_is_skipped() -> None:
+    with PublishedDocServer(PAGE, validators=False) as server:
+        cache = FetchCache()
+        fetch_published(server.url, cache)
+        assert cache.etag == cache.last_modified == ""
+        _written(cache)
+        assert fetch_published(server.url, cache) is None
+    assert server.responses == {200: 2}
+
+
+def test_missing_output_forces_a_full_fetch() -> None:
+    with PublishedDocServer(PAGE) as server:
+        cache = FetchCache()
+        fetch_published(server.url, cache)
+        _written(cache)
+        Path("faq.md").unlink()
+        assert fetch_published(server.url, cache) == PAGE
+    assert server.responses == {200: 2}
+
+
+def test_gzip_body_is_decoded() -> None:
+    with PublishedDocServer(PAGE, compress=True) as server:
+        request = Request(server.url, headers={"Accept-Encoding": "gzip"})
+        with urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+        assert fetch_published(server.url, FetchCache()) == PAGE
+
+
+def test_transient_errors_are_retried(workspace: list[float]) -> None:
+    with PublishedDocServer(PAGE) as server:
+        server.faults = [503, 429]
+        assert fetch_published(server.url, FetchCache()) == PAGE
+    assert server.responses == {503: 1, 429: 1, 200: 1}
+    assert workspace == [1, 2]
+
+
+def test_persistent_server_error_gives_up(workspace: list[float]) -> None:
+    with PublishedDocServer(PAGE) as server:
+        server.faults = [500] * (sync_google_doc_tabs.FETCH_RETRIES + 1)
+        with pytest.raises(SystemExit, match="HTTP 500"):
+            fetch_published(server.url, FetchCache())
+    assert len(workspace) == sync_google_doc_tabs.FETCH_RETRIES
+
+
+def test_client_error_is_not_retried(workspace: list[float]) -> None:
+    with PublishedDocServer(PAGE) as server:
+        server.faults = [404]
+        with pytest.raises(SystemExit, match="HTTP 404"):
+            fetch_published(server.url, FetchCache())
+    assert workspace == []
+
+
+# ── FetchCache ──
+
+
+def test_files_intact() -> None:
+    cache = FetchCache()
+    assert not cache.files_intact()  # nothing written yet
+    _written(cache)
+    assert cache.files_intact()
+    Path("faq.md").write_text("# Edited\n", encoding="utf-8")
+    assert not cache.files_intact()
+    Path("faq.md").unlink()
+    assert not cache.files_intact()
+
+
+def test_cache_round_trip() -> None:
+    cache = FetchCache("https://example.com/pub", '"abc"', "Mon, 19 Oct 2026 00:00:00 GMT", "f00")
+    _written(cache)
+    cache.save()
+    assert FetchCache.load() == cache
+
+
+def test_unreadable_cache_loads_empty() -> None:
+    FetchCache.path().parent.mkdir(parents=True)
+    FetchCache.path().write_text("{not json", encoding="utf-8")
+    assert FetchCache.load() == FetchCache()
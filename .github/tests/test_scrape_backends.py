@@ -0,0 +1,104 @@
+"""The lxml and BeautifulSoup scrapers must find the same tab sections."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from doc_sync_bench import published_doc_html
+from sync_google_doc_tabs import LxmlTextIndex, TextIndex, gather_sections, render_tabs
+
+TABS = ("faq.md", "1.md", "tw-faq.md", "tw-1.md")
+TEXT = ("civic", "care", "關懷", "plurality", "&amp;", "&nbsp;", " ", "\n", "Chapter 8: Next")
+
+
+def _inline(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 3)):
+        roll = rng.random()
+        if roll < 0.5 or depth > 2:
+            parts.append(rng.choice(TEXT))
+        elif roll < 0.7:
+            tag = rng.choice(("span", "b", "i", "em", "strong"))
+            parts.append(f'<{tag} class="c{rng.randint(0, 3)}">{_inline(rng, depth + 1)}</{tag}>')
+        elif roll < 0.8:
+            parts.append(f'<a href="https://www.google.com/url?q=/x/&amp;sa=D">{_inline(rng, depth + 1)}</a>')
+        elif roll < 0.9:
+            parts.append("<!-- comment.md -->")
+        else:
+            parts.append("<br>")
+    return "".join(parts)
+
+
+def _marker(rng: random.Random, name: str) -> str:
+    cut = rng.randrange(len(name) + 1)
+    spans = f"<span>{name[:cut]}</span><span>{name[cut:]}</span>"
+    padding = rng.choice(("", " ", "\n"))
+    return f'<p class="c2">{padding}{spans}{padding}</p>'
+
+
+def _block(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.5:
+        return f'<p class="c2">{_inline(rng)}</p>'
+    if roll < 0.65:
+        level = rng.randint(1, 3)
+        return f"<h{level}>{_inline(rng)}</h{level}>"
+    if roll < 0.8:
+        items = "".join(f"<li>{_inline(rng)}</li>" for _ in range(rng.randint(1, 3)))
+        tag = rng.choice(("ul", "ol"))
+        return f'<{tag} class="lst">{items}</{tag}>'
+    if roll < 0.9:
+        return f"<div><p>{_inline(rng)}</p>{rng.choice(TEXT)}</div>"
+    return '<style type="text/css">.c1{font-weight:700}</style>'
+
+
+def fuzzed_html(seed: int) -> str:
+    rng = random.Random(seed)
+    parts = ['<html><body><div id="contents">']
+    for name in rng.sample(TABS, rng.randint(1, len(TABS))) + [rng.choice(TABS)]:
+        parts.append(_marker(rng, name))
+        parts.extend(_block(rng) for _ in range(rng.randint(0, 6)))
+    if rng.random() < 0.5:
+        parts.append('<p class="c2"><span>manifesto</span></p>' + _block(rng))
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+
+def _soup_sections(html: str) -> dict:
+    contents = BeautifulSoup(html, "lxml").find("div", id="contents")
+    index = TextIndex(contents)
+    return {
+        name: [(node.name, {k: " ".join(v) if isinstance(v, list) else v for k, v in node.attrs.items()},
+                index.text(node)) for node in nodes]
+        for name, nodes in gather_sections(contents, index).items()
+    }
+
+
+def _lxml_sections(html: str) -> dict:
+    contents = etree.HTML(html).find(".//div[@id='contents']")
+    index = LxmlTextIndex(contents)
+    return {
+        name: [(node.tag, dict(node.attrib), index.text(node)) for node in nodes]
+        for name, nodes in gather_sections(contents, index).items()
+    }
+
+
+def test_backends_agree_on_the_published_fixture() -> None:
+    html = published_doc_html()
+    sections = _lxml_sections(html)
+    assert len(sections) > 1
+    assert sections == _soup_sections(html)
+    assert render_tabs(html, "lxml") == render_tabs(html, "soup")
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_backends_agree_on_fuzzed_pages(seed: int) -> None:
+    html = fuzzed_html(seed)
+    sections = _lxml_sections(html)
+    assert sections
+    assert sections == _soup_sections(html)
+    assert render_tabs(html, "lxml") == render_tabs(html, "soup")
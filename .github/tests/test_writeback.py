@@ -0,0 +1,154 @@
+"""changed_bytes and write_back."""
+
+from __future__ import annotations
+
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from doc_sync_writeback import changed_bytes, open_atomic, write_back
+
+OLD = b"---\ntitle: FAQ\n---\n\n#### What is civic AI?\n\nCare, at scale.\n"
+
+
+def _naive_changed_bytes(old: bytes, new: bytes) -> int:
+    if old == new:
+        return 0
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return max(len(old), len(new)) - prefix - suffix
+
+
+def _replace_byte(data: bytes, at: int) -> bytes:
+    return data[:at] + bytes([data[at] ^ 1]) + data[at + 1:]
+
+
+def test_identical() -> None:
+    assert changed_bytes(OLD, OLD) == 0
+    assert changed_bytes(b"", b"") == 0
+
+
+@pytest.mark.parametrize("at", [0, len(OLD) // 2, len(OLD) - 1])
+def test_single_byte_change(at: int) -> None:
+    assert changed_bytes(OLD, _replace_byte(OLD, at)) == 1
+
+
+@pytest.mark.parametrize("new, expected", [
+    (OLD + b"More.\n", 6),                         # appended
+    (b"<!-- x -->\n" + OLD, 11),                   # prepended
+    (OLD.replace(b"Care", b"Caring care"), 7),     # grown in the middle
+    (OLD.replace(b"Care, at scale.", b""), 15),    # shrunk in the middle
+    (b"", len(OLD)),                               # emptied
+])
+def test_length_change(new: bytes, expected: int) -> None:
+    assert changed_bytes(OLD, new) == expected
+    assert changed_bytes(new, OLD) == expected
+
+
+def test_repeated_bytes_are_not_counted_twice() -> None:
+    # the prefix and suffix may not overlap: "aaa" → "aaaa" is one byte
+    assert changed_bytes(b"aaa", b"aaaa") == 1
+    assert changed_bytes(b"abab", b"ab") == 2
+
+
+def test_matches_a_byte_by_byte_scan() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        old = bytes(rng.choice(b"ab\n") for _ in range(rng.randint(0, 40)))
+        new = bytearray(old)
+        for _ in range(rng.randint(0, 3)):
+            at = rng.randint(0, len(new))
+            if rng.random() < 0.5 and at < len(new):
+                del new[at:at + rng.randint(1, 4)]
+            else:
+                new[at:at] = bytes(rng.choice(b"ab\n") for _ in range(rng.randint(1, 4)))
+        assert changed_bytes(old, bytes(new)) == _naive_changed_bytes(old, bytes(new))
+
+
+# ── write_back ──
+
+
+def test_identical_file_is_left_alone(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_bytes(OLD)
+    os.utime(path, ns=(0, 0))
+    inode = path.stat().st_ino
+
+    [result] = write_back({path: OLD.decode("utf-8")})
+
+    assert not result.changed and result.describe() == "unchanged"
+    assert path.stat().st_mtime_ns == 0
+    assert path.stat().st_ino == inode
+
+
+@pytest.mark.parametrize("at", [0, len(OLD) // 2, len(OLD) - 1])
+def test_single_byte_change_is_written(tmp_path: Path, at: int) -> None:
+    path = tmp_path / "faq.md"
+    path.write_bytes(OLD)
+    new = _replace_byte(OLD, at)
+
+    [result] = write_back({path: new.decode("utf-8")})
+
+    assert result.changed_bytes == 1
+    assert (result.old_size, result.new_size) == (len(OLD), len(OLD))
+    assert path.read_bytes() == new
+
+
+def test_missing_target_is_created(tmp_path: Path) -> None:
+    path = tmp_path / "tw-faq.md"
+    [result] = write_back({path: "# 常見問題\n"})
+    assert result.old_size == -1
+    assert result.changed_bytes == result.new_size == len("# 常見問題\n".encode("utf-8"))
+    assert result.describe().startswith("new, ")
+    assert path.read_text(encoding="utf-8") == "# 常見問題\n"
+
+
+def test_length_change_is_written(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_bytes(OLD)
+    path.chmod(0o600)
+    new = OLD + b"More.\n"
+
+    [result] = write_back({path: new.decode("utf-8")})
+
+    assert result.changed_bytes == 6
+    assert result.describe() == f"6 bytes changed, {len(OLD):,} → {len(new):,}"
+    assert path.read_bytes() == new
+    assert path.stat().st_mode & 0o777 == 0o600  # mode kept
+    assert [p.name for p in tmp_path.iterdir()] == ["faq.md"]  # no temporary left
+
+
+def test_current_text_is_used_instead_of_disk(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_bytes(OLD)
+    # the caller says the file holds the new text already: nothing to do
+    [result] = write_back({path: "new\n"}, current={path: "new\n"})
+    assert not result.changed
+    assert path.read_bytes() == OLD
+
+
+def test_results_keep_the_order_of_outputs(tmp_path: Path) -> None:
+    outputs = {tmp_path / f"{n}.md": f"page {n}\n" for n in range(12)}
+    (tmp_path / "3.md").write_text("page 3\n", encoding="utf-8")
+
+    results = write_back(outputs, jobs=4)
+
+    assert [r.path for r in results] == list(outputs)
+    assert [r.changed for r in results] == [n != 3 for n in range(12)]
+
+
+def test_failed_write_keeps_the_original(tmp_path: Path) -> None:
+    path = tmp_path / "faq.md"
+    path.write_bytes(OLD)
+    with pytest.raises(RuntimeError):
+        with open_atomic(path) as fh:
+            fh.write(b"half")
+            raise RuntimeError("interrupted")
+    assert path.read_bytes() == OLD
+    assert [p.name for p in tmp_path.iterdir()] == ["faq.md"]
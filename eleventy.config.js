@@ -33,6 +33,9 @@ export default function (eleventyConfig) {
     eleventyConfig.addPassthroughCopy("fonts");
     eleventyConfig.addPassthroughCopy("styles.css");
     eleventyConfig.addPassthroughCopy("CNAME");
+    // Search index from .github/build_search_index.py, fetched lazily; kept
+    // out of _data so its shards don't join the global data cascade.
+    eleventyConfig.addPassthroughCopy({ _search: "search" });
 
     eleventyConfig.addPassthroughCopy("favicon.ico");
     eleventyConfig.addPassthroughCopy(".nojekyll");
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """Generate Oxford-styled .docx for Article Zero interview."""
 
+import os
 import re
+import sys
 from docx import Document
 from docx.shared import Pt, Mm, Inches, Cm, RGBColor, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
@@ -11,6 +13,10 @@ from docx.oxml.ns import qn, nsdecls
 from docx.oxml import parse_xml
 import copy
 
+# Pages are read through the shared corpus in .github/ (as written, unparsed).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".github"))
+from doc_sync_corpus import corpus, split_front_matter
+
 # ── Palette ──
 OXFORD_BLUE = RGBColor(0x00, 0x21, 0x47)
 GOLD = RGBColor(0x88, 0x6D, 0x35)
@@ -38,11 +44,12 @@ METHOD_NOTE = (
 )
 
 # Parse the markdown content
-with open("article-zero.md", "r") as f:
-    raw = f.read()
+raw = corpus().text("article-zero.md")
+if raw is None:
+    sys.exit("article-zero.md not found")
 
 # Strip front matter
-raw = re.sub(r"^---.*?---\s*", "", raw, flags=re.DOTALL)
+raw = split_front_matter(raw)[2].lstrip()
 # Strip the aside block (we handle method note separately)
 raw = re.sub(r"<aside.*?</aside>\s*", "", raw, flags=re.DOTALL)
 
@@ -13,6 +13,10 @@ Requires:
 
 import io, json, os, re, subprocess, sys, tempfile, time, requests
 
+# Pages are read through the shared corpus in .github/ (as written, unparsed).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".github"))
+from doc_sync_corpus import corpus
+
 # ── Config ────────────────────────────────────────────────────────────────────
 
 API_KEY  = os.environ.get("ELEVENLABS_API_KEY", "")
@@ -361,8 +365,10 @@ if __name__ == "__main__":
     out_path = sys.argv[2]
     dry_run  = "--dry-run" in sys.argv
 
-    with open(in_path) as f:
-        raw = f.read()
+    raw = corpus().text(in_path)
+    if raw is None:
+        print(f"No such file: {in_path}")
+        sys.exit(1)
 
     text = transform(raw)
 